@@ -32,7 +32,7 @@ def parse_pdf_with_grobid(pdf_path: str) -> str:
         response = requests.post(
             GROBID_URL,
             files={"input": f},
-            data={"consolidate": "1"}
+            data={"consolidateHeader": "0", "consolidateCitations": "0"}  # konsolidasyon kullanılmıyor
         )
     if response.status_code != 200:
         raise RuntimeError(f"Grobid parsing failed: {response.status_code}")
@@ -1,7 +1,11 @@
 # academic_pdf_translator_batch.py
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import argparse
 import logging
+import pipeline
 from pipeline import translate_pdf
+from modules.batcher import BatchScheduler
 import fitz
 
 # ------------------------
@@ -34,16 +38,33 @@ def process_pdf(pdf_path: Path):
 # BATCH ÇALIŞTIRMA
 # ------------------------
 def main():
+    parser = argparse.ArgumentParser(description="Batch PDF çevirisi")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Aynı anda işlenecek belge sayısı; >1 ise segmentler ortak batch kuyruğunu paylaşır")
+    parser.add_argument("--batch-tokens", type=int, default=4096)
+    parser.add_argument("--batch-wait-ms", type=float, default=50)
+    args = parser.parse_args()
+
     log.info("Batch pipeline başlatılıyor...")
     pdf_files = list(INPUT_DIR.glob("*.pdf"))
     if not pdf_files:
         log.error(f"{INPUT_DIR} içinde PDF bulunamadı!")
         return
 
-    success_count = 0
-    for pdf in pdf_files:
-        if process_pdf(pdf):
-            success_count += 1
+    if args.workers > 1:
+        # belgeler arası dinamik batching: kısa belgelerin segmentleri aynı generate çağrısında birleşir
+        with BatchScheduler(pipeline.translate_texts, max_tokens=args.batch_tokens,
+                            max_wait=args.batch_wait_ms / 1000.0) as scheduler:
+            pipeline.set_scheduler(scheduler)
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                success_count = sum(pool.map(process_pdf, pdf_files))
+            pipeline.set_scheduler(None)
+        log.info(f"Batching: {scheduler.segments} segment, {scheduler.batches} batch")
+    else:
+        success_count = 0
+        for pdf in pdf_files:
+            if process_pdf(pdf):
+                success_count += 1
 
     log.info(f"Batch tamamlandı: {success_count}/{len(pdf_files)} PDF başarıyla işlendi.")
 
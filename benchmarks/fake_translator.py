@@ -0,0 +1,71 @@
+"""
+Deterministik sahte çeviri arka ucu. Model yüklemeden pipeline.translate_texts'in
+yerine geçer; token başına maliyet ayarlanabilir.
+
+mode="sleep": GIL'i bırakır (hızlandırıcıda çalışan model gibi)
+mode="spin":  CPU'yu meşgul eder (CPU üzerinde generate gibi)
+
+Çok dilli çağrıda (translate_texts_multi) encoder payı (encoder_share) bir kez,
+kalan decoder payı her hedef dil için ödenir.
+"""
+import time
+from typing import Dict, List, Sequence
+
+from modules.batcher import estimate_tokens
+
+
+class FakeTranslator:
+    def __init__(self, cost_per_token: float = 0.0002, call_overhead: float = 0.005, mode: str = "sleep",
+                 encoder_share: float = 0.3):
+        self.cost_per_token = cost_per_token
+        self.encoder_share = encoder_share
+        self.call_overhead = call_overhead
+        self.mode = mode
+        self.calls = 0
+        self.tokens = 0
+        self.encoder_calls = 0
+
+    def _burn(self, seconds: float):
+        if self.mode == "spin":
+            end = time.perf_counter() + seconds
+            while time.perf_counter() < end:
+                pass
+        else:
+            time.sleep(seconds)
+
+    def translate_texts(self, texts: List[str], src_lang: str = "tr", tgt_lang: str = "en") -> List[str]:
+        # padding'li batch maliyeti: n * en uzun segment
+        longest = max((estimate_tokens(t) for t in texts), default=0)
+        self.calls += 1
+        self.encoder_calls += 1
+        self.tokens += longest * len(texts)
+        self._burn(self.call_overhead + self.cost_per_token * longest * len(texts))
+        # placeholder'lar (__FORMULA_k__) korunur; kelime sırası ters çevrilir
+        return self._outputs(texts, tgt_lang)
+
+    def translate_texts_multi(self, texts: List[str], src_lang: str = "tr",
+                              tgt_langs: Sequence[str] = ("en",)) -> Dict[str, List[str]]:
+        longest = max((estimate_tokens(t) for t in texts), default=0)
+        work = self.cost_per_token * longest * len(texts)
+        self.calls += len(tgt_langs)
+        self.encoder_calls += 1
+        self.tokens += longest * len(texts)
+        self._burn(self.call_overhead + work * (self.encoder_share + (1 - self.encoder_share) * len(tgt_langs)))
+        return {t: self._outputs(texts, t) for t in tgt_langs}
+
+    @staticmethod
+    def _outputs(texts: List[str], tgt_lang: str) -> List[str]:
+        return [f"[{tgt_lang}] " + " ".join(reversed(t.split())) for t in texts]
+
+    def install(self, pipeline_module):
+        """pipeline modülünü modelsiz çalışacak şekilde yamalar; geri alma fonksiyonu döner."""
+        saved = (pipeline_module.translate_texts, pipeline_module.translate_texts_multi,
+                 pipeline_module.ensure_model_loaded)
+        pipeline_module.translate_texts = self.translate_texts
+        pipeline_module.translate_texts_multi = self.translate_texts_multi
+        pipeline_module.ensure_model_loaded = lambda: None
+
+        def restore():
+            (pipeline_module.translate_texts, pipeline_module.translate_texts_multi,
+             pipeline_module.ensure_model_loaded) = saved
+        return restore
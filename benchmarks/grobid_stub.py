@@ -0,0 +1,152 @@
+"""
+Yerel GROBID taklidi: hazır TEI dosyalarını ayarlanabilir gecikme ve 503 oranıyla
+sunar. Yüklenen dosyanın adı `<stem>.pdf` ise `tei_dir/<stem>.tei.xml` döner,
+yoksa varsayılan TEI (repo kökündeki test_tei.xml) kullanılır.
+
+İstek seçeneklerinin maliyeti modellenir: consolidateHeader/consolidateCitations
+her biri `consolidation_latency`, teiCoordinates `coords_latency` ekler;
+processHeaderDocument ise `latency * header_factor` sürer.
+
+    python -m benchmarks.grobid_stub --port 8070 --latency 0.5 --error-rate 0.1
+"""
+import argparse
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_TEI = Path(__file__).resolve().parent.parent / "test_tei.xml"
+_FILENAME = re.compile(rb'filename="([^"]+)"')
+_FIELD = re.compile(rb'name="(\w+)"\r\n\r\n([^\r]*)\r\n')
+
+
+class GrobidStub:
+    def __init__(self, tei_dir: Optional[Path] = None, latency: float = 0.0, latency_per_kb: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: int = 0, host: str = "127.0.0.1", port: int = 0,
+                 consolidation_latency: float = 0.0, coords_latency: float = 0.0, header_factor: float = 1.0):
+        self.tei_dir = Path(tei_dir) if tei_dir else None
+        self.latency = latency
+        self.latency_per_kb = latency_per_kb
+        self.consolidation_latency = consolidation_latency
+        self.coords_latency = coords_latency
+        self.header_factor = header_factor
+        self.last_fields: Dict[str, List[str]] = {}
+        self.error_rate = error_rate
+        self.error_status = error_status  # 503: dolu (geri basınç), 500: belge/örnek hatası
+        self.requests = 0
+        self.errors = 0
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        handler = type("StubHandler", (_StubHandler,), {"stub": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def fulltext_url(self) -> str:
+        return f"{self.base_url}/api/processFulltextDocument"
+
+    def start(self) -> "GrobidStub":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def tei_for(self, filename: Optional[str]) -> bytes:
+        if self.tei_dir and filename:
+            candidate = self.tei_dir / (Path(filename).stem + ".tei.xml")
+            if candidate.exists():
+                return candidate.read_bytes()
+        return DEFAULT_TEI.read_bytes()
+
+    def service_time(self, path: str, size: int, fields: Dict[str, List[str]]) -> float:
+        t = self.latency * (self.header_factor if "processHeaderDocument" in path else 1.0)
+        t += self.latency_per_kb * size / 1024
+        for key in ("consolidateHeader", "consolidateCitations"):
+            if fields.get(key, ["0"])[-1] != "0":
+                t += self.consolidation_latency
+        if fields.get("teiCoordinates"):
+            t += self.coords_latency
+        return t
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            fail = self._rnd.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return fail
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    stub: GrobidStub = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, code: int, body: bytes, ctype: str = "application/xml"):
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/api/isalive"):
+            return self._send(200, b"true", "text/plain")
+        self._send(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        if not self.path.startswith("/api/process"):
+            return self._send(404, b"not found", "text/plain")
+        data = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        stub = self.stub
+        fields: Dict[str, List[str]] = {}
+        for k, v in _FIELD.findall(data):
+            fields.setdefault(k.decode(), []).append(v.decode("utf-8", "replace"))
+        stub.last_fields = fields
+        time.sleep(stub.service_time(self.path, len(data), fields))
+        if stub.should_fail():
+            return self._send(stub.error_status, b"GROBID busy" if stub.error_status == 503 else b"GROBID error",
+                              "text/plain")
+        m = _FILENAME.search(data)
+        self._send(200, stub.tei_for(m.group(1).decode("utf-8", "replace") if m else None))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GROBID stub sunucusu")
+    parser.add_argument("--port", type=int, default=8070)
+    parser.add_argument("--tei-dir", type=str, default=None)
+    parser.add_argument("--latency", type=float, default=0.0, help="İstek başına sabit gecikme (sn)")
+    parser.add_argument("--latency-per-kb", type=float, default=0.0, help="Yüklenen KB başına ek gecikme (sn)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 dönme olasılığı")
+    parser.add_argument("--consolidation-latency", type=float, default=0.0, help="Konsolidasyon başına ek gecikme (sn)")
+    parser.add_argument("--coords-latency", type=float, default=0.0, help="teiCoordinates ek gecikmesi (sn)")
+    args = parser.parse_args(argv)
+    stub = GrobidStub(args.tei_dir, args.latency, args.latency_per_kb, args.error_rate, port=args.port,
+                      consolidation_latency=args.consolidation_latency, coords_latency=args.coords_latency)
+    print(f"GROBID stub: {stub.base_url}")
+    try:
+        stub.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
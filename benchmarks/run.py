@@ -0,0 +1,338 @@
+"""
+Uçtan uca benchmark: sentetik PDF/TEI korpusu + GROBID stub + sahte çevirmen.
+Ağ ve model gerektirmez; aşama sürelerini ve dakikada belge sayısını ölçer.
+
+    python -m benchmarks.run                       # ölç ve tabloyu yaz
+    python -m benchmarks.run --save-baseline       # benchmarks/baseline.json'u güncelle
+    python -m benchmarks.run --compare             # baseline ile karşılaştır (gerilemede çıkış kodu 1)
+    python -m benchmarks.run --profiles            # GROBID istek profillerinin gecikmesi (stub modeli)
+    python -m benchmarks.run --profiles --grobid-url http://localhost:8070   # gerçek GROBID ile
+    python -m benchmarks.run --images --image-dpi 150   # görsel hazırlama: tam çözünürlüğe karşı kazanç
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List
+
+import pipeline
+from modules import metrics
+from modules.batcher import BatchScheduler
+from modules.grobid_client import GrobidPool, PROFILES
+from benchmarks.fake_translator import FakeTranslator
+from benchmarks.grobid_stub import GrobidStub
+from benchmarks.synth import make_corpus, make_scanned_pdf
+from modules import images as image_prep
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def _size_of(doc_name: str) -> int:
+    return int(re.search(r"_(\d+)p", doc_name).group(1))
+
+
+def summarize(records: List[dict], elapsed: float) -> dict:
+    ok = [r for r in records if r["status"] == "ok"]
+    by_size: Dict[int, List[dict]] = {}
+    for r in ok:
+        by_size.setdefault(_size_of(r["doc"]), []).append(r)
+    sizes = {}
+    for pages, rs in sorted(by_size.items()):
+        stages = {}
+        for name in metrics.STAGES:
+            walls = [r["stages"][name]["wall"] for r in rs if name in r["stages"]]
+            if walls:
+                stages[name] = round(statistics.mean(walls), 4)
+        sizes[str(pages)] = {
+            "docs": len(rs),
+            "wall_mean": round(statistics.mean(r["wall"] for r in rs), 4),
+            "stages": stages,
+        }
+    return {
+        "docs_ok": len(ok),
+        "docs_failed": len(records) - len(ok),
+        "elapsed": round(elapsed, 3),
+        "docs_per_min": round(60.0 * len(ok) / elapsed, 2) if elapsed else 0.0,
+        "sizes": sizes,
+    }
+
+
+def run_benchmark(sizes=(1, 5, 20), repeat: int = 3, workers: int = 1, latency: float = 0.05,
+                  error_rate: float = 0.0, cost_per_token: float = 0.0002, mode: str = "sleep",
+                  work_dir: Path = None, grobid_instances: int = 1, grobid_profile: str = None,
+                  consolidation_latency: float = 0.0, coords_latency: float = 0.0,
+                  engine: str = "grobid") -> dict:
+    work_dir = Path(work_dir or tempfile.mkdtemp(prefix="pdf-translator-bench-"))
+    corpus = make_corpus(work_dir / "corpus", sizes)
+    out_dir = work_dir / "out"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    report = work_dir / "run_report.jsonl"
+    report.unlink(missing_ok=True)
+
+    fake = FakeTranslator(cost_per_token=cost_per_token, mode=mode)
+    restore = fake.install(pipeline)
+    saved = (pipeline.GROBID_URL, pipeline.GROBID_URLS, pipeline.GROBID_PROFILE, pipeline.PDFLATEX)
+    pipeline.GROBID_PROFILE = grobid_profile
+    latex = shutil.which(pipeline.PDFLATEX)
+    if not latex:
+        pipeline.PDFLATEX = "true"  # pdflatex yoksa LaTeX yazımı ölçülür, derleme atlanır
+    metrics.RUN.reset()
+    metrics.RUN.configure(report)
+    jobs = [pdf for pdf in corpus for _ in range(repeat)]
+
+    def one(pdf: Path):
+        try:
+            pipeline.translate_pdf(pdf, output_dir=out_dir, engine=engine)
+        except Exception as e:
+            print(f"  ! {pdf.name}: {e}", file=sys.stderr)
+
+    try:
+        with ExitStack() as stack:
+            stubs = [stack.enter_context(GrobidStub(tei_dir=work_dir / "corpus", latency=latency,
+                                                    error_rate=error_rate, seed=i,
+                                                    consolidation_latency=consolidation_latency,
+                                                    coords_latency=coords_latency))
+                     for i in range(grobid_instances)]
+            pipeline.GROBID_URLS = [stub.base_url for stub in stubs]
+            t0 = time.perf_counter()
+            if workers > 1:
+                with BatchScheduler(pipeline.translate_texts) as sched:
+                    pipeline.set_scheduler(sched)
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        list(pool.map(one, jobs))
+                    pipeline.set_scheduler(None)
+            else:
+                for pdf in jobs:
+                    one(pdf)
+            elapsed = time.perf_counter() - t0
+    finally:
+        restore()
+        pipeline.GROBID_URL, pipeline.GROBID_URLS, pipeline.GROBID_PROFILE, pipeline.PDFLATEX = saved
+        metrics.RUN.configure(None)
+
+    records = [json.loads(l) for l in report.read_text(encoding="utf-8").splitlines() if l.strip()]
+    result = summarize(records, elapsed)
+    result["config"] = {
+        "sizes": list(sizes), "repeat": repeat, "workers": workers, "latency": latency,
+        "error_rate": error_rate, "cost_per_token": cost_per_token, "mode": mode,
+        "latex": "pdflatex" if latex else "skipped", "grobid_instances": grobid_instances,
+        "grobid_profile": grobid_profile or pipeline.choose_profile(pipeline.GROBID_NEEDS).name,
+        "engine": engine,
+    }
+    result["counters"] = {"generate_calls": fake.calls, "tokens": fake.tokens,
+                          "grobid_requests": [stub.requests for stub in stubs]}
+    result["env"] = {"python": platform.python_version(), "platform": platform.platform(),
+                     "cpus": os.cpu_count()}
+    return result
+
+
+def measure_profiles(urls: List[str] = None, sizes=(1, 5), repeat: int = 3, latency: float = 0.05,
+                     consolidation_latency: float = 0.25, coords_latency: float = 0.05,
+                     work_dir: Path = None) -> Dict[str, dict]:
+    """
+    Her GROBID istek profilini aynı PDF'lerle ölçer. `urls` verilmezse
+    gecikmesi modellenmiş bir stub kullanılır.
+    """
+    work_dir = Path(work_dir or tempfile.mkdtemp(prefix="pdf-translator-profiles-"))
+    corpus = make_corpus(work_dir / "corpus", sizes)
+    out: Dict[str, dict] = {}
+    with ExitStack() as stack:
+        if not urls:
+            stub = stack.enter_context(GrobidStub(tei_dir=work_dir / "corpus", latency=latency,
+                                                  consolidation_latency=consolidation_latency,
+                                                  coords_latency=coords_latency, header_factor=0.2))
+            urls = [stub.base_url]
+        pool = GrobidPool(urls)
+        for name, profile in sorted(PROFILES.items(), key=lambda kv: kv[1].cost):
+            walls, sizes_kb = [], []
+            for pdf in corpus:
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    resp = pool.process(pdf, service=profile.service, data=profile.data)
+                    walls.append(time.perf_counter() - t0)
+                    sizes_kb.append(len(resp.content) / 1024)
+            out[name] = {"wall_mean": round(statistics.mean(walls), 4),
+                         "wall_p95": round(sorted(walls)[math.ceil(0.95 * len(walls)) - 1], 4),
+                         "tei_kb": round(statistics.mean(sizes_kb), 1),
+                         "provides": sorted(profile.provides)}
+        pool.close()
+    return out
+
+
+def format_profiles(res: Dict[str, dict]) -> str:
+    chosen = pipeline.choose_profile(pipeline.GROBID_NEEDS).name
+    lines = [f"{'profil':<10}{'ort. sn':>10}{'p95 sn':>10}{'TEI KB':>10}  sağlar"]
+    for name, row in res.items():
+        mark = " *" if name == chosen else ""
+        lines.append(f"{name + mark:<10}{row['wall_mean']:>10.4f}{row['wall_p95']:>10.4f}{row['tei_kb']:>10.1f}"
+                     f"  {', '.join(row['provides'])}")
+    lines.append(f"* pipeline'ın seçtiği profil (ihtiyaç: {', '.join(sorted(pipeline.GROBID_NEEDS))})")
+    return "\n".join(lines)
+
+
+def measure_images(dpis=(0, 150), pages: int = 2, work_dir: Path = None) -> Dict[str, dict]:
+    """
+    Taranmış sayfalı sentetik PDF'te görsel hazırlamayı DPI başına ölçer: soğuk
+    (önbelleksiz) ve sıcak çıkarma süresi, yazılan bayt, pdflatex varsa derleme
+    süresi ve çıktı PDF boyutu. DPI 0 = hazırlamasız tam çözünürlük PNG.
+    """
+    work_dir = Path(work_dir or tempfile.mkdtemp(prefix="pdf-translator-images-"))
+    pdf = make_scanned_pdf(work_dir / "scan.pdf", pages)
+    latex = shutil.which(pipeline.PDFLATEX)
+    saved = (image_prep.IMAGE_DPI, image_prep.CACHE_DIR)
+    out: Dict[str, dict] = {}
+    try:
+        image_prep.CACHE_DIR = None
+        for dpi in dpis:
+            image_prep.IMAGE_DPI = dpi
+            out_dir = work_dir / f"dpi{dpi}"
+            shutil.rmtree(out_dir, ignore_errors=True)
+            out_dir.mkdir(parents=True)
+            t0 = time.perf_counter()
+            imgs = pipeline.extract_images_from_pdf(pdf, out_dir)
+            cold = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            pipeline.extract_images_from_pdf(pdf, out_dir)
+            warm = time.perf_counter() - t0
+            row = {"extract_cold": round(cold, 3), "extract_warm": round(warm, 3),
+                   "image_kb": round(sum(p.stat().st_size for v in imgs.values() for p in v) / 1024, 1),
+                   "compile": None, "pdf_kb": None}
+            if latex:
+                t0 = time.perf_counter()
+                result = pipeline.create_latex_pdf([], imgs, out_dir / "doc")
+                row["compile"] = round(time.perf_counter() - t0, 3)
+                row["pdf_kb"] = round(result.stat().st_size / 1024, 1) if result.exists() else None
+            out[str(dpi)] = row
+    finally:
+        image_prep.IMAGE_DPI, image_prep.CACHE_DIR = saved
+    return out
+
+
+def _opt(value, spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def format_images(res: Dict[str, dict]) -> str:
+    lines = [f"{'dpi':>6}{'soğuk sn':>10}{'sıcak sn':>10}{'görsel KB':>12}{'derleme sn':>12}{'PDF KB':>10}"]
+    for dpi, row in res.items():
+        lines.append(f"{'tam' if dpi == '0' else dpi:>6}{row['extract_cold']:>10.3f}{row['extract_warm']:>10.3f}"
+                     f"{row['image_kb']:>12.1f}{_opt(row['compile'], '.3f'):>12}{_opt(row['pdf_kb'], '.1f'):>10}")
+    base = res.get("0")
+    if base:
+        for dpi, row in res.items():
+            if dpi == "0":
+                continue
+            saved_kb = base["image_kb"] - row["image_kb"]
+            line = f"dpi {dpi}: {saved_kb:.0f} KB görsel tasarrufu ({row['image_kb'] / base['image_kb']:.1%})"
+            if base["compile"] is not None and row["compile"] is not None:
+                line += f", derleme {base['compile'] - row['compile']:.2f} sn daha kısa"
+            if base["pdf_kb"] and row["pdf_kb"]:
+                line += f", PDF {base['pdf_kb'] - row['pdf_kb']:.0f} KB daha küçük"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def format_result(res: dict) -> str:
+    lines = [f"docs/min: {res['docs_per_min']}  (ok={res['docs_ok']} failed={res['docs_failed']} "
+             f"elapsed={res['elapsed']}s, latex={res['config']['latex']})"]
+    header = f"{'sayfa':>6}{'belge':>7}{'toplam':>10}" + "".join(f"{s[:14]:>16}" for s in metrics.STAGES)
+    lines.append(header)
+    for pages, row in res["sizes"].items():
+        lines.append(f"{pages:>6}{row['docs']:>7}{row['wall_mean']:>10.3f}"
+                     + "".join(f"{row['stages'].get(s, 0.0):>16.4f}" for s in metrics.STAGES))
+    return "\n".join(lines)
+
+
+def compare(res: dict, base: dict, tolerance: float) -> bool:
+    """docs/min baseline'ın (1 - tolerance) katının altına düşerse False."""
+    ratio = res["docs_per_min"] / base["docs_per_min"] if base.get("docs_per_min") else 1.0
+    print(f"docs/min: {res['docs_per_min']} vs baseline {base['docs_per_min']} ({ratio:.2f}x)")
+    for pages, row in res["sizes"].items():
+        brow = base.get("sizes", {}).get(pages)
+        if not brow:
+            continue
+        for stage_name, wall in row["stages"].items():
+            bwall = brow["stages"].get(stage_name)
+            if bwall:
+                print(f"  {pages:>4}p {stage_name:<28}{wall:>9.4f}s  ({wall / bwall:.2f}x)")
+    return ratio >= 1.0 - tolerance
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF translator benchmark")
+    parser.add_argument("--sizes", type=str, default="1,5,20", help="Sentetik belge sayfa sayıları")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.05, help="GROBID stub gecikmesi (sn)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="GROBID stub 503 oranı")
+    parser.add_argument("--grobid-instances", type=int, default=1, help="Paralel GROBID stub sayısı")
+    parser.add_argument("--grobid-profile", choices=sorted(PROFILES), default=None,
+                        help="GROBID istek profili (varsayılan: pipeline'ın seçtiği en ucuz profil)")
+    parser.add_argument("--consolidation-latency", type=float, default=0.25,
+                        help="Stub: konsolidasyon başına ek gecikme (sn, modellenmiş)")
+    parser.add_argument("--coords-latency", type=float, default=0.05, help="Stub: teiCoordinates ek gecikmesi (sn)")
+    parser.add_argument("--engine", choices=pipeline.ENGINES, default="grobid", help="Metin çıkarma motoru")
+    parser.add_argument("--profiles", action="store_true", help="GROBID profillerinin gecikmesini karşılaştır")
+    parser.add_argument("--grobid-url", type=str, default=None,
+                        help="--profiles için gerçek GROBID adres(ler)i (virgülle ayrılmış)")
+    parser.add_argument("--images", action="store_true",
+                        help="Görsel hazırlamanın kazancını ölç (tam çözünürlük ve --image-dpi)")
+    parser.add_argument("--image-dpi", type=int, default=image_prep.IMAGE_DPI or 150)
+    parser.add_argument("--cost-per-token", type=float, default=0.0002)
+    parser.add_argument("--mode", choices=["sleep", "spin"], default="sleep")
+    parser.add_argument("--work-dir", type=str, default=None)
+    parser.add_argument("--json", action="store_true", help="Sonucu JSON olarak yaz")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.profiles:
+        prof = measure_profiles(
+            urls=args.grobid_url.split(",") if args.grobid_url else None,
+            sizes=tuple(int(s) for s in args.sizes.split(",")), repeat=args.repeat, latency=args.latency,
+            consolidation_latency=args.consolidation_latency, coords_latency=args.coords_latency,
+            work_dir=Path(args.work_dir) if args.work_dir else None,
+        )
+        print(json.dumps(prof, indent=2, ensure_ascii=False) if args.json else format_profiles(prof))
+        return 0
+
+    if args.images:
+        res = measure_images(dpis=(0, args.image_dpi), work_dir=Path(args.work_dir) if args.work_dir else None)
+        print(json.dumps(res, indent=2, ensure_ascii=False) if args.json else format_images(res))
+        return 0
+
+    res = run_benchmark(
+        sizes=tuple(int(s) for s in args.sizes.split(",")), repeat=args.repeat, workers=args.workers,
+        latency=args.latency, error_rate=args.error_rate, cost_per_token=args.cost_per_token,
+        mode=args.mode, work_dir=Path(args.work_dir) if args.work_dir else None,
+        grobid_instances=args.grobid_instances, grobid_profile=args.grobid_profile,
+        consolidation_latency=args.consolidation_latency, coords_latency=args.coords_latency,
+        engine=args.engine,
+    )
+    print(json.dumps(res, indent=2, ensure_ascii=False) if args.json else format_result(res))
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(res, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Baseline kaydedildi: {BASELINE}")
+    if args.compare:
+        if not BASELINE.exists():
+            print("Baseline yok; önce --save-baseline ile oluşturun.")
+            return 1
+        if not compare(res, json.loads(BASELINE.read_text(encoding="utf-8")), args.tolerance):
+            print("⚠️ Performans gerilemesi")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Benchmark için deterministik sentetik girdiler: N sayfalık PDF ve ona karşılık
+gelen GROBID benzeri TEI XML.
+"""
+import random
+from pathlib import Path
+from typing import List
+from xml.sax.saxutils import escape
+
+import fitz  # PyMuPDF
+
+WORDS = (
+    "diferansiyel denklem çözüm lineer homojen katsayı fonksiyon koşul başlangıç değer "
+    "problem kararlı kök polinom sabit aralık türev integral matris vektör uzay dönüşüm "
+    "gösteriniz tartışınız bulunuz örnek yardımıyla genel olarak doğru ifade ilgili"
+).split()
+
+FORMULAS = ["y'' + p(x) y' + q(x) y = 0", "λ^2 + aλ + b = 0", "∫_0^1 f(x) dx", "|f(x) - f(y)| ≤ L |x - y|"]
+
+TEI_NS = "http://www.tei-c.org/ns/1.0"
+
+
+def paragraphs(n: int, seed: int = 0, words: int = 60) -> List[str]:
+    rnd = random.Random(seed)
+    return [" ".join(rnd.choice(WORDS) for _ in range(words)).capitalize() + "." for _ in range(n)]
+
+
+def make_tei(n_paragraphs: int, seed: int = 0, formula_every: int = 3, paras_per_div: int = 5) -> str:
+    """Başlıklı bölümler, paragraflar ve aralarda formüller içeren TEI üretir."""
+    paras = paragraphs(n_paragraphs, seed)
+    body = []
+    for d in range(0, n_paragraphs, paras_per_div):
+        body.append(f"<div><head>Bölüm {d // paras_per_div + 1}</head>")
+        for k, text in enumerate(paras[d:d + paras_per_div], start=d):
+            if formula_every and k % formula_every == 0:
+                f = FORMULAS[k % len(FORMULAS)]
+                body.append(f"<p>{escape(text)} <formula>{escape(f)}</formula> ifadesini kullanınız.</p>")
+            else:
+                body.append(f"<p>{escape(text)}</p>")
+        body.append("</div>")
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<TEI xmlns="{TEI_NS}"><teiHeader/><text xml:lang="tr"><body>'
+        + "".join(body)
+        + "</body><back/></text></TEI>\n"
+    )
+
+
+def make_pdf(path: Path, pages: int, seed: int = 0, paras_per_page: int = 4, images_per_page: int = 1) -> Path:
+    """Her sayfasında metin ve küçük raster görseller olan bir PDF yazar."""
+    rnd = random.Random(seed)
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        text = "\n\n".join(paragraphs(paras_per_page, seed * 1000 + p, words=40))
+        page.insert_textbox(fitz.Rect(50, 50, 545, 560), text, fontsize=10)
+        for j in range(images_per_page):
+            pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 96, 64), False)
+            pix.set_rect(pix.irect, (rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)))
+            y = 580 + j * 70
+            page.insert_image(fitz.Rect(50, y, 146, y + 64), pixmap=pix)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def make_corpus(out_dir: Path, sizes=(1, 5, 20), paras_per_page: int = 4) -> List[Path]:
+    """Her boyut için `synth_<sayfa>p.pdf` ve aynı adlı `.tei.xml` çifti yazar."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    pdfs = []
+    for pages in sizes:
+        stem = f"synth_{pages:03d}p"
+        pdfs.append(make_pdf(out_dir / f"{stem}.pdf", pages, seed=pages, paras_per_page=paras_per_page))
+        (out_dir / f"{stem}.tei.xml").write_text(make_tei(pages * paras_per_page, seed=pages), encoding="utf-8")
+    return pdfs
+
+
+def make_scanned_pdf(path: Path, pages: int, seed: int = 0, dpi: int = 300) -> Path:
+    """
+    Her sayfası tam sayfa bir "tarama" (fotoğraf benzeri, çok renkli) ve bir
+    çizim (sayfa metninin gri tonlu raster'ı) içeren PDF; görsel hazırlamayı ölçmek için.
+    """
+    rnd = random.Random(seed)
+    w, h = int(8.5 * dpi), int(11 * dpi)
+    doc = fitz.open()
+    for p in range(pages):
+        # küçük gürültü karosu büyütülünce yumuşak geçişli, çok renkli bir görüntü olur
+        tile = fitz.Pixmap(fitz.csRGB, 64, 80, rnd.randbytes(64 * 80 * 3), False)
+        scan = fitz.Pixmap(tile, w, h, None)
+        text_page = fitz.open()
+        text_page.new_page().insert_textbox(fitz.Rect(50, 50, 545, 760), "\n\n".join(paragraphs(6, seed + p)),
+                                            fontsize=10)
+        drawing = text_page[0].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        text_page.close()
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=scan)
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=drawing)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc.save(path, deflate=True)
+    doc.close()
+    return path
@@ -2,10 +2,13 @@ import re
 from pathlib import Path
 import subprocess
 
+from modules.blocks import TEXT, FORMULA, TABLE
+from modules import formulas
+
 LATEX_TEMPLATE = r"""
 \documentclass[12pt]{article}
 \usepackage[utf8]{inputenc}
-\usepackage{amsmath, graphicx, booktabs}
+\usepackage{amsmath, amssymb, graphicx, booktabs, fancyvrb}
 \usepackage{geometry}
 \geometry{margin=2cm}
 \begin{document}
@@ -15,25 +18,30 @@ LATEX_TEMPLATE = r"""
 \end{document}
 """
 
-def format_table(table_soup):
-    rows = table_soup.find_all("row")
-    latex = "\\begin{tabular}{%s}\n" % ("c" * len(rows[0].find_all("cell")))
+def format_table(rows, escape=None):
+    """rows: satır başına hücre metinleri (Block.rows); ilk satır başlık kabul edilir."""
+    if not rows:
+        return ""
+    ncols = max(len(r) for r in rows)
+    latex = "\\begin{tabular}{%s}\n" % ("l" * ncols)
     latex += "\\toprule\n"
-    for row in rows:
-        cells = [c.get_text(strip=True) for c in row.find_all("cell")]
+    for k, cells in enumerate(rows):
+        cells = [escape(c) if escape else c for c in cells] + [""] * (ncols - len(cells))
         latex += " & ".join(cells) + " \\\\\n"
+        if k == 0 and len(rows) > 1:
+            latex += "\\midrule\n"
     latex += "\\bottomrule\n\\end{tabular}\n"
     return latex
 
 def build_latex(blocks, images):
     latex_blocks = []
     for i, block in enumerate(blocks, start=1):
-        if block["type"] == "text":
-            latex_blocks.append(block["content"])
-        elif block["type"] == "formula":
-            latex_blocks.append(f"\\[{block['content']}\\]")
-        elif block["type"] == "table":
-            latex_blocks.append(format_table(block["content"]))
+        if block.kind == TEXT:
+            latex_blocks.append(block.translated or block.text)
+        elif block.kind == FORMULA:
+            latex_blocks.append(formulas.render(block.text, display=True))
+        elif block.kind == TABLE:
+            latex_blocks.append(format_table(block.translated_rows or block.rows))
         if i in images:
             for img in images[i]:
                 latex_blocks.append(f"\\includegraphics[width=0.5\\textwidth]{{{img}}}")
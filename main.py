@@ -1,14 +1,70 @@
 import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 import logging
 
-from modules import pdf_utils, translator, latex_builder
-from pipeline import process_pdf  # pipeline.py içinde olacak ana işleyici
+from modules import pdf_utils, metrics, profiling, resources, scheduling, shared_model
+from modules.chunked import translate_chunked
+import pipeline
+from pipeline import process_pdf, parse_pages  # pipeline.py içinde olacak ana işleyici
 
 logging.basicConfig(level=logging.INFO)
 
 
+def translate_one(pdf_file: Path, output_dir: Path, args) -> bool:
+    logging.info(f"İşleniyor: {pdf_file}")
+    try:
+        langs = pipeline.parse_langs(args.tgt_lang)
+        if args.chunk_pages:
+            translate_chunked(pdf_file, tgt_lang=langs or pipeline.TGT_LANG, output_dir=output_dir,
+                              chunk_pages=args.chunk_pages, workers=args.chunk_workers, engine=args.engine,
+                              redo=parse_pages(args.redo_chunks) or (), pages=parse_pages(args.pages))
+        else:
+            process_pdf(pdf_file, output_dir, engine=args.engine, pages=parse_pages(args.pages), tgt_langs=langs)
+        logging.info(f"✅ Başarılı: {pdf_file.name} çevrildi ve kaydedildi.")
+        return True
+    except Exception as e:
+        logging.error(f"❌ Hata oluştu {pdf_file.name}: {e}")
+        return False
+
+
+def _translate_in_worker(pdf_file: Path, output_dir: Path, args):
+    # fork ile gelen ve önceki işlerden kalan toplamlar atılır: yalnızca bu belgenin ölçümleri döner
+    metrics.RUN.reset()
+    return translate_one(pdf_file, output_dir, args), metrics.RUN.snapshot()
+
+
+def _init_worker(thread_plan, counter):
+    # her süreç kendi sırasına göre çekirdek kümesini ve iş parçacığı sayısını alır
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    resources.apply(thread_plan, index)
+
+
 def main():
+    # Servis modu: python main.py serve [--port 8000 --workers 2]
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from modules import service
+        service.main(sys.argv[2:])
+        return
+    # Kalibrasyon: python main.py calibrate [--procs 1,2,4 --seconds 20]
+    if len(sys.argv) > 1 and sys.argv[1] == "calibrate":
+        resources.main(sys.argv[1:])
+        return
+    # Isınma: python main.py warmup [--skip grobid]
+    if len(sys.argv) > 1 and sys.argv[1] == "warmup":
+        from modules import warmup
+        sys.exit(0 if warmup.main(sys.argv[2:]) else 1)
+    # Paylaşılan kuyruk: python main.py queue --db q.db enqueue|work|status ...
+    if len(sys.argv) > 1 and sys.argv[1] == "queue":
+        from modules import workqueue
+        workqueue.main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description="Academic PDF Translator")
     parser.add_argument(
         "--input",
@@ -22,11 +78,138 @@ def main():
         default="output",
         help="Çeviri sonrası çıktıların kaydedileceği klasör"
     )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Belge başına aşama süreleri ve sayaçların yazılacağı JSON-lines dosyası "
+             "(varsayılan: <output>/run_report.jsonl)"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="output/profile",
+        default=None,
+        help="Her aşamayı cProfile ile sar; belge başına .prof ve flamegraph (.collapsed) dosyaları yazılır"
+    )
+    parser.add_argument(
+        "--profile-torch",
+        action="store_true",
+        help="--profile ile birlikte model.generate çevresinde torch operatör profili kaydet"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["grobid", "local", "auto"],
+        default=None,
+        help="Metin çıkarma motoru: grobid, local (PyMuPDF) ya da auto "
+             "(kısa tek sütunlu belgeler ve GROBID erişilemezse local)"
+    )
+    parser.add_argument(
+        "--pages",
+        type=str,
+        default=None,
+        help="Yalnızca bu sayfaları çevir (ör. 3 ya da 1-4,9); çıktı <ad>_p<ilk>-<son>.pdf"
+    )
+    parser.add_argument(
+        "--tgt-lang",
+        type=str,
+        default=None,
+        help="Hedef dil(ler), virgülle (ör. tur_Latn,deu_Latn,fra_Latn): ayrıştırma, görseller ve "
+             "encoder bir kez çalışır, her dile ayrı <ad>_<dil>.pdf yazılır (tek dilde <ad>.pdf)"
+    )
+    parser.add_argument(
+        "--chunk-pages",
+        type=int,
+        default=0,
+        help="Belgeyi bu kadar sayfalık parçalara bölüp paralel çevir/derle ve birleştir (0: kapalı)"
+    )
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=4,
+        help="--chunk-pages ile aynı anda işlenecek parça sayısı"
+    )
+    parser.add_argument(
+        "--redo-chunks",
+        type=str,
+        default="",
+        help="Tamamlanmış olsa da yeniden işlenecek parça numaraları (ör. 3,5)"
+    )
+    parser.add_argument(
+        "--warmup",
+        action="store_true",
+        help="Belgelerden önce modeli, GROBID'i ve LaTeX'i paralel ısıt; hazır değilse başlama"
+    )
+    parser.add_argument(
+        "--vocab-shortlist",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="CORPUS",
+        help="Decoder çıkışını hedef dilin tokenlarıyla sınırla (yazı sistemine göre; "
+             "hedef dilde bir derlem dosyası verilirse derlemdeki tokenlarla)"
+    )
+    parser.add_argument(
+        "--optimize-pdf",
+        action="store_true",
+        help="Derlenen PDF'leri küçült: font alt kümesi, kullanılmayan/tekrarlı nesneleri at, akışları sıkıştır"
+    )
+    parser.add_argument(
+        "--linearize",
+        action="store_true",
+        help="--optimize-pdf ile web'de hızlı görüntüleme için doğrusallaştır (MuPDF desteklemiyorsa qpdf)"
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=scheduling.POLICIES,
+        default="sjf",
+        help="Belge sırası: sjf (sayfa sayısı/boyuttan tahmini kısa iş önce) ya da fifo (dosya sırası)"
+    )
+    parser.add_argument(
+        "--aging",
+        type=float,
+        default=scheduling.AGING,
+        help="sjf yaşlandırması: bekleme saniyesi başına tahmini maliyetten düşülen saniye"
+    )
+    parser.add_argument(
+        "--priority",
+        action="append",
+        default=[],
+        help="Açık öncelik, dosya=sayı (yüksek önce; tekrarlanabilir), ör. --priority acil.pdf=10"
+    )
+    parser.add_argument(
+        "--procs",
+        type=int,
+        default=1,
+        help="Klasör girdisinde belgeleri bu kadar süreçte paralel işle; çekirdekler süreçlere bölünür"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Süreç başına torch iş parçacığı (varsayılan: kalibrasyon ya da çekirdek/süreç)"
+    )
+    parser.add_argument(
+        "--share-model",
+        choices=shared_model.MODES,
+        default=None,
+        help="--procs ile model ağırlıklarını paylaş: mmap (safetensors eşleme) ya da fork "
+             "(ana süreçte yükle, kopyala-yaz); varsayılan MODEL_SHARING ortam değişkeni"
+    )
+    parser.add_argument(
+        "--pin-cores",
+        action="store_true",
+        help="--procs ile her süreci ayrı bir çekirdek kümesine sabitle"
+    )
     args = parser.parse_args()
 
     input_path = Path(args.input)
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
+    metrics.RUN.configure(Path(args.report) if args.report else output_dir / "run_report.jsonl")
+    if args.profile:
+        profiling.enable(Path(args.profile), torch_ops=args.profile_torch)
 
     # Eğer klasörse, içindeki tüm PDF'leri bul
     if input_path.is_dir():
@@ -38,13 +221,79 @@ def main():
         logging.error("Hiç PDF bulunamadı!")
         return
 
-    for pdf_file in pdf_files:
-        logging.info(f"İşleniyor: {pdf_file}")
-        try:
-            process_pdf(pdf_file, output_dir)
-            logging.info(f"✅ Başarılı: {pdf_file.name} çevrildi ve kaydedildi.")
-        except Exception as e:
-            logging.error(f"❌ Hata oluştu {pdf_file.name}: {e}")
+    priorities = scheduling.parse_priorities(args.priority)
+    jobs = scheduling.order([scheduling.estimate(f, priorities.get(f.name, 0)) for f in pdf_files], args.schedule)
+    logging.info(f"Sıra ({args.schedule}): " + ", ".join(f"{j.path.name} ({j.pages} s)" for j in jobs[:10])
+                 + (" ..." if len(jobs) > 10 else ""))
+    # süreçler/döngü işleri kuyruktan boşaldıkça alır
+    queue = scheduling.JobQueue(args.schedule, args.aging)
+    for job in jobs:
+        queue.put(job)
+
+    procs = max(1, min(args.procs, len(pdf_files)))
+    thread_plan = resources.plan(procs, threads=args.threads, pin=args.pin_cores)
+    if args.share_model:
+        pipeline.MODEL_SHARING = args.share_model
+    if args.vocab_shortlist is not None:
+        pipeline.VOCAB_SHORTLIST = True
+        pipeline.SHORTLIST_CORPUS = Path(args.vocab_shortlist) if args.vocab_shortlist else None
+    if args.optimize_pdf or args.linearize:
+        pipeline.OPTIMIZE_PDF, pipeline.LINEARIZE_PDF = True, args.linearize
+    if args.warmup:
+        from modules import warmup
+        if procs == 1:
+            resources.apply(thread_plan)
+        # ana süreçte yüklenen model yalnızca tek süreçte ya da fork paylaşımında worker'lara geçer
+        steps = [s for s in warmup.STEPS
+                 if not (s == "model" and procs > 1 and pipeline.MODEL_SHARING != "fork")
+                 and not (s == "grobid" and (args.engine or pipeline.EXTRACT_ENGINE) == "local")]
+        results = warmup.run(steps)
+        print(warmup.format_results(results) + "\n")
+        if not all(r.ok for r in results):
+            logging.error("Isınma başarısız, belgeler işlenmeyecek.")
+            sys.exit(1)
+
+    start = time.monotonic()
+    completion = []
+    if procs == 1:
+        resources.apply(thread_plan)
+        while len(queue):
+            translate_one(queue.get().path, output_dir, args)
+            completion.append(time.monotonic() - start)
+        print("\n" + metrics.RUN.summary_table())
+    else:
+        if pipeline.MODEL_SHARING == "fork":
+            # worker'lar ana süreçteki ağırlıkları kopyala-yaz sayfalarıyla paylaşır
+            pipeline.ensure_model_loaded()
+            shared_model.prepare_fork()
+        counter = multiprocessing.Value("i", 0)
+        with ProcessPoolExecutor(max_workers=procs, mp_context=multiprocessing.get_context("fork"),
+                                 initializer=_init_worker, initargs=(thread_plan, counter)) as pool:
+            # havuza süreç sayısı kadar iş verilir; biten her işin yerine kuyruktaki sıradaki girer
+            running = {pool.submit(_translate_in_worker, queue.get().path, output_dir, args) for _ in range(procs)}
+            ok = 0
+            while running:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    completion.append(time.monotonic() - start)
+                    done, snap = fut.result()
+                    ok += done
+                    metrics.RUN.merge(snap)
+                    if len(queue):
+                        running.add(pool.submit(_translate_in_worker, queue.get().path, output_dir, args))
+            memory = [shared_model.memory_usage(pid) for pid in shared_model.child_pids()]
+        logging.info(f"{ok}/{len(pdf_files)} belge çevrildi ({procs} süreç x {thread_plan.intra_op} iş parçacığı, "
+                     f"model paylaşımı: {pipeline.MODEL_SHARING})")
+        print("\n" + metrics.RUN.summary_table())
+        print("\n" + shared_model.format_memory([m for m in memory if m]))
+    print("\nTamamlanma süreleri (başlangıçtan):")
+    print(scheduling.format_stats(args.schedule, scheduling.completion_stats(completion)))
+    for policy in scheduling.POLICIES:  # aynı işler, tahmini maliyetlerle
+        est = scheduling.simulate(jobs, policy, procs, args.aging)
+        print(scheduling.format_stats(f"~{policy}", scheduling.completion_stats(est)))
+    logging.info(f"Çalışma raporu: {metrics.RUN.report_path}")
+    if args.profile:
+        print("\n" + profiling.report(Path(args.profile), top=10))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+"""
+Belgeler arası dinamik batching.
+
+Tüm eşzamanlı belgelerin segmentleri tek bir kuyruğa girer; (src, tgt) çifti
+başına bir şerit tutulur. Bir şerit token bütçesini doldurduğunda ya da en eski
+segment `max_wait` kadar beklediğinde batch oluşturulup çeviri fonksiyonuna
+verilir; sonuçlar her segmentin Future nesnesine geri yönlendirilir.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from modules.logger import get_logger
+
+logger = get_logger(__name__)
+
+TranslateFn = Callable[[List[str], str, str], List[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Tokenizer çağırmadan kaba token tahmini (alt-kelime başına ~1.3)."""
+    return max(1, int(len(text.split()) * 1.3) + 1)
+
+
+class _Item:
+    __slots__ = ("text", "tokens", "future", "enqueued")
+
+    def __init__(self, text: str, tokens: int):
+        self.text = text
+        self.tokens = tokens
+        self.future: Future = Future()
+        self.enqueued = time.monotonic()
+
+
+class BatchScheduler:
+    """
+    translate_fn(texts, src_lang, tgt_lang) -> translations imzalı bir fonksiyonu
+    tek bir arka plan thread'inden, doldurulmuş batch'lerle çağırır.
+
+    max_tokens: padding dahil batch maliyeti üst sınırı (n * en uzun segment)
+    max_batch:  batch başına en fazla segment
+    max_wait:   bir segmentin batch dolmasını bekleyeceği en uzun süre (sn)
+    """
+
+    def __init__(self, translate_fn: TranslateFn, max_tokens: int = 4096, max_batch: int = 32,
+                 max_wait: float = 0.05, count_tokens: Callable[[str], int] = estimate_tokens):
+        self.translate_fn = translate_fn
+        self.max_tokens = max_tokens
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.count_tokens = count_tokens
+        self._lanes: Dict[Tuple[str, str], Deque[_Item]] = {}
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.segments = 0
+
+    # ------------------------
+    # Yaşam döngüsü
+    # ------------------------
+    def start(self) -> "BatchScheduler":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="batch-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Kuyrukta kalan segmentleri işler ve thread'i durdurur."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------
+    # İstemci tarafı
+    # ------------------------
+    def submit(self, text: str, src_lang: str, tgt_lang: str) -> Future:
+        item = _Item(text, self.count_tokens(text))
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("BatchScheduler durduruldu")
+            self._lanes.setdefault((src_lang, tgt_lang), deque()).append(item)
+            self._cond.notify()
+        return item.future
+
+    def translate(self, texts: List[str], src_lang: str, tgt_lang: str) -> List[str]:
+        futures = [self.submit(t, src_lang, tgt_lang) for t in texts]
+        return [f.result() for f in futures]
+
+    # ------------------------
+    # Zamanlayıcı
+    # ------------------------
+    def _batch_cost(self, n: int, longest: int) -> int:
+        return n * longest
+
+    def _ready(self, lane: Deque[_Item], now: float) -> bool:
+        if self._stopping or len(lane) >= self.max_batch:
+            return True
+        if now - lane[0].enqueued >= self.max_wait:
+            return True
+        longest = max(it.tokens for it in lane)
+        return self._batch_cost(len(lane), longest) >= self.max_tokens
+
+    def _take(self, lane: Deque[_Item]) -> List[_Item]:
+        batch = [lane.popleft()]
+        longest = batch[0].tokens
+        while lane and len(batch) < self.max_batch:
+            nxt = max(longest, lane[0].tokens)
+            if self._batch_cost(len(batch) + 1, nxt) > self.max_tokens:
+                break
+            batch.append(lane.popleft())
+            longest = nxt
+        return batch
+
+    def _next_batch(self) -> Optional[Tuple[Tuple[str, str], List[_Item]]]:
+        with self._cond:
+            while True:
+                lanes = [(k, q) for k, q in self._lanes.items() if q]
+                if not lanes:
+                    if self._stopping:
+                        return None
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                # en eski segmenti bekleyen şerit önce
+                key, lane = min(lanes, key=lambda kv: kv[1][0].enqueued)
+                if self._ready(lane, now):
+                    return key, self._take(lane)
+                self._cond.wait(timeout=max(0.0, self.max_wait - (now - lane[0].enqueued)))
+
+    def _loop(self):
+        while True:
+            nxt = self._next_batch()
+            if nxt is None:
+                return
+            (src_lang, tgt_lang), batch = nxt
+            self.batches += 1
+            self.segments += len(batch)
+            try:
+                outs = self.translate_fn([it.text for it in batch], src_lang, tgt_lang)
+                if len(outs) != len(batch):
+                    raise RuntimeError(f"Beklenen {len(batch)} çeviri, gelen {len(outs)}")
+                for it, out in zip(batch, outs):
+                    it.future.set_result(out)
+            except Exception as e:
+                logger.warning(f"Batch çevirisi başarısız ({len(batch)} segment): {e}")
+                for it in batch:
+                    it.future.set_exception(e)
@@ -0,0 +1,124 @@
+"""
+Tüm aşamaların paylaştığı blok veri modeli.
+
+Blok metni formülleri satır içinde tutar; formüller kopya olarak değil,
+`formula_spans` içinde metne göre (başlangıç, bitiş) ofsetleri olarak saklanır.
+Çevirmene giden yer tutuculu metin (`text_plain`) ve formül listesi
+(`formulas`) bu ikisinden türetilir. Tür etiketleri `sys.intern` ile paylaşılır.
+"""
+import re
+import sys
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+# Ortak tür etiketleri (diğerleri TEI eleman adıyla gelir: head, figDesc, note, ...)
+TEXT = sys.intern("text")
+FORMULA = sys.intern("formula")
+TABLE = sys.intern("table")
+PAGE_BREAK = sys.intern("pb")
+ERROR = sys.intern("error")
+
+# TEI/HTML eleman adları -> ortak etiket
+_ALIASES = {"p": TEXT, "paragraph": TEXT}
+
+_WS = re.compile(r"\s+")
+_PLACEHOLDER = "__FORMULA_{}__"
+
+Span = Tuple[int, int]
+
+
+def parse_coords(value: Optional[str]) -> Optional[Tuple[int, Tuple[float, float, float, float]]]:
+    """
+    GROBID teiCoordinates değeri ("sayfa,x,y,g,y;sayfa,x,y,g,y;...") -> (sayfa, ilk kutu).
+    Bozuk ya da boş değerlerde None.
+    """
+    if not value:
+        return None
+    try:
+        page, x, y, w, h = (float(v) for v in value.split(";", 1)[0].split(",")[:5])
+    except ValueError:
+        return None
+    return int(page), (x, y, x + w, y + h)
+
+
+def kind_of(name: str) -> str:
+    return _ALIASES.get(name) or sys.intern(name)
+
+
+@dataclass(slots=True)
+class Block:
+    kind: str
+    text: str = ""
+    formula_spans: Tuple[Span, ...] = ()
+    translated: Optional[str] = None
+    rows: Optional[Tuple[Tuple[str, ...], ...]] = None  # yalnızca tablolar: satır x hücre metinleri
+    translated_rows: Optional[Tuple[Tuple[str, ...], ...]] = None
+    page: Optional[int] = None  # 1 tabanlı kaynak sayfa (biliniyorsa)
+    coords: Optional[Tuple[float, float, float, float]] = None  # sayfadaki kutu: x0, y0, x1, y1 (pt)
+
+    def __post_init__(self):
+        self.kind = kind_of(self.kind)
+
+    @classmethod
+    def from_parts(cls, kind: str, parts: Iterable[Tuple[bool, str]], **kw) -> "Block":
+        """(formül_mü, metin) parçalarından boşlukları normalize edilmiş blok kurar."""
+        buf: List[str] = []
+        spans: List[Span] = []
+        pos = 0
+        for is_formula, chunk in parts:
+            if is_formula:
+                chunk = chunk.strip()
+                if not chunk:
+                    continue
+                if buf and not buf[-1].endswith(" "):
+                    buf.append(" ")
+                    pos += 1
+                spans.append((pos, pos + len(chunk)))
+                buf += [chunk, " "]
+                pos += len(chunk) + 1
+            else:
+                chunk = _WS.sub(" ", chunk)
+                if (not buf or buf[-1].endswith(" ")) and chunk.startswith(" "):
+                    chunk = chunk[1:]
+                if chunk:
+                    buf.append(chunk)
+                    pos += len(chunk)
+        return cls(kind, "".join(buf).rstrip(" "), tuple(spans), **kw)
+
+    @classmethod
+    def formula(cls, source: str) -> "Block":
+        source = source.strip()
+        return cls(FORMULA, source, ((0, len(source)),) if source else ())
+
+    @property
+    def formulas(self) -> List[str]:
+        return [self.text[s:e] for s, e in self.formula_spans]
+
+    @property
+    def text_plain(self) -> str:
+        """Formüllerin `__FORMULA_k__` ile değiştirildiği, çevirmene gidecek metin."""
+        if not self.formula_spans:
+            return self.text
+        out, last = [], 0
+        for k, (s, e) in enumerate(self.formula_spans):
+            out.append(self.text[last:s])
+            out.append(_PLACEHOLDER.format(k))
+            last = e
+        out.append(self.text[last:])
+        return "".join(out)
+
+    # Eski sözlük tabanlı çağıranlar için salt-okunur erişim (block["type"], block.get("content"))
+    _LEGACY = {"type": "kind", "content": "text"}
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, self._LEGACY.get(key, key))
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
@@ -0,0 +1,155 @@
+"""
+Büyük belgeler için parçalı çeviri: belge sayfa aralıklarına bölünür, her parça
+ayrı ayrı (GROBID alt-PDF'i → çeviri → pdflatex) ve paralel işlenir, sonra
+parça PDF'leri PyMuPDF ile tek çıktıda birleştirilir.
+
+Parça durumları `<çıktı>/<ad>.chunks/manifest.json` dosyasında tutulur. Yeniden
+çalıştırmada tamamlanmış parçalar atlanır, yalnızca başarısız (ya da `redo` ile
+istenen) parçalar tekrar işlenir.
+
+    python main.py --input kitap.pdf --chunk-pages 25 --chunk-workers 4
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import fitz  # PyMuPDF
+
+import pipeline
+from modules import metrics, pdf_optimize
+from modules.batcher import BatchScheduler
+
+logger = logging.getLogger(__name__)
+
+CHUNK_PAGES = 25
+
+
+def plan_chunks(page_count: int, chunk_pages: int = CHUNK_PAGES,
+                pages: Optional[List[int]] = None) -> List[List[int]]:
+    """[[1..n], [n+1..2n], ...] (1 tabanlı sayfa listeleri); pages verilirse yalnızca o sayfalar."""
+    selected = [p for p in pages if 1 <= p <= page_count] if pages else list(range(1, page_count + 1))
+    return [selected[k:k + chunk_pages] for k in range(0, len(selected), chunk_pages)]
+
+
+def _span(chunk: List[int]) -> list:
+    """Manifestteki parça tanımı: ardışık sayfalar [ilk, son], değilse sayfa listesi."""
+    return [chunk[0], chunk[-1]] if chunk[-1] - chunk[0] + 1 == len(chunk) else chunk
+
+
+def _fingerprint(pdf_path: Path) -> str:
+    st = pdf_path.stat()
+    return f"{st.st_size}:{int(st.st_mtime)}"
+
+
+class ChunkManifest:
+    """Parça durumlarının JSON kaydı; kaynak PDF değişirse geçersiz sayılır."""
+
+    def __init__(self, path: Path, source: Path, chunks: List[List[int]]):
+        self.path = path
+        self._lock = threading.Lock()
+        data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        plan = [_span(c) for c in chunks]
+        fresh = data.get("source") != _fingerprint(source) or data.get("plan") != plan
+        self.data = {"source": _fingerprint(source), "plan": plan,
+                     "chunks": {} if fresh else data.get("chunks", {})}
+
+    def get(self, key: str) -> dict:
+        return self.data["chunks"].get(key, {})
+
+    def update(self, key: str, **fields):
+        with self._lock:
+            self.data["chunks"].setdefault(key, {}).update(fields)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.data, indent=2, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.path)
+
+
+def merge_pdfs(parts: Iterable[Path], out_path: Path) -> Path:
+    with fitz.open() as merged:
+        for part in parts:
+            with fitz.open(part) as doc:
+                merged.insert_pdf(doc)
+        merged.save(out_path, garbage=3, deflate=True)
+    return out_path
+
+
+def translate_chunked(pdf_path: Path, src_lang=pipeline.SRC_LANG, tgt_lang: Union[str, List[str]] = pipeline.TGT_LANG,
+                      output_dir: Path = pipeline.OUTPUT_DIR, chunk_pages: int = CHUNK_PAGES,
+                      workers: int = 4, retries: int = 1, engine: Optional[str] = None,
+                      redo: Iterable[int] = (), pages: Optional[List[int]] = None) -> Union[Path, Dict[str, Path]]:
+    """
+    Belgeyi `chunk_pages` sayfalık parçalar halinde paralel çevirir ve birleştirir.
+    retries: parça başına ek deneme sayısı; redo: tamamlanmış olsa da yeniden işlenecek parça numaraları (1 tabanlı).
+    pages: yalnızca bu sayfalar (1 tabanlı) parçalanır; çıktı translate_pdf gibi `<ad>_p<ilk>-<son>.pdf`.
+    tgt_lang bir liste ise her parça tüm dillere bir kez ayrıştırılarak çevrilir, her dil
+    ayrı birleştirilir ve {dil: pdf} döner (adlandırma translate_pdf ile aynı).
+    Bir parça tüm denemelerde başarısız olursa RuntimeError; manifest sayesinde yeniden
+    çalıştırma yalnızca eksik parçaları işler.
+    """
+    pdf_path, output_dir = Path(pdf_path), Path(output_dir)
+    stem = pdf_path.stem if not pages else f"{pdf_path.stem}_p{pages[0]}-{pages[-1]}"
+    chunk_dir = output_dir / f"{stem}.chunks"
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    with fitz.open(pdf_path) as doc:
+        chunks = plan_chunks(doc.page_count, chunk_pages, pages)
+    if not chunks:
+        raise ValueError(f"{pdf_path.name}: seçilen sayfalar belgede yok ({pages[0]}-{pages[-1]})")
+    manifest = ChunkManifest(chunk_dir / "manifest.json", pdf_path, chunks)
+    redo = set(redo)
+    langs = [tgt_lang] if isinstance(tgt_lang, str) else list(tgt_lang)
+    logger.info(f"{pdf_path.name}: {len(chunks)} parça x {chunk_pages} sayfa, {workers} worker")
+
+    def run(idx: int, pages: List[int]) -> Optional[Dict[str, Path]]:
+        key = f"{pages[0]}-{pages[-1]}"
+        done = {t: Path(p) for t, p in manifest.get(key).get("pdfs", {}).items()}
+        if idx not in redo and manifest.get(key).get("state") == "done" \
+                and all(t in done and done[t].exists() for t in langs):
+            return done
+        for attempt in range(1, retries + 2):
+            manifest.update(key, state="running", attempt=attempt)
+            t0 = time.perf_counter()
+            try:
+                out = pipeline.translate_pdf(pdf_path, src_lang, langs, output_dir=chunk_dir,
+                                             engine=engine, pages=pages, optimize=False)
+                for p in out.values():
+                    if not p.exists():
+                        raise RuntimeError(f"LaTeX derlemesi PDF üretmedi: {p.with_suffix('.log')}")
+            except Exception as e:
+                logger.warning(f"Parça {key} başarısız (deneme {attempt}): {e}")
+                manifest.update(key, state="failed", error=str(e))
+                continue
+            manifest.update(key, state="done", pdfs={t: str(p) for t, p in out.items()}, error=None,
+                            wall=round(time.perf_counter() - t0, 3))
+            return out
+        return None
+
+    scheduler = None
+    if workers > 1 and pipeline._scheduler is None:
+        # parçaların segmentleri ortak batch'lerde çevrilsin
+        scheduler = BatchScheduler(pipeline.translate_texts).start()
+        pipeline.set_scheduler(scheduler)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            parts = list(pool.map(run, range(1, len(chunks) + 1), chunks))
+    finally:
+        if scheduler is not None:
+            pipeline.set_scheduler(None)
+            scheduler.stop()
+
+    failed = [f"{c[0]}-{c[-1]}" for c, p in zip(chunks, parts) if p is None]
+    if failed:
+        raise RuntimeError(f"{len(failed)} parça başarısız: {', '.join(failed)} (yeniden çalıştırınca yalnızca bunlar işlenir)")
+    out_paths = {t: output_dir / (f"{stem}_{t}.pdf" if len(langs) > 1 else f"{stem}.pdf") for t in langs}
+    with metrics.stage("merge_chunks"):
+        for t, out_path in out_paths.items():
+            merge_pdfs([p[t] for p in parts], out_path)
+            logger.info(f"Parçalar birleştirildi: {out_path}")
+    if pipeline.OPTIMIZE_PDF:  # parçalar değil, yalnızca birleşik çıktılar
+        with metrics.stage("optimize_pdf"):
+            for out_path in out_paths.values():
+                pdf_optimize.optimize(out_path, linearize=pipeline.LINEARIZE_PDF)
+    return out_paths if not isinstance(tgt_lang, str) else out_paths[langs[0]]
@@ -0,0 +1,188 @@
+"""
+Tek okumalı PDF kaynağı.
+
+Bir belge işlenirken aynı PDF birkaç kez açılıyordu: GROBID yüklemesi, görseller
+için `fitz.open`, yerel çıkarma/sayfa seçimi için yine `fitz.open`. Ağ
+depolamasında her açılış yeniden okuma demektir. `DocumentSource` dosyayı bir kez
+belleğe eşler (mmap; eşlenemiyorsa bir kez okur) ve
+
+- içerik özetini (blake2b) ve sayfa sayısını bu tampondan hesaplar,
+- GROBID'e aynı baytları gönderir,
+- `fitz.open(stream=...)` ile her açılışta aynı tamponu verir.
+
+Okuma G/Ç'si `/proc/self/io` ile ölçülür (süreç geneli; eşzamanlı belgelerde
+toplamı gösterir). read_bytes depolamadan gerçekten okunan baytlardır (mmap
+sayfa hataları dahil), rchar ise read() çağrılarının toplamıdır.
+
+    python -m modules.document_source measure belge.pdf
+"""
+import argparse
+import hashlib
+import logging
+import mmap
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentSource:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._mm: Optional[mmap.mmap] = None
+        with open(self.path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mm)
+            except (ValueError, OSError):  # boş dosya ya da eşlenemeyen dosya sistemi
+                self._view = memoryview(f.read())
+        self.size = len(self._view)
+        self._digest: Optional[str] = None
+        self._pages: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+    @property
+    def data(self) -> memoryview:
+        return self._view
+
+    @property
+    def digest(self) -> str:
+        """İçerik özeti (önbellek anahtarı)."""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self._view, digest_size=16).hexdigest()
+        return self._digest
+
+    @property
+    def page_count(self) -> int:
+        if self._pages is None:
+            with self.open_fitz() as doc:
+                self._pages = doc.page_count
+        return self._pages
+
+    def open_fitz(self) -> fitz.Document:
+        """Aynı tamponu kullanan yeni bir fitz belgesi (dosya yeniden okunmaz)."""
+        return fitz.open(stream=self._view, filetype="pdf")
+
+    def upload(self) -> tuple:
+        """requests `files=` değeri: (ad, baytlar)."""
+        return self.name, self._view.tobytes()
+
+    def close(self):
+        try:
+            self._view.release()
+            if self._mm is not None:
+                self._mm.close()
+        except BufferError:  # açık bir fitz belgesi tamponu tutuyor; GC kapatır
+            logger.debug(f"{self.name}: tampon hâlâ kullanımda, kapatma ertelendi")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+PdfLike = Union[Path, str, DocumentSource]
+
+
+def fitz_open(pdf: PdfLike) -> fitz.Document:
+    """Yol ya da DocumentSource için fitz belgesi."""
+    return pdf.open_fitz() if isinstance(pdf, DocumentSource) else fitz.open(pdf)
+
+
+# ------------------------ G/Ç ölçümü
+def read_io() -> Dict[str, int]:
+    """/proc/self/io'dan okuma sayaçları (Linux dışında boş)."""
+    out = {}
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("rchar", "read_bytes", "syscr"):
+                    out[key] = int(value)
+    except OSError:
+        pass
+    return out
+
+
+@contextmanager
+def measure_io() -> Iterator[Dict[str, int]]:
+    """Blok içindeki okuma G/Ç'si farkı; sonuç sözlüğü çıkışta doldurulur."""
+    before = read_io()
+    delta: Dict[str, int] = {}
+    try:
+        yield delta
+    finally:
+        after = read_io()
+        delta.update({k: after[k] - before[k] for k in after if k in before})
+
+
+def evict(path: Path):
+    """Dosyanın sayfa önbelleğindeki (temiz) sayfalarını bırakır: sonraki okuma depolamadan gelir."""
+    with open(path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _legacy_reads(path: Path) -> int:
+    """Önceki düzen: yükleme, görseller, özet ve sayfa sayısı için ayrı açılışlar."""
+    with open(path, "rb") as f:
+        f.read()  # GROBID yüklemesi
+    with fitz.open(path) as doc:
+        for page in doc:
+            page.get_images(full=True)
+    with open(path, "rb") as f:
+        hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def _source_reads(path: Path) -> int:
+    with DocumentSource(path) as src:
+        src.upload()
+        _ = src.digest
+        with src.open_fitz() as doc:
+            for page in doc:
+                page.get_images(full=True)
+        return src.page_count
+
+
+def measure(path: Path) -> Dict[str, Dict[str, int]]:
+    """Aynı belge için eski düzen ve tek kaynaklı okuma G/Ç'si (her biri soğuk önbellekle)."""
+    out = {}
+    for name, fn in (("legacy", _legacy_reads), ("source", _source_reads)):
+        evict(path)
+        t0 = time.perf_counter()
+        with measure_io() as io:
+            fn(path)
+        out[name] = {**io, "ms": round(1000 * (time.perf_counter() - t0), 1)}
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF okuma G/Ç ölçümü")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("measure")
+    p.add_argument("pdf", nargs="+")
+    args = parser.parse_args(argv)
+    print(f"{'belge':<32}{'düzen':>8}{'read_bytes':>14}{'rchar':>14}{'syscr':>8}{'ms':>9}")
+    for pdf in map(Path, args.pdf):
+        for name, row in measure(pdf).items():
+            print(f"{pdf.name[:31]:<32}{name:>8}{row.get('read_bytes', 0):>14}{row.get('rchar', 0):>14}"
+                  f"{row.get('syscr', 0):>8}{row['ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
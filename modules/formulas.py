@@ -0,0 +1,279 @@
+"""
+Formül alt sistemi: TEI `<formula>` içeriğini (düz Unicode metin ya da MathML)
+LaTeX matematiğine çevirir, sonucu ucuz bir sözdizimi denetiminden geçirir ve
+formül özetiyle anahtarlanan bir önbellekte tutar. Denetimden geçemeyen
+formüller Verbatim (blok) ya da \\texttt (satır içi) olarak yazılır.
+
+MathML'den çevrilen kaynak zaten LaTeX'tir; `LATEX_MARK` ile işaretlenir ve
+yeniden dönüştürülmeden/kaçırılmadan olduğu gibi denetlenir.
+
+    render("α² + β ≤ 1")               -> "\\(\\alpha ^{2} + \\beta \\leq 1\\)"
+    render("∫_0^1 f(x) dx", True)       -> "\\[\\int _0^1 f(x) dx\\]"
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Tuple
+
+from lxml import etree
+
+from modules import metrics
+
+MATHML_NS = "http://www.w3.org/1998/Math/MathML"
+CACHE_SIZE = 50000
+MAX_LENGTH = 2000  # daha uzun "formüller" genellikle yanlış etiketlenmiş metindir
+LATEX_MARK = "\ue000"  # kaynak başında: MathML'den çevrilmiş, zaten LaTeX (özel kullanım alanı karakteri)
+
+# Unicode -> LaTeX matematik komutları
+SYMBOLS = {
+    "α": r"\alpha", "β": r"\beta", "γ": r"\gamma", "δ": r"\delta", "ε": r"\varepsilon", "ϵ": r"\epsilon",
+    "ζ": r"\zeta", "η": r"\eta", "θ": r"\theta", "ϑ": r"\vartheta", "ι": r"\iota", "κ": r"\kappa",
+    "λ": r"\lambda", "μ": r"\mu", "ν": r"\nu", "ξ": r"\xi", "π": r"\pi", "ρ": r"\rho", "σ": r"\sigma",
+    "ς": r"\varsigma", "τ": r"\tau", "υ": r"\upsilon", "φ": r"\varphi", "ϕ": r"\phi", "χ": r"\chi",
+    "ψ": r"\psi", "ω": r"\omega", "Γ": r"\Gamma", "Δ": r"\Delta", "Θ": r"\Theta", "Λ": r"\Lambda",
+    "Ξ": r"\Xi", "Π": r"\Pi", "Σ": r"\Sigma", "Φ": r"\Phi", "Ψ": r"\Psi", "Ω": r"\Omega",
+    "≤": r"\leq", "≥": r"\geq", "≠": r"\neq", "≈": r"\approx", "≡": r"\equiv", "∼": r"\sim", "≃": r"\simeq",
+    "∝": r"\propto", "±": r"\pm", "∓": r"\mp", "×": r"\times", "÷": r"\div", "·": r"\cdot", "⋅": r"\cdot",
+    "∘": r"\circ", "∗": r"\ast", "−": "-", "∑": r"\sum", "∏": r"\prod", "∫": r"\int", "∬": r"\iint",
+    "∮": r"\oint", "∂": r"\partial", "∇": r"\nabla", "∞": r"\infty", "√": r"\surd", "∈": r"\in",
+    "∉": r"\notin", "∋": r"\ni", "⊂": r"\subset", "⊆": r"\subseteq", "⊃": r"\supset", "⊇": r"\supseteq",
+    "∪": r"\cup", "∩": r"\cap", "∅": r"\emptyset", "∀": r"\forall", "∃": r"\exists", "¬": r"\neg",
+    "∧": r"\wedge", "∨": r"\vee", "⊕": r"\oplus", "⊗": r"\otimes", "→": r"\to", "←": r"\leftarrow",
+    "↔": r"\leftrightarrow", "⇒": r"\Rightarrow", "⇐": r"\Leftarrow", "⇔": r"\Leftrightarrow",
+    "↦": r"\mapsto", "…": r"\ldots", "⋯": r"\cdots", "ℝ": r"\mathbb{R}", "ℕ": r"\mathbb{N}",
+    "ℤ": r"\mathbb{Z}", "ℚ": r"\mathbb{Q}", "ℂ": r"\mathbb{C}", "ℓ": r"\ell", "ħ": r"\hbar",
+    "′": "'", "″": "''", "⟨": r"\langle", "⟩": r"\rangle", "‖": r"\|", "°": r"^{\circ}",
+}
+_SUPERSCRIPTS = dict(zip("⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁼⁽⁾ⁿⁱ", "0123456789+-=()ni"))
+_SUBSCRIPTS = dict(zip("₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎ₐₑₒₓₕₖₗₘₙₚₛₜ", "0123456789+-=()aeoxhklmnpst"))
+_FUNCTIONS = ("arcsin", "arccos", "arctan", "sinh", "cosh", "tanh", "sin", "cos", "tan", "cot", "sec", "csc",
+              "exp", "log", "ln", "lim", "max", "min", "sup", "inf", "det", "dim", "ker", "deg", "gcd", "arg")
+
+# Denetimde kabul edilen komutlar (amsmath/amssymb)
+KNOWN_COMMANDS = {c.lstrip("\\").split("{")[0].split("^")[0] for c in SYMBOLS.values() if c.startswith("\\")} | {
+    "frac", "dfrac", "tfrac", "sqrt", "left", "right", "big", "Big", "bigg", "Bigg", "mathrm", "mathbf",
+    "mathit", "mathcal", "mathbb", "mathsf", "boldsymbol", "text", "operatorname", "ldots", "cdots", "vdots",
+    "ddots", "dots", "quad", "qquad", "overline", "underline", "hat", "widehat", "bar", "vec", "tilde",
+    "widetilde", "dot", "ddot", "prime", "begin", "end", "binom", "limits", "displaystyle", "mid", "lvert",
+    "rvert", "lVert", "rVert", "lfloor", "rfloor", "lceil", "rceil", "setminus", "not", "top", "perp",
+    "parallel", "cdot", "circ", "star", "dagger", "ll", "gg", "leq", "geq", "le", "ge", "ne", "neq", "to",
+    "infty", "imath", "jmath", "Re", "Im", "aleph", "angle", "triangle", "square", "tag", "underbrace",
+    "overbrace", "stackrel", "overset", "underset", "iiint", "bigcup", "bigcap", "bigoplus", "bigotimes",
+    "coprod", "varepsilon", "varphi", "vartheta", "varrho", "varpi", "colon", "ell", "hbar", "nabla",
+    "partial", "forall", "exists", "emptyset", "varnothing", "in", "notin", "ni", "subset", "supset",
+    "Rightarrow", "Leftarrow", "rightarrow", "leftarrow", "longrightarrow", "mapsto", "iff", "implies",
+} | set(_FUNCTIONS) | set(",;:!|{}_%#&$ \\")
+_ENVIRONMENTS = {"matrix", "pmatrix", "bmatrix", "vmatrix", "Vmatrix", "array", "cases", "aligned", "gathered"}
+
+_COMMAND = re.compile(r"\\([A-Za-z]+|.)")
+_LATEX_LIKE = re.compile(r"\\[A-Za-z]+|[\^_]\{")
+_FUNC = re.compile(r"(?<![A-Za-z\\])(" + "|".join(_FUNCTIONS) + r")(?![A-Za-z])")
+_ENV = re.compile(r"\\(?:begin|end)\{([^}]*)\}")
+
+_cache: "OrderedDict[bytes, Tuple[bool, str]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+# ------------------------ dönüştürme
+def _script_run(text: str, table: dict, op: str) -> str:
+    out, run = [], []
+    for ch in text + "\0":
+        if ch in table:
+            run.append(table[ch])
+            continue
+        if run:
+            out.append(f"{op}{{{''.join(run)}}}")
+            run = []
+        if ch != "\0":
+            out.append(ch)
+    return "".join(out)
+
+
+def unicode_to_latex(text: str) -> str:
+    """
+    GROBID'in düz metin formülünü LaTeX matematiğine çevirir. Zaten LaTeX olan
+    girdide (\\frac, ^{...}) mevcut komutlara ve kaçışlara dokunmaz.
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    if not _LATEX_LIKE.search(text):
+        text = text.replace("{", r"\{").replace("}", r"\}")  # küme parantezi, gruplama değil
+    text = re.sub(r"(?<!\\)([%#$])", r"\\\1", text)
+    if r"\begin" not in text:
+        text = re.sub(r"(?<!\\)&", r"\\&", text)
+    text = _script_run(_script_run(text, _SUPERSCRIPTS, "^"), _SUBSCRIPTS, "_")
+    out = []
+    for ch in text:
+        cmd = SYMBOLS.get(ch)
+        if cmd is None:
+            out.append(ch)
+        else:
+            # komuttan sonra harf gelirse birleşmesin: \alpha x
+            out.append(cmd + " " if cmd[-1].isalpha() else cmd)
+    return _FUNC.sub(r"\\\1", "".join(out)).replace("  ", " ").strip()
+
+
+def _mml(el) -> str:
+    tag = etree.QName(el).localname if isinstance(el.tag, str) else ""
+    kids = [c for c in el if isinstance(c.tag, str)]
+    sub = [_mml(c) for c in kids]
+    text = (el.text or "").strip()
+    if tag in ("mi", "mn", "mo", "mtext", "ms"):
+        if tag == "mtext":
+            return rf"\text{{{text}}}"
+        return unicode_to_latex(text) if text else ""
+    if tag == "msup" and len(sub) == 2:
+        return f"{{{sub[0]}}}^{{{sub[1]}}}"
+    if tag == "msub" and len(sub) == 2:
+        return f"{{{sub[0]}}}_{{{sub[1]}}}"
+    if tag in ("msubsup", "munderover") and len(sub) == 3:
+        return f"{{{sub[0]}}}_{{{sub[1]}}}^{{{sub[2]}}}"
+    if tag == "munder" and len(sub) == 2:
+        return f"{{{sub[0]}}}_{{{sub[1]}}}"
+    if tag == "mover" and len(sub) == 2:
+        accents = {"^": r"\hat", "¯": r"\bar", "→": r"\vec", "~": r"\tilde", "˙": r"\dot"}
+        acc = accents.get((kids[1].text or "").strip())
+        return f"{acc}{{{sub[0]}}}" if acc else rf"\overset{{{sub[1]}}}{{{sub[0]}}}"
+    if tag == "mfrac" and len(sub) == 2:
+        return rf"\frac{{{sub[0]}}}{{{sub[1]}}}"
+    if tag == "msqrt":
+        return rf"\sqrt{{{' '.join(sub)}}}"
+    if tag == "mroot" and len(sub) == 2:
+        return rf"\sqrt[{sub[1]}]{{{sub[0]}}}"
+    if tag == "mfenced":
+        fence = {"{": r"\{", "}": r"\}", "": "."}
+        op, cl = el.get("open", "("), el.get("close", ")")
+        return rf"\left{fence.get(op, op)} {', '.join(sub)} \right{fence.get(cl, cl)}"
+    if tag == "mtable":
+        return r"\begin{matrix}" + r" \\ ".join(sub) + r"\end{matrix}"
+    if tag == "mtr":
+        return " & ".join(sub)
+    return " ".join(s for s in sub if s)  # math, mrow, mtd, mstyle, semantics ...
+
+
+def mathml_to_latex(math_el) -> str:
+    return re.sub(r"\s+", " ", _mml(math_el)).strip()
+
+
+def tei_source(el) -> str:
+    """
+    TEI <formula> elemanının kaynak metni: MathML varsa LaTeX'e çevrilmiş hali
+    (LATEX_MARK ile), yoksa <label> (denklem numarası) dışındaki düz metin.
+    """
+    math = next(el.iter(f"{{{MATHML_NS}}}math"), None)
+    if math is not None:
+        latex = mathml_to_latex(math)
+        return LATEX_MARK + latex if latex else ""
+    parts = [el.text or ""]
+    for c in el:
+        if isinstance(c.tag, str) and etree.QName(c).localname != "label":
+            parts.append("".join(c.itertext()))
+        parts.append(c.tail or "")
+    return re.sub(r"\s+", " ", "".join(parts)).strip()
+
+
+# ------------------------ denetim
+def validate(latex: str) -> bool:
+    """pdflatex çağırmadan yakalanabilen hatalar: dengesiz parantez/ortam, bilinmeyen komut, yalnız ^/_."""
+    if not latex or len(latex) > MAX_LENGTH or "$" in latex.replace(r"\$", ""):
+        return False
+    if not latex.isascii():  # eşlenmemiş Unicode matematik kipinde derlenmez
+        return False
+    depth = 0
+    escaped = False
+    for ch in latex:
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth < 0:
+                return False
+    if depth or escaped:
+        return False
+    for m in _COMMAND.finditer(latex):
+        if m.group(1) not in KNOWN_COMMANDS:
+            return False
+    envs = _ENV.findall(latex)
+    if any(e not in _ENVIRONMENTS for e in envs) or len(envs) % 2:
+        return False
+    plain = re.sub(r"\\.", "", latex)
+    if not envs and ("&" in plain or "\\\\" in latex):
+        return False
+    if re.search(r"[\^_]\s*($|[\^_}])", plain):
+        return False
+    return latex.count(r"\left") == latex.count(r"\right")
+
+
+# ------------------------ önbellekli çevirme
+def _key(source: str) -> bytes:
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest()
+
+
+def convert(source: str) -> Tuple[bool, str]:
+    """(geçerli_mi, latex) — aynı formül için dönüşüm ve denetim bir kez yapılır."""
+    key = _key(source)
+    with _lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+    if hit is not None:
+        metrics.count("formula_cache_hits")
+        return hit
+    if source.startswith(LATEX_MARK):
+        latex = source[len(LATEX_MARK):].strip()  # MathML çevirisi: ikinci kez dönüştürülmez
+    else:
+        latex = unicode_to_latex(source)
+    result = (validate(latex), latex)
+    if not result[0]:
+        metrics.count("formula_fallbacks")
+    with _lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+_TT_ESCAPES = {"\\": r"\textbackslash{}", "{": r"\{", "}": r"\}", "&": r"\&", "%": r"\%", "$": r"\$",
+               "#": r"\#", "_": r"\_", "^": r"\^{}", "~": r"\~{}"}
+
+
+def _fallback_text(text: str, verbatim: bool) -> str:
+    """
+    Yedek yazım için metin: inputenc'in tanımadığı karakterler matematik komutuna
+    (Verbatim'de komut adı olarak), ASCII karşılığına ya da "?" işaretine çevrilir.
+    """
+    out = []
+    for ch in text:
+        if ord(ch) < 0x180:  # Latin-1 + Latin Extended-A (Türkçe harfler dahil)
+            out.append(ch if verbatim else _TT_ESCAPES.get(ch, ch))
+        elif ch in SYMBOLS:
+            cmd = SYMBOLS[ch]
+            out.append((cmd + " " if cmd[-1].isalpha() else cmd) if verbatim else rf"\({cmd}\)")
+        else:
+            ascii_ = unicodedata.normalize("NFKD", ch).encode("ascii", "ignore").decode() or "?"
+            out.append(ascii_ if verbatim else "".join(_TT_ESCAPES.get(c, c) for c in ascii_))
+    return "".join(out)
+
+
+def render(source: str, display: bool = False) -> str:
+    """Formülü LaTeX'e yazılacak biçimde döner; denetimden geçemezse verbatim."""
+    source = source.strip()
+    if not source.lstrip(LATEX_MARK):
+        return ""
+    ok, latex = convert(source)
+    if ok:
+        return rf"\[{latex}\]" if display else rf"\({latex}\)"
+    plain = source.lstrip(LATEX_MARK)
+    if display:
+        return f"\n\\begin{{Verbatim}}[fontsize=\\small]\n{_fallback_text(plain, True)}\n\\end{{Verbatim}}\n"
+    return rf"\texttt{{{_fallback_text(plain, False)}}}"
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
@@ -1,12 +1,305 @@
+"""
+GROBID istemcisi: birden fazla GROBID örneği arasında sağlık durumuna göre
+yük dağıtımı.
+
+Her istek, sağlıklı örnekler arasından (devam eden istek + 1) x EWMA gecikme
+skoru en düşük olana gider. Art arda `max_failures` bağlantı hatası ya da 5xx
+alan örnek havuzdan çıkarılır; arka plan thread'i `/api/isalive` ile yoklar ve
+yanıt verdiğinde geri alır. 503 GROBID'in "worker havuzu dolu" yanıtıdır (geri
+basınç): hata sayılmaz, istek başka örneğe gider, hepsi meşgulse beklenip
+yeniden denenir. Diğer 5xx yanıtları yalnızca aynı belge başka bir örnekte
+işlenebildiyse örneğe yazılır; her örnek 500 döndüyse sorun belgededir. Uç noktalar `GROBID_URLS` ortam değişkeniyle
+(virgülle ayrılmış) verilir:
+
+    GROBID_URLS=http://localhost:8070,http://localhost:8072
+
+İstek profilleri (PROFILES) GROBID'in ne kadar iş yapacağını belirler:
+konsolidasyon (CrossRef/biblio-glutton sorguları) ve koordinat üretimi pahalıdır
+ve yalnızca ihtiyaç varsa istenmelidir. `choose_profile` istenen özellikleri
+karşılayan en ucuz profili seçer.
+"""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+
 import requests
+
 from config import GROBID_URL
 
-def parse_pdf_with_grobid(pdf_path):
-    with open(pdf_path, "rb") as f:
-        response = requests.post(
-            GROBID_URL,
-            files={"input": f},
-            data={"consolidate": "1"}
-        )
+logger = logging.getLogger(__name__)
+
+FULLTEXT = "processFulltextDocument"
+HEADER = "processHeaderDocument"
+
+FormData = Union[Dict[str, str], Sequence[Tuple[str, str]]]
+
+# Profillerin sağlayabildiği çıktılar
+BODY = "body"            # gövde metni, formüller, tablolar, sayfa sonları (<pb/>)
+HEADER_META = "header"   # başlık, yazarlar, özet
+CITATIONS = "citations"  # kaynakça (ham + ayrıştırılmış)
+CONSOLIDATED = "consolidated"  # dış kaynaklarla düzeltilmiş üst veri
+COORDS = "coords"        # blokların sayfa koordinatları
+
+
+@dataclass(frozen=True)
+class RequestProfile:
+    name: str
+    service: str
+    data: Tuple[Tuple[str, str], ...]
+    provides: FrozenSet[str]
+    cost: int  # göreli maliyet sırası (küçük = ucuz)
+
+
+_NO_CONSOLIDATION = (("consolidateHeader", "0"), ("consolidateCitations", "0"))
+_COORD_ELEMENTS = ("p", "head", "formula", "figure", "s")
+
+PROFILES: Dict[str, RequestProfile] = {p.name: p for p in (
+    RequestProfile("header", HEADER, (("consolidateHeader", "0"),), frozenset({HEADER_META}), 0),
+    RequestProfile("fast", FULLTEXT, _NO_CONSOLIDATION,
+                   frozenset({BODY, HEADER_META, CITATIONS}), 1),
+    RequestProfile("layout", FULLTEXT, _NO_CONSOLIDATION + tuple(("teiCoordinates", e) for e in _COORD_ELEMENTS),
+                   frozenset({BODY, HEADER_META, CITATIONS, COORDS}), 2),
+    RequestProfile("full", FULLTEXT,
+                   (("consolidateHeader", "1"), ("consolidateCitations", "1"), ("includeRawCitations", "1"))
+                   + tuple(("teiCoordinates", e) for e in _COORD_ELEMENTS + ("ref", "biblStruct")),
+                   frozenset({BODY, HEADER_META, CITATIONS, CONSOLIDATED, COORDS}), 3),
+)}
+
+
+def choose_profile(needs: Iterable[str]) -> RequestProfile:
+    """`needs` kümesini karşılayan en ucuz profil."""
+    needs = frozenset(needs)
+    for profile in sorted(PROFILES.values(), key=lambda p: p.cost):
+        if needs <= profile.provides:
+            return profile
+    raise ValueError(f"Hiçbir GROBID profili şunları sağlamıyor: {sorted(needs)}")
+
+
+def base_url(url: str) -> str:
+    """`http://h:8070/api/processFulltextDocument` -> `http://h:8070`"""
+    url = url.strip().rstrip("/")
+    i = url.find("/api/")
+    return url[:i] if i >= 0 else url
+
+
+def endpoints_from_env(default: str = GROBID_URL) -> List[str]:
+    raw = os.environ.get("GROBID_URLS") or os.environ.get("GROBID_URL") or default
+    return [base_url(u) for u in raw.split(",") if u.strip()]
+
+
+class Endpoint:
+    __slots__ = ("url", "in_flight", "ewma", "failures", "healthy", "requests", "errors", "ejections", "busy")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.in_flight = 0
+        self.ewma: Optional[float] = None  # saniye
+        self.failures = 0                  # art arda hata
+        self.healthy = True
+        self.requests = 0
+        self.errors = 0
+        self.ejections = 0
+        self.busy = 0                      # 503 (dolu) yanıtları
+
+    def score(self, default_latency: float) -> float:
+        return (self.in_flight + 1) * (self.ewma if self.ewma is not None else default_latency)
+
+    def to_dict(self) -> dict:
+        return {s: getattr(self, s) for s in self.__slots__}
+
+
+class NoHealthyGrobid(RuntimeError):
+    pass
+
+
+class GrobidPool:
+    """
+    max_failures:   havuzdan çıkarmak için art arda hata sayısı
+    probe_interval: çıkarılmış örnekleri yoklama aralığı (sn)
+    alpha:          gecikme EWMA katsayısı
+    busy_retries:   tüm örnekler 503 döndüğünde bekleyip yeniden deneme turu
+    busy_backoff:   ilk bekleme (sn; her turda iki katı, Retry-After varsa o)
+    """
+
+    def __init__(self, endpoints: Sequence[str], session: Optional[requests.Session] = None,
+                 max_failures: int = 3, probe_interval: float = 5.0, probe_timeout: float = 2.0,
+                 alpha: float = 0.3, busy_retries: int = 3, busy_backoff: float = 1.0):
+        if not endpoints:
+            raise ValueError("En az bir GROBID uç noktası gerekli")
+        self.endpoints = [Endpoint(base_url(u)) for u in endpoints]
+        self.session = session or requests.Session()
+        self.max_failures = max_failures
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.alpha = alpha
+        self.busy_retries = busy_retries
+        self.busy_backoff = busy_backoff
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._prober: Optional[threading.Thread] = None
+
+    @property
+    def urls(self) -> List[str]:
+        return [ep.url for ep in self.endpoints]
+
+    # ------------------------ yönlendirme
+    def _acquire(self, exclude: set) -> Optional[Endpoint]:
+        with self._lock:
+            known = [ep.ewma for ep in self.endpoints if ep.ewma is not None]
+            default = min(known) if known else 1.0
+            candidates = [ep for ep in self.endpoints if ep.healthy and ep.url not in exclude]
+            if not candidates:
+                return None
+            ep = min(candidates, key=lambda e: e.score(default))
+            ep.in_flight += 1
+            ep.requests += 1
+            return ep
+
+    def _release(self, ep: Endpoint, elapsed: Optional[float], failed: bool = True):
+        """elapsed: başarılı istek süresi; None ise failed=True hata sayılır, False ise sayılmaz."""
+        with self._lock:
+            ep.in_flight -= 1
+            if elapsed is not None:
+                ep.failures = 0
+                ep.ewma = elapsed if ep.ewma is None else self.alpha * elapsed + (1 - self.alpha) * ep.ewma
+            elif failed:
+                self._fail(ep)
+
+    def _fail(self, ep: Endpoint):
+        # _lock altında çağrılır
+        ep.errors += 1
+        ep.failures += 1
+        if ep.healthy and ep.failures >= self.max_failures:
+            ep.healthy = False
+            ep.ejections += 1
+            logger.warning(f"GROBID örneği havuzdan çıkarıldı: {ep.url} ({ep.failures} art arda hata)")
+            self._start_prober()
+
+    def _busy_wait(self, resp: requests.Response, attempt: int) -> float:
+        try:
+            return min(float(resp.headers.get("Retry-After", "")), 30.0)
+        except ValueError:
+            return self.busy_backoff * 2 ** attempt
+
+    def process(self, pdf_path: Path, service: str = FULLTEXT, data: Optional[FormData] = None,
+                timeout: float = 120, content: Optional[Tuple[str, bytes]] = None,
+                stream: bool = False) -> requests.Response:
+        """
+        PDF'i en az yüklü sağlıklı örneğe gönderir. Bağlantı hatası ve 5xx
+        durumunda sıradaki örnekle yeniden dener; 4xx yanıtları olduğu gibi döner.
+        Tüm örnekler 503 ise `busy_retries` tura kadar bekleyip yeniden dener.
+        content: (ad, baytlar) verilirse dosya yeniden okunmaz (DocumentSource.upload).
+        stream: başarılı yanıtın gövdesi okunmadan döner (iter_content ile parça parça).
+        """
+        tried: set = set()
+        busy: set = set()  # bu turda 503 dönenler
+        suspects: List[Endpoint] = []  # 5xx dönenler: örnek mi bozuk belge mi, başka örnek başarınca belli olur
+        busy_rounds = 0
+        last_exc: Optional[Exception] = None
+        last_resp: Optional[requests.Response] = None
+        while True:
+            ep = self._acquire(tried)
+            if ep is None:
+                if not tried and self.probe():  # hepsi çıkarılmışsa bir kez hemen yokla
+                    continue
+                if busy and busy_rounds < self.busy_retries:
+                    wait = self._busy_wait(last_resp, busy_rounds)
+                    logger.info(f"GROBID örnekleri meşgul (503), {wait:.1f} sn sonra yeniden denenecek")
+                    time.sleep(wait)
+                    busy_rounds += 1
+                    tried -= busy
+                    busy.clear()
+                    continue
+                break
+            tried.add(ep.url)
+            t0 = time.perf_counter()
+            try:
+                if content is not None:
+                    resp = self.session.post(f"{ep.url}/api/{service}", files={"input": content},
+                                             data=data or (), timeout=timeout, stream=stream)
+                else:
+                    with open(pdf_path, "rb") as f:
+                        resp = self.session.post(f"{ep.url}/api/{service}", files={"input": f},
+                                                 data=data or (), timeout=timeout, stream=stream)
+            except requests.RequestException as e:
+                self._release(ep, None)
+                last_exc = e
+                logger.warning(f"GROBID {ep.url} erişilemedi: {e}")
+                continue
+            if resp.status_code >= 500:
+                resp.content  # akışlı yanıtta da hata gövdesini oku, bağlantı havuza dönsün
+                self._release(ep, None, failed=False)
+                if resp.status_code == 503:
+                    busy.add(ep.url)
+                    with self._lock:
+                        ep.busy += 1
+                else:
+                    suspects.append(ep)
+                last_resp = resp
+                continue
+            self._release(ep, time.perf_counter() - t0)
+            if suspects:  # belge başka örnekte işlendi: 5xx örneğin kendi hatası
+                with self._lock:
+                    for bad in suspects:
+                        self._fail(bad)
+            return resp
+        if last_resp is not None:
+            return last_resp
+        raise NoHealthyGrobid(f"Sağlıklı GROBID örneği yok ({', '.join(self.urls)}): {last_exc}")
+
+    # ------------------------ sağlık yoklaması
+    def is_alive(self, url: str) -> bool:
+        try:
+            return self.session.get(f"{url}/api/isalive", timeout=self.probe_timeout).status_code == 200
+        except requests.RequestException:
+            return False
+
+    def probe(self) -> int:
+        """Çıkarılmış örnekleri yoklar, yanıt verenleri geri alır; geri alınan sayısını döner."""
+        with self._lock:
+            ejected = [ep for ep in self.endpoints if not ep.healthy]
+        revived = 0
+        for ep in ejected:
+            if self.is_alive(ep.url):
+                with self._lock:
+                    ep.healthy, ep.failures = True, 0
+                revived += 1
+                logger.info(f"GROBID örneği havuza geri alındı: {ep.url}")
+        return revived
+
+    def _start_prober(self):
+        # _lock altında çağrılır
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe_loop, name="grobid-prober", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        while not self._stopping:
+            self._wake.wait(self.probe_interval)
+            if self._stopping:
+                return
+            self.probe()
+            with self._lock:
+                if all(ep.healthy for ep in self.endpoints):
+                    self._prober = None
+                    return
+
+    def close(self):
+        self._stopping = True
+        self._wake.set()
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            return [ep.to_dict() for ep in self.endpoints]
+
+
+def parse_pdf_with_grobid(pdf_path, profile: str = "fast"):
+    p = PROFILES[profile]
+    response = GrobidPool(endpoints_from_env()).process(pdf_path, service=p.service, data=p.data)
     response.raise_for_status()
     return response.text
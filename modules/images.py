@@ -0,0 +1,144 @@
+"""
+LaTeX'e girecek görsellerin hazırlanması.
+
+Görseller `\\includegraphics[width=0.9\\textwidth,height=0.45\\textheight,keepaspectratio]`
+ile yerleştirilir; bu kutuya sığan boyut ve hedef DPI (IMAGE_DPI, varsayılan
+150) piksel sınırını belirler. Daha büyük görseller küçültülür (büyütme yapılmaz),
+fotoğraf benzeri içerik JPEG, çizim/az renkli içerik ve saydamlık PNG yazılır.
+
+Sonuçlar görselin özetiyle (ham akış baytları, görsel sözlüğü — boyut, renk
+uzayı, Decode, SMask — ve başvurduğu nesnelerin içeriği + DPI + kutu) anahtarlanan
+bir disk önbelleğinde (IMAGE_CACHE_DIR, yoksa çıktı klasöründe .image_cache)
+tutulur; aynı görsel (ör. her sayfadaki logo ya da tekrar çalıştırma) bir kez
+işlenir, çıktı klasörüne sabit bağlantıyla konur.
+
+IMAGE_DPI=0 hazırlamayı kapatır (tam çözünürlüklü PNG).
+"""
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Tuple
+
+import fitz  # PyMuPDF
+
+from modules import metrics
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DPI = int(os.environ.get("IMAGE_DPI", "150"))
+JPEG_QUALITY = 85
+PHOTO_COLORS = 4096  # bundan çok farklı renk: fotoğraf/tarama -> JPEG
+# önbellek: IMAGE_CACHE_DIR ya da çıktı klasöründe .image_cache
+CACHE_DIR = Path(os.environ["IMAGE_CACHE_DIR"]) if os.environ.get("IMAGE_CACHE_DIR") else None
+
+# LaTeX yerleşimi (pipeline.write_latex_images) ve sayfa ölçüleri: letter, 2 cm kenar
+DISPLAY_WIDTH, DISPLAY_HEIGHT = 0.9, 0.45  # \textwidth / \textheight oranı
+TEXTWIDTH_IN = 8.5 - 2 * 2 / 2.54
+TEXTHEIGHT_IN = 11.0 - 2 * 2 / 2.54
+_PHOTO_FILTERS = ("DCTDecode", "JPXDecode")
+
+
+@dataclass
+class PreparedImage:
+    path: Path
+    bytes_in: int     # PDF içindeki ham akış boyutu
+    bytes_out: int
+    resampled: bool
+    cached: bool
+
+
+def display_box_in() -> Tuple[float, float]:
+    return DISPLAY_WIDTH * TEXTWIDTH_IN, DISPLAY_HEIGHT * TEXTHEIGHT_IN
+
+
+def target_size(width: int, height: int, dpi: int = IMAGE_DPI) -> Tuple[int, int]:
+    """keepaspectratio ile kutuya sığan baskı boyutunda `dpi` için gereken piksel boyutu."""
+    box_w, box_h = display_box_in()
+    scale = min(1.0, box_w * dpi / width, box_h * dpi / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+_REF = re.compile(rb"(\d+) 0 R")
+
+
+def _object_digest(doc: fitz.Document, xref: int, depth: int = 2) -> bytes:
+    """
+    Nesne sözlüğü + ham akış özeti. Dolaylı başvurular (SMask, ICC/Indexed renk
+    uzayı) xref numarası yerine içerikleriyle girer: aynı görsel farklı belgelerde
+    aynı anahtarı, aynı baytlı ama farklı sözlüklü görseller farklı anahtarı alır.
+    """
+    obj = doc.xref_object(xref, compressed=True).encode()
+    if depth:
+        obj = _REF.sub(lambda m: _object_digest(doc, int(m.group(1)), depth - 1).hex().encode(), obj)
+    h = hashlib.blake2b(obj, digest_size=16)
+    if doc.xref_is_stream(xref):
+        h.update(doc.xref_stream_raw(xref) or b"")
+    return h.digest()
+
+
+def _cache_key(doc: fitz.Document, xref: int, dpi: int) -> str:
+    h = hashlib.blake2b(_object_digest(doc, xref), digest_size=16)
+    h.update(f"{dpi}:{DISPLAY_WIDTH}:{DISPLAY_HEIGHT}:{JPEG_QUALITY}".encode())
+    return h.hexdigest()
+
+
+def _place(cached: Path, dest: Path):
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(cached, dest)
+    except OSError:  # farklı dosya sistemi
+        shutil.copyfile(cached, dest)
+
+
+def encode(pix: fitz.Pixmap, filter_name: str = "", dpi: int = IMAGE_DPI,
+           transparent: bool = False) -> Tuple[bytes, str, bool]:
+    """Pixmap'i küçültüp kodlar -> (baytlar, uzantı, küçültüldü_mü). transparent: SMask'lı görsel (PNG)."""
+    if pix.colorspace is not None and pix.colorspace.n > 3:  # CMYK vb. PNG/JPEG'e RGB olarak
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    tw, th = target_size(pix.width, pix.height, dpi)
+    resampled = (tw, th) != (pix.width, pix.height)
+    if resampled:
+        pix = fitz.Pixmap(pix, tw, th, None)
+    photo = not (pix.alpha or transparent) and (filter_name in _PHOTO_FILTERS or pix.color_count() > PHOTO_COLORS)
+    if photo:
+        return pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY), ".jpg", resampled
+    return pix.tobytes("png"), ".png", resampled
+
+
+def prepare(doc: fitz.Document, img: tuple, dest_base: Path, dpi: int = IMAGE_DPI) -> PreparedImage:
+    """
+    `page.get_images(full=True)` öğesini hazırlayıp `dest_base` + .jpg/.png olarak
+    yazar. Önbellekte varsa yeniden kodlamaz.
+    """
+    cache_dir = CACHE_DIR or dest_base.parent / ".image_cache"
+    xref, smask, filter_name = img[0], img[1], img[8]
+    bytes_in, key = len(doc.xref_stream_raw(xref) or b""), _cache_key(doc, xref, dpi)
+    for ext in (".jpg", ".png"):
+        cached = cache_dir / f"{key}{ext}"
+        if cached.exists():
+            dest = dest_base.with_suffix(ext)
+            _place(cached, dest)
+            metrics.count("image_cache_hits")
+            return PreparedImage(dest, bytes_in, cached.stat().st_size, False, True)
+    pix = fitz.Pixmap(doc, xref)  # SMask uygulanmaz: saydamlık ayrı nesnede
+    if smask:
+        try:
+            pix = fitz.Pixmap(pix, fitz.Pixmap(doc, smask))
+        except Exception as e:  # maske boyutu/renk uzayı uyuşmuyor: maskesiz, ama yine PNG
+            logger.debug(f"SMask {smask} uygulanamadı: {e}")
+    data, ext, resampled = encode(pix, filter_name, dpi, transparent=bool(smask))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cached = cache_dir / f"{key}{ext}"
+    tmp = cached.with_name(f"{cached.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(cached)
+    dest = dest_base.with_suffix(ext)
+    _place(cached, dest)
+    metrics.count("images_resampled", int(resampled))
+    metrics.count("images_jpeg", int(ext == ".jpg"))
+    return PreparedImage(dest, bytes_in, len(data), resampled, False)
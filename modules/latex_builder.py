@@ -1,6 +1,8 @@
 from pathlib import Path
 from typing import Dict, List
 
+from modules.formulas import render as render_formula
+
 LATEX_HEADER = r"""
 \documentclass[12pt]{article}
 \usepackage[utf8]{inputenc}
@@ -62,9 +64,7 @@ def build_latex_document(
         # Formüller
         if page_num in formulas:
             for formula in formulas[page_num]:
-                content.append("\\begin{equation}\n")
-                content.append(formula.strip() + "\n")
-                content.append("\\end{equation}\n\n")
+                content.append(render_formula(formula, display=True) + "\n\n")
 
         # Görseller
         if page_num in images:
@@ -0,0 +1,133 @@
+"""
+GROBID'siz yerel çıkarma: PyMuPDF `get_text("dict")` çıktısından sayfa
+numaralı bloklar üretir.
+
+Formüller yazı tipi ve glif sezgileriyle işaretlenir (matematik yazı tipleri,
+Unicode matematik sembolleri, üst simge bayrağı, tek harfli italik değişkenler)
+ve aşağı akıştaki aşamaların beklediği Block biçimine (formula_spans) dönüştürülür.
+Tek sütunlu, kısa belgeler (ödev setleri, notlar) için GROBID'e gerek bırakmaz.
+"""
+import logging
+import re
+import unicodedata
+from collections import Counter
+from typing import Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from modules.blocks import Block, TEXT
+from modules.document_source import PdfLike, fitz_open
+
+logger = logging.getLogger(__name__)
+
+HEAD = "head"
+
+# get_text("dict") bayrakları: görsel baytlarını yükleme
+_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+_SUPERSCRIPT, _ITALIC, _BOLD = 1, 2, 16
+
+MATH_FONT = re.compile(r"math|cmmi|cmsy|cmex|cmbsy|msam|msbm|symbol|stix|euler|eufm|rsfs|mtextra|esint|wasy",
+                       re.IGNORECASE)
+MARGIN = 0.08  # sayfa üst/alt kenar payı: yinelenen başlık/altbilgi ve sayfa numaraları
+
+
+def _is_math_char(ch: str) -> bool:
+    o = ord(ch)
+    return (unicodedata.category(ch) == "Sm"
+            or 0x0370 <= o <= 0x03FF        # Yunanca
+            or 0x2070 <= o <= 0x209F        # üst/alt simgeler
+            or 0x2190 <= o <= 0x22FF        # oklar, matematik operatörleri
+            or 0x27C0 <= o <= 0x27EF or 0x2980 <= o <= 0x2AFF
+            or 0x1D400 <= o <= 0x1D7FF)     # matematik alfanümerik
+
+
+def is_math_span(span: dict, body_size: float) -> bool:
+    text = span["text"].strip()
+    if not text:
+        return False
+    if MATH_FONT.search(span["font"]):
+        return True
+    if span["flags"] & _SUPERSCRIPT and span["size"] < body_size:
+        return True
+    if len(text) <= 2 and text.isalpha() and span["flags"] & _ITALIC:
+        return True  # italik tek harf: değişken adı
+    math = sum(_is_math_char(c) for c in text)
+    return math * 2 >= len(text.replace(" ", ""))
+
+
+def _block_parts(block: dict, body_size: float) -> List[Tuple[bool, str]]:
+    """Satırları birleştirir; ardışık matematik span'larını tek formül parçası yapar."""
+    parts: List[Tuple[bool, str]] = []
+    for line in block["lines"]:
+        if parts:
+            is_f, prev = parts[-1]
+            if not is_f and prev.endswith("-") and line["spans"] and line["spans"][0]["text"][:1].islower():
+                parts[-1] = (False, prev[:-1])  # satır sonu tirelemesi
+            else:
+                parts.append((False, " "))
+        for span in line["spans"]:
+            is_f = is_math_span(span, body_size)
+            text = span["text"]
+            if parts and (parts[-1][0] == is_f or (parts[-1][0] and not text.strip())):
+                parts[-1] = (parts[-1][0], parts[-1][1] + text)
+            else:
+                parts.append((is_f, text))
+    return parts
+
+
+def _body_size(sizes: Counter) -> float:
+    return sizes.most_common(1)[0][0] if sizes else 10.0
+
+
+def iter_pdf_blocks(pdf_path: PdfLike, pages: Optional[List[int]] = None) -> Iterator[Block]:
+    """PDF'i sayfa sayfa okuyup blokları belge sırasıyla üretir (pages: 1 tabanlı alt küme)."""
+    sizes: Counter = Counter()  # karakter ağırlıklı yazı boyutu histogramı (gövde boyutu için)
+    with fitz_open(pdf_path) as doc:
+        for pno in pages or range(1, doc.page_count + 1):
+            page = doc[pno - 1]
+            height = page.rect.height
+            raw = [b for b in page.get_text("dict", flags=_TEXT_FLAGS)["blocks"] if b["type"] == 0]
+            for b in raw:
+                for line in b["lines"]:
+                    for s in line["spans"]:
+                        if s["text"].strip() and not MATH_FONT.search(s["font"]):
+                            sizes[round(s["size"])] += len(s["text"])
+            body = _body_size(sizes)
+            for b in raw:
+                y0, y1 = b["bbox"][1], b["bbox"][3]
+                if y1 < height * MARGIN or y0 > height * (1 - MARGIN):
+                    continue
+                parts = _block_parts(b, body)
+                if not any(t.strip() for _, t in parts):
+                    continue
+                if all(is_f or not t.strip() for is_f, t in parts):
+                    formula = Block.formula("".join(t for _, t in parts))
+                    formula.page, formula.coords = pno, tuple(b["bbox"])
+                    yield formula
+                    continue
+                spans = [s for line in b["lines"] for s in line["spans"] if s["text"].strip()]
+                heading = len(b["lines"]) <= 2 and spans and (
+                    max(s["size"] for s in spans) >= body * 1.15 or all(s["flags"] & _BOLD for s in spans))
+                yield Block.from_parts(HEAD if heading else TEXT, parts, page=pno, coords=tuple(b["bbox"]))
+
+
+def is_simple(pdf_path: PdfLike, max_pages: int = 4, sample_pages: int = 3) -> bool:
+    """
+    Yerel çıkarma için uygun mu: kısa, metin katmanı olan ve tek sütunlu belge.
+    Sağ yarıda başlayıp sayfanın yarısından dar bloklar metnin çoğunu tutuyorsa
+    iki sütunlu sayılır (GROBID okuma sırasını daha iyi kurar).
+    """
+    with fitz_open(pdf_path) as doc:
+        if doc.page_count > max_pages:
+            return False
+        total = right = 0
+        for page in list(doc)[:sample_pages]:
+            w = page.rect.width
+            for x0, y0, x1, y1, text, _, btype in page.get_text("blocks"):
+                if btype != 0:
+                    continue
+                n = len(text.strip())
+                total += n
+                if x0 > w * 0.45 and (x1 - x0) < w * 0.5:
+                    right += n
+        return total > 0 and right < 0.25 * total
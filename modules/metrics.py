@@ -0,0 +1,270 @@
+"""
+Pipeline ölçümleri: aşama başına duvar/CPU süresi, sayaçlar, JSON-lines çalışma
+raporu, özet tablo ve Prometheus metin formatı.
+
+Kullanım:
+    with metrics.document("makale.pdf"):
+        with metrics.stage("grobid_parse"):
+            ...
+        metrics.count("blocks", 42)
+
+`document` aktif belgeyi contextvar ile taşır; bu yüzden ölçümler aynı thread
+(veya contextvar kopyalanan görev, bkz. `bind`) içinde belgeye yazılır. Ortak
+batching thread'inde oluşan sayaçlar (generate çağrıları, tokenlar) yalnızca
+çalışma toplamına eklenir. CPU süresi süreç CPU'sudur (torch'un kendi
+thread'leri dahil); eşzamanlı belgelerde aynı CPU birden fazla aşamaya yansıyabilir.
+
+Başka bir aşamanın içinde açılan aşama (create_latex_pdf içindeki latex_repair)
+onun alt aşaması olarak kaydedilir: özet tabloda altında gösterilir, toplama
+katılmaz. Aynı adla iç içe açılan aşama (dıştaki aşamanın içinde çağrılan
+dekoratörlü fonksiyon) ayrıca sayılmaz.
+"""
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, ExitStack
+from pathlib import Path
+from typing import Dict, Optional
+
+STAGES = ("grobid_parse", "extract_text_and_formulas", "translate_blocks",
+          "extract_images_from_pdf", "create_latex_pdf")
+
+
+class StageTiming:
+    __slots__ = ("wall", "cpu", "calls", "parent")
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.calls = 0
+        self.parent: Optional[str] = None  # alt aşamaysa içinde açıldığı aşama
+
+    def add(self, wall: float, cpu: float, calls: int = 1, parent: Optional[str] = None):
+        self.wall += wall
+        self.cpu += cpu
+        self.calls += calls
+        self.parent = self.parent or parent
+
+    def to_dict(self) -> dict:
+        out = {"wall": round(self.wall, 4), "cpu": round(self.cpu, 4), "calls": self.calls}
+        if self.parent:
+            out["parent"] = self.parent
+        return out
+
+
+class DocumentMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.wall = 0.0
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.stages: Dict[str, StageTiming] = defaultdict(StageTiming)
+        self.counters: Counter = Counter()
+
+    def to_dict(self) -> dict:
+        return {
+            "doc": self.name,
+            "status": self.status,
+            "error": self.error,
+            "started": self.started,
+            "wall": round(self.wall, 4),
+            "stages": {k: v.to_dict() for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class RunMetrics:
+    """Bir çalışmanın (main.py koşusu veya servis ömrü) toplam ölçümleri."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.report_path: Optional[Path] = None
+        self.n_documents = 0
+        self.stages: Dict[str, StageTiming] = defaultdict(StageTiming)
+        self.counters: Counter = Counter()
+
+    def configure(self, report_path: Optional[Path]):
+        """Belge bitince satır eklenecek JSON-lines dosyasını ayarlar (None: kapalı)."""
+        self.report_path = Path(report_path) if report_path else None
+        if self.report_path:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def add_stage(self, name: str, wall: float, cpu: float, calls: int = 1, parent: Optional[str] = None):
+        with self._lock:
+            self.stages[name].add(wall, cpu, calls, parent)
+
+    def add_count(self, name: str, n: int):
+        with self._lock:
+            self.counters[name] += n
+
+    def finish(self, doc: DocumentMetrics):
+        with self._lock:
+            self.n_documents += 1
+            self.counters[f"documents_{doc.status}"] += 1
+            if self.report_path:
+                with open(self.report_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(doc.to_dict(), ensure_ascii=False) + "\n")
+
+    def reset(self):
+        with self._lock:
+            self.n_documents = 0
+            self.stages.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> dict:
+        """Toplamların seçilebilir kopyası: worker süreci bunu ana sürece döndürür (bkz. merge)."""
+        with self._lock:
+            return {"documents": self.n_documents,
+                    "stages": {k: v.to_dict() for k, v in self.stages.items()},
+                    "counters": dict(self.counters)}
+
+    def merge(self, snap: dict):
+        """Başka bir süreçten gelen `snapshot` toplamlarını ekler (rapor satırlarını süreç kendisi yazar)."""
+        with self._lock:
+            self.n_documents += snap["documents"]
+            for name, s in snap["stages"].items():
+                self.stages[name].add(s["wall"], s["cpu"], s["calls"], s.get("parent"))
+            self.counters.update(snap["counters"])
+
+    # ------------------------
+    # Çıktılar
+    # ------------------------
+    def summary_table(self) -> str:
+        with self._lock:
+            n_docs = self.n_documents
+            stages = {k: (v.wall, v.cpu, v.calls, v.parent) for k, v in self.stages.items()}
+            counters = dict(self.counters)
+        # pay yalnızca üst düzey aşamalardan: alt aşamaların süresi zaten üst aşamada
+        top = [s for s in stages if not stages[s][3] or stages[s][3] not in stages]
+        total = sum(stages[s][0] for s in top) or 1.0
+        order = [s for s in STAGES if s in top] + sorted(s for s in top if s not in STAGES)
+        lines = [f"{'aşama':<28}{'çağrı':>7}{'duvar (s)':>12}{'cpu (s)':>12}{'pay':>8}"]
+        lines.append("-" * len(lines[0]))
+
+        def row(name: str, label: str, depth: int):
+            wall, cpu, calls, _ = stages[name]
+            lines.append(f"{label:<28}{calls:>7}{wall:>12.2f}{cpu:>12.2f}{100 * wall / total:>7.1f}%")
+            for child in sorted(s for s in stages if stages[s][3] == name):
+                row(child, "  " * depth + "└ " + child, depth + 1)
+
+        for name in order:
+            row(name, name, 1)
+        lines.append("-" * len(lines[0]))
+        lines.append(f"{'toplam':<28}{'':>7}{sum(stages[s][0] for s in top):>12.2f}"
+                     f"{sum(stages[s][1] for s in top):>12.2f}{100.0 if top else 0.0:>7.1f}%")
+        lines.append(f"belgeler: {n_docs}  " + "  ".join(f"{k}={v}" for k, v in sorted(counters.items())))
+        return "\n".join(lines)
+
+    def prometheus_text(self, prefix: str = "pdf_translator") -> str:
+        with self._lock:
+            stages = {k: (v.wall, v.cpu, v.calls) for k, v in self.stages.items()}
+            counters = dict(self.counters)
+        out = [
+            f"# HELP {prefix}_stage_seconds_total Aşama başına toplam süre.",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        for name, (wall, cpu, _) in sorted(stages.items()):
+            out.append(f'{prefix}_stage_seconds_total{{stage="{name}",clock="wall"}} {wall:.6f}')
+            out.append(f'{prefix}_stage_seconds_total{{stage="{name}",clock="cpu"}} {cpu:.6f}')
+        out += [f"# HELP {prefix}_stage_calls_total Aşama çağrı sayısı.",
+                f"# TYPE {prefix}_stage_calls_total counter"]
+        for name, (_, _, calls) in sorted(stages.items()):
+            out.append(f'{prefix}_stage_calls_total{{stage="{name}"}} {calls}')
+        out += [f"# HELP {prefix}_events_total Pipeline sayaçları.",
+                f"# TYPE {prefix}_events_total counter"]
+        for name, value in sorted(counters.items()):
+            out.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+        return "\n".join(out) + "\n"
+
+
+RUN = RunMetrics()
+_current: contextvars.ContextVar = contextvars.ContextVar("document_metrics", default=None)
+_open: contextvars.ContextVar = contextvars.ContextVar("open_stages", default=())  # iç içe açık aşamalar
+_stage_hooks: list = []  # stage adı alıp context manager döndüren çağrılabilirler (ör. profiler)
+
+
+def add_stage_hook(hook):
+    _stage_hooks.append(hook)
+
+
+def remove_stage_hook(hook):
+    if hook in _stage_hooks:
+        _stage_hooks.remove(hook)
+
+
+def current() -> Optional[DocumentMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def document(name: str, run: RunMetrics = RUN):
+    doc = DocumentMetrics(name)
+    token = _current.set(doc)
+    t0 = time.perf_counter()
+    try:
+        yield doc
+        doc.status = "ok"
+    except BaseException as e:
+        doc.status, doc.error = "failed", str(e)
+        raise
+    finally:
+        doc.wall = time.perf_counter() - t0
+        _current.reset(token)
+        run.finish(doc)
+
+
+def bind(fn):
+    """`fn`'i çağrının contextvar kopyasında çalıştırır: havuz thread'leri belgeye ve üst aşamaya yazar."""
+    ctx = contextvars.copy_context()
+    return functools.wraps(fn)(lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs))
+
+
+@contextmanager
+def stage(name: str, run: RunMetrics = RUN, call: bool = True):
+    """
+    call=False: süre eklenir ama çağrı sayılmaz (belge başına bir kez sayılması
+    gereken, pencere pencere açılan aşamalar).
+    """
+    stack = _open.get()
+    if name in stack:  # aynı aşama zaten açık: süresi dıştakinde
+        yield
+        return
+    parent = stack[-1] if stack else None
+    token = _open.set(stack + (name,))
+    w0, c0 = time.perf_counter(), time.process_time()
+    try:
+        with ExitStack() as hooks:
+            for hook in list(_stage_hooks):
+                hooks.enter_context(hook(name))
+            yield
+    finally:
+        wall, cpu = time.perf_counter() - w0, time.process_time() - c0
+        _open.reset(token)
+        run.add_stage(name, wall, cpu, int(call), parent)
+        doc = _current.get()
+        if doc is not None:
+            doc.stages[name].add(wall, cpu, int(call), parent)
+
+
+def timed(name: str):
+    """Fonksiyonu `stage(name)` içinde çalıştıran dekoratör."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def count(name: str, n: int = 1, run: RunMetrics = RUN):
+    if not n:
+        return
+    run.add_count(name, n)
+    doc = _current.get()
+    if doc is not None:
+        doc.counters[name] += n
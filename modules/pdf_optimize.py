@@ -0,0 +1,101 @@
+"""
+Derleme sonrası PDF küçültme.
+
+pdflatex çıktısında kullanılmayan nesneler, sıkıştırılmamış akışlar, aynı
+görselin/fontun tekrarları ve tam gömülü fontlar kalabilir. PyMuPDF ile:
+
+- fontlar yalnızca kullanılan glifleri içerecek şekilde alt kümeye indirilir;
+- garbage=4: kullanılmayan nesneler atılır, aynı içerikli akışlar (görsel,
+  font) tek nesnede birleştirilir;
+- akışlar (görsel ve fontlar dahil) deflate ile sıkıştırılır, küçük nesneler
+  nesne akışlarına (use_objstms) toplanır.
+
+Doğrusallaştırma (web'de hızlı görüntüleme) MuPDF 1.26'dan beri desteklenmiyor;
+istenirse önce PyMuPDF denenir, olmazsa `qpdf --linearize` (kuruluysa) kullanılır.
+
+Sonuç dosyası girdiden büyükse özgün dosya korunur.
+"""
+import logging
+import os
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from modules import metrics
+
+logger = logging.getLogger(__name__)
+
+QPDF = os.environ.get("QPDF", "qpdf")
+
+
+@dataclass
+class OptimizeResult:
+    path: Path
+    bytes_in: int
+    bytes_out: int
+    seconds: float
+    linearized: bool = False
+
+    @property
+    def saved(self) -> float:
+        return 1 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+
+def _save(doc: fitz.Document, out: Path, linear: bool) -> bool:
+    """Optimize kayıt; doğrusallaştırılabildiyse True."""
+    opts = dict(garbage=4, clean=True, deflate=True, deflate_images=True, deflate_fonts=True, use_objstms=1)
+    if linear:
+        try:
+            doc.save(out, linear=True, **{**opts, "use_objstms": 0})  # doğrusal dosyada nesne akışı yok
+            return True
+        except Exception as e:  # MuPDF >= 1.26: "Linearisation is no longer supported"
+            logger.debug(f"PyMuPDF doğrusallaştıramadı: {e}")
+    doc.save(out, **opts)
+    return False
+
+
+def _qpdf_linearize(path: Path) -> bool:
+    if shutil.which(QPDF) is None:
+        return False
+    tmp = path.with_name(f"{path.stem}.lin.{os.getpid()}.pdf")
+    proc = subprocess.run([QPDF, "--linearize", str(path), str(tmp)], stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, text=True)
+    if proc.returncode not in (0, 3) or not tmp.exists():  # 3: uyarılarla başarılı
+        tmp.unlink(missing_ok=True)
+        logger.warning(f"qpdf doğrusallaştıramadı: {proc.stderr.strip()[:200]}")
+        return False
+    tmp.replace(path)
+    return True
+
+
+def optimize(pdf_path: Path, linearize: bool = False, subset_fonts: bool = True) -> OptimizeResult:
+    """`pdf_path`'i yerinde küçültür; boyut ve süreyi sayaçlara (pdf_bytes_in/out) yazar."""
+    pdf_path = Path(pdf_path)
+    t0 = time.perf_counter()
+    bytes_in = pdf_path.stat().st_size
+    tmp = pdf_path.with_name(f"{pdf_path.stem}.opt.{os.getpid()}.pdf")
+    with fitz.open(pdf_path) as doc:
+        if subset_fonts:
+            try:
+                doc.subset_fonts()
+            except Exception as e:  # bazı Type3/bozuk fontlar alt kümelenemez
+                logger.warning(f"{pdf_path.name}: font alt kümeleme atlandı: {e}")
+        linear = _save(doc, tmp, linearize)
+    if tmp.stat().st_size < bytes_in:
+        tmp.replace(pdf_path)
+    else:
+        tmp.unlink()
+        linear = False
+    if linearize and not linear:
+        linear = _qpdf_linearize(pdf_path)
+    res = OptimizeResult(pdf_path, bytes_in, pdf_path.stat().st_size, time.perf_counter() - t0, linear)
+    metrics.count("pdf_bytes_in", res.bytes_in)
+    metrics.count("pdf_bytes_out", res.bytes_out)
+    metrics.count("pdf_linearized", int(linear))
+    logger.info(f"{pdf_path.name}: {res.bytes_in / 1024:.0f} KB -> {res.bytes_out / 1024:.0f} KB "
+                f"(%{100 * res.saved:.0f} küçüldü, {res.seconds:.2f} sn{', doğrusal' if linear else ''})")
+    return res
@@ -0,0 +1,190 @@
+"""
+Aşama bazlı profil çıkarma.
+
+Her pipeline aşaması (metrics.stage) cProfile ile sarılır ve belge başına
+`<out>/<belge>/<aşama>.prof` ile flamegraph için katlanmış yığın dosyası
+`<aşama>.collapsed` yazılır (flamegraph.pl / speedscope ile açılabilir).
+İsteğe bağlı olarak model.generate çevresinde torch operatör profili
+(`torch_generate_<n>.json`, chrome://tracing formatı) kaydedilir.
+
+    python -m modules.profiling report output/profile [--top 15]
+"""
+import argparse
+import cProfile
+import logging
+import pstats
+import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from modules import metrics
+
+logger = logging.getLogger(__name__)
+
+_active: Optional["StageProfiler"] = None
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name) or "run"
+
+
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":  # C fonksiyonları
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def collapsed_stacks(stats: pstats.Stats, min_seconds: float = 1e-6) -> List[str]:
+    """
+    cProfile çağrı grafiğinden katlanmış yığınlar üretir ("a;b;c <mikrosaniye>").
+    cProfile yalnızca çağıran->çağrılan kenarlarını tuttuğundan, derin yollar
+    kenar başına kümülatif süre oranıyla ölçeklenir (yaklaşık değerdir).
+    """
+    st = stats.stats
+    callees: Dict[tuple, Dict[tuple, tuple]] = defaultdict(dict)
+    for func, (_, _, _, _, callers) in st.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge
+    out: Dict[str, float] = defaultdict(float)
+
+    def walk(func, stack: List[str], scale: float):
+        _, _, tt, ct, _ = st[func]
+        frames = stack + [_label(func)]
+        if tt * scale >= min_seconds:
+            out[";".join(frames)] += tt * scale
+        for child, edge in callees.get(func, {}).items():
+            child_ct = st[child][3]
+            if not child_ct or _label(child) in stack:
+                continue
+            child_scale = scale * min(1.0, edge[3] / child_ct)
+            if child_ct * child_scale >= min_seconds:
+                walk(child, frames, child_scale)
+
+    for func, (_, _, _, _, callers) in st.items():
+        if not callers:
+            walk(func, [], 1.0)
+    return [f"{k} {int(v * 1e6)}" for k, v in sorted(out.items()) if int(v * 1e6) > 0]
+
+
+class StageProfiler:
+    """metrics.stage kancası: her aşama çağrısını cProfile ile sarar."""
+
+    def __init__(self, out_dir: Path, torch_ops: bool = False):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.torch_ops = torch_ops
+        self._lock = threading.Lock()
+        self._local = threading.local()  # bu thread'de açık profil var mı
+        self._torch_calls = 0
+
+    def _doc_dir(self) -> Path:
+        doc = metrics.current()
+        d = self.out_dir / _safe_name(doc.name if doc else "run")
+        d.mkdir(parents=True, exist_ok=True)
+        return d
+
+    @contextmanager
+    def __call__(self, stage_name: str):
+        if getattr(self._local, "active", False):
+            # iç içe aşama (create_latex_pdf içinde latex_repair): süresi dıştaki profilde.
+            # Python < 3.12'de ikinci enable() dıştaki profiler'ı sessizce değiştirirdi.
+            yield
+            return
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            # aynı anda başka bir profiler aktif (3.12+, eşzamanlı belgeler); bu çağrıyı atla
+            yield
+            return
+        self._local.active = True
+        try:
+            yield
+        finally:
+            prof.disable()
+            self._local.active = False
+            self._save(self._doc_dir(), stage_name, prof)
+
+    def _save(self, doc_dir: Path, stage_name: str, prof: cProfile.Profile):
+        path = doc_dir / f"{stage_name}.prof"
+        with self._lock:
+            stats = pstats.Stats(prof)
+            if path.exists():  # aynı belgede aşama tekrar çağrıldıysa birleştir
+                stats.add(str(path))
+            stats.dump_stats(str(path))
+            (doc_dir / f"{stage_name}.collapsed").write_text("\n".join(collapsed_stacks(stats)) + "\n",
+                                                            encoding="utf-8")
+
+    @contextmanager
+    def torch_profile(self, label: str):
+        try:
+            from torch.profiler import profile, ProfilerActivity
+        except ImportError:
+            yield
+            return
+        with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+            yield
+        with self._lock:
+            self._torch_calls += 1
+            n = self._torch_calls
+        doc_dir = self._doc_dir()
+        prof.export_chrome_trace(str(doc_dir / f"torch_{label}_{n}.json"))
+        (doc_dir / f"torch_{label}_{n}.txt").write_text(
+            prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=30), encoding="utf-8")
+
+
+def enable(out_dir: Path, torch_ops: bool = False) -> StageProfiler:
+    global _active
+    disable()
+    _active = StageProfiler(out_dir, torch_ops)
+    metrics.add_stage_hook(_active)
+    logger.info(f"Profil çıktıları: {out_dir}")
+    return _active
+
+
+def disable():
+    global _active
+    if _active is not None:
+        metrics.remove_stage_hook(_active)
+        _active = None
+
+
+def torch_ops(label: str = "generate"):
+    """model.generate çevresi için: torch profili açıksa kaydeder, değilse etkisiz."""
+    if _active is None or not _active.torch_ops:
+        return nullcontext()
+    return _active.torch_profile(label)
+
+
+def report(out_dir: Path, top: int = 15) -> str:
+    """Her belge ve aşama için en çok öz-süre harcayan fonksiyonları listeler."""
+    lines = []
+    for doc_dir in sorted(p for p in Path(out_dir).iterdir() if p.is_dir()):
+        lines.append(f"=== {doc_dir.name}")
+        for prof in sorted(doc_dir.glob("*.prof")):
+            stats = pstats.Stats(str(prof))
+            total = stats.total_tt or 1e-9
+            lines.append(f"--- {prof.stem}  (toplam {stats.total_tt:.3f}s)")
+            rows = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:top]
+            for func, (cc, nc, tt, ct, _) in rows:
+                lines.append(f"  {tt:9.4f}s {100 * tt / total:5.1f}%  {ct:9.4f}s cum  {nc:>8} çağrı  {_label(func)}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profil raporu")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    rep = sub.add_parser("report", help="Aşama başına en sıcak fonksiyonlar")
+    rep.add_argument("dir", type=str)
+    rep.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+    if args.cmd == "report":
+        print(report(Path(args.dir), args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+CPU kaynak planlaması: birden fazla çeviri süreci aynı makinede çalışırken
+torch'un varsayılan iş parçacığı sayısı (tüm çekirdekler) her süreçte ayrı
+ayrı kullanılır ve çekirdekler aşırı paylaşılır.
+
+`plan(procs)` kullanılabilir çekirdekleri (sched_getaffinity ve cgroup CPU
+kotası) süreçlere böler; `apply(plan, index)` süreç başına torch intra-op /
+inter-op iş parçacıklarını ve OMP/MKL/OpenBLAS ortam değişkenlerini ayarlar,
+istenirse süreci kendi çekirdek kümesine sabitler.
+
+Kalibrasyon birkaç (süreç, iş parçacığı) yapılandırmasında token/sn ölçer ve
+en iyisini `output/thread_plan.json` dosyasına yazar; `plan` aynı çekirdek
+sayısı için bu ölçümü sezgiye tercih eder.
+
+    python main.py calibrate --procs 1,2,4
+    python -m modules.resources plan --procs 2
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PLAN_FILE = Path(os.environ.get("THREAD_PLAN_FILE", "output/thread_plan.json"))
+_THREAD_ENV = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+@dataclass
+class ThreadPlan:
+    cpus: int                 # sürecin kullanabileceği toplam çekirdek (kota dahil)
+    procs: int                # aynı makinede çalışan çeviri süreci sayısı
+    intra_op: int             # süreç başına torch intra-op iş parçacığı
+    inter_op: int = 1
+    core_sets: Optional[List[List[int]]] = None  # sabitleme: süreç başına çekirdek listesi
+    source: str = "heuristic"  # heuristic | calibrated | manual
+
+
+# ------------------------ çekirdek tespiti
+def _affinity() -> List[int]:
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        return list(range(os.cpu_count() or 1))
+
+
+def cgroup_quota(root: Path = Path("/sys/fs/cgroup")) -> Optional[float]:
+    """cgroup CPU kotası (çekirdek cinsinden); sınırsızsa None. v2 cpu.max, v1 cfs_quota_us."""
+    try:
+        quota, period = (root / "cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    n = len(_affinity())
+    quota = cgroup_quota()
+    if quota is not None:
+        n = min(n, max(1, math.floor(quota)))
+    return max(1, n)
+
+
+# ------------------------ planlama
+def _load_calibration(path: Path = PLAN_FILE) -> Dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def plan(procs: int = 1, cpus: Optional[int] = None, threads: Optional[int] = None, pin: bool = False,
+         calibration: Optional[Path] = PLAN_FILE) -> ThreadPlan:
+    """
+    `procs` süreç için iş parçacığı planı. threads verilirse o kullanılır; yoksa
+    aynı çekirdek sayısında bu süreç sayısı için kalibrasyon ölçümü, o da yoksa
+    çekirdekler / süreç.
+    """
+    procs = max(1, procs)
+    cpus = cpus or available_cpus()
+    source = "manual" if threads else "heuristic"
+    if not threads and calibration is not None:
+        cal = _load_calibration(calibration)
+        best = cal.get("best", {}).get(str(procs)) if cal.get("cpus") == cpus else None
+        if best:
+            threads, source = best["intra_op"], "calibrated"
+    intra = max(1, threads or cpus // procs)
+    core_sets = None
+    if pin:
+        cores = _affinity()[:cpus]
+        per = max(1, len(cores) // procs)
+        core_sets = [cores[i * per:(i + 1) * per] or cores for i in range(procs)]
+    return ThreadPlan(cpus, procs, intra, 1, core_sets, source)
+
+
+def thread_env(p: ThreadPlan) -> Dict[str, str]:
+    """Alt süreçlere (torch içe aktarılmadan önce) verilecek ortam değişkenleri."""
+    return {k: str(p.intra_op) for k in _THREAD_ENV}
+
+
+def apply(p: ThreadPlan, index: int = 0):
+    """Planı bu sürece uygular; torch yüklü değilse yalnızca ortam değişkenleri ayarlanır."""
+    os.environ.update(thread_env(p))
+    if p.core_sets:
+        try:
+            os.sched_setaffinity(0, p.core_sets[index % len(p.core_sets)])
+        except (AttributeError, OSError) as e:
+            logger.warning(f"Çekirdek sabitleme yapılamadı: {e}")
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(p.intra_op)
+    try:
+        torch.set_num_interop_threads(p.inter_op)
+    except RuntimeError:
+        pass  # paralel iş başladıktan sonra değiştirilemez; intra-op yeterli
+    logger.info(f"torch iş parçacıkları: intra={p.intra_op} inter={p.inter_op} "
+                f"({p.procs} süreç / {p.cpus} çekirdek, {p.source})")
+
+
+# ------------------------ kalibrasyon
+def _sample_texts(n: int = 32) -> List[str]:
+    from benchmarks.synth import paragraphs
+    return paragraphs(n, seed=7, words=30)
+
+
+def _worker(seconds: float, batch: int) -> dict:
+    """Alt süreç: modeli yükler, ısınır, `seconds` boyunca çevirip token/sn döner."""
+    import pipeline
+    from modules import metrics
+    texts = _sample_texts(batch)
+    pipeline.ensure_model_loaded()
+    pipeline.translate_texts(texts[:4])
+    metrics.RUN.reset()
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        pipeline.translate_texts(texts)
+    elapsed = time.perf_counter() - t0
+    return {"tokens": metrics.RUN.counters["tokens_out"], "seconds": elapsed}
+
+
+def measure(procs: int, threads: int, seconds: float = 20.0, batch: int = 16, pin: bool = False) -> float:
+    """`procs` süreci aynı anda `threads` iş parçacığıyla çalıştırır; toplam token/sn."""
+    p = plan(procs, threads=threads, pin=pin, calibration=None)
+    children = []
+    for i in range(procs):
+        cmd = [sys.executable, "-m", "modules.resources", "_worker", "--seconds", str(seconds),
+               "--batch", str(batch), "--threads", str(threads)]
+        if p.core_sets:
+            cmd += ["--cores", ",".join(map(str, p.core_sets[i]))]
+        children.append(subprocess.Popen(cmd, env={**os.environ, **thread_env(p)}, stdout=subprocess.PIPE, text=True))
+    total = 0.0
+    for child in children:
+        out, _ = child.communicate()
+        if child.returncode != 0:
+            raise RuntimeError(f"Kalibrasyon süreci başarısız (procs={procs}, threads={threads})")
+        r = json.loads(out.strip().splitlines()[-1])
+        total += r["tokens"] / r["seconds"]
+    return total
+
+
+def calibrate(procs_options: Sequence[int] = (1, 2, 4), seconds: float = 20.0, pin: bool = False,
+              path: Path = PLAN_FILE) -> Dict:
+    """
+    Her süreç sayısı için iş parçacığı adaylarını (çekirdek/süreç ve yarısı, 1)
+    ölçer; süreç sayısı başına en iyi iş parçacığı sayısını ve token/sn'yi kaydeder.
+    """
+    cpus = available_cpus()
+    results, best = [], {}
+    for procs in procs_options:
+        if procs > cpus:
+            continue
+        full = max(1, cpus // procs)
+        for threads in sorted({full, max(1, full // 2), 1}, reverse=True):
+            rate = measure(procs, threads, seconds, pin=pin)
+            results.append({"procs": procs, "intra_op": threads, "tokens_per_sec": round(rate, 1)})
+            logger.info(f"procs={procs} threads={threads}: {rate:.1f} token/sn")
+            if rate > best.get(str(procs), {}).get("tokens_per_sec", 0):
+                best[str(procs)] = {"intra_op": threads, "tokens_per_sec": round(rate, 1)}
+    data = {"cpus": cpus, "pin": pin, "measured_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "best": best, "results": results}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="İş parçacığı planı ve kalibrasyon")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_plan = sub.add_parser("plan", help="Bu makine için planı göster")
+    p_plan.add_argument("--procs", type=int, default=1)
+    p_plan.add_argument("--pin", action="store_true")
+    p_cal = sub.add_parser("calibrate", help="Yapılandırmaları ölç ve en iyisini kaydet")
+    p_cal.add_argument("--procs", type=str, default="1,2,4", help="Denenecek süreç sayıları")
+    p_cal.add_argument("--seconds", type=float, default=20.0, help="Yapılandırma başına ölçüm süresi")
+    p_cal.add_argument("--pin", action="store_true", help="Süreçleri çekirdek kümelerine sabitle")
+    p_cal.add_argument("--out", type=str, default=str(PLAN_FILE))
+    p_w = sub.add_parser("_worker")
+    p_w.add_argument("--seconds", type=float, default=20.0)
+    p_w.add_argument("--batch", type=int, default=16)
+    p_w.add_argument("--threads", type=int, default=1)
+    p_w.add_argument("--cores", type=str, default="")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "plan":
+        print(json.dumps(asdict(plan(args.procs, pin=args.pin)), indent=2))
+    elif args.cmd == "calibrate":
+        logging.basicConfig(level=logging.INFO)
+        data = calibrate([int(x) for x in args.procs.split(",")], args.seconds, args.pin, Path(args.out))
+        for procs, row in sorted(data["best"].items(), key=lambda kv: int(kv[0])):
+            print(f"{procs} süreç: {row['intra_op']} iş parçacığı, {row['tokens_per_sec']} token/sn")
+        print(f"Kaydedildi: {args.out}")
+    else:
+        cores = [int(c) for c in args.cores.split(",") if c]
+        apply(ThreadPlan(available_cpus(), 1, args.threads, 1, [cores] if cores else None, "manual"))
+        print(json.dumps(_worker(args.seconds, args.batch)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Toplu çalıştırmada iş sıralaması.
+
+Dosyalar glob sırasıyla işlenirse baştaki 400 sayfalık bir kitap arkasındaki
+tüm kısa makaleleri bekletir. Her işin maliyeti sayfa sayısı ve dosya
+boyutundan (fitz ile yalnızca xref tablosu okunur) saniye cinsinden tahmin
+edilir ve işler en kısa iş önce (SJF) verilir.
+
+Yaşlandırma (aging): bekleyen işin etkin maliyeti beklediği her saniye için
+`aging` saniye azalır. Aynı anda kuyruğa giren işlerin sırası değişmez (main.py
+toplu çalıştırmada yalnızca SJF sırası etkilidir); işler zamanla geldiğinde
+(servis kuyruğu, `queue work --wait` ile tüketilen paylaşılan kuyruk) sürekli
+yeni kısa iş gelse de büyük iş en fazla ~maliyet/aging saniye sonra öne geçer,
+aç kalmaz. Açık öncelik (yüksek önce) maliyetten önce gelir.
+
+JobQueue main.py'de süreç havuzunu (boşalan süreç sıradakini alır) ve servis
+worker'larını besler; paylaşılan SQLite kuyruğu aynı anahtarı
+(`cost + aging * geliş`) sorguda kullanır (bkz. workqueue.claim).
+
+Politikaları karşılaştırmak için tamamlanma süreleri (ortalama / p95) hem
+gerçek çalışmada hem tahmini maliyetlerle simülasyonda raporlanır:
+
+    python main.py --input pdfs/ --schedule sjf --priority acil.pdf=10
+    python -m modules.scheduling simulate pdfs/ --workers 2
+"""
+import argparse
+import heapq
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import fitz  # PyMuPDF
+
+POLICIES = ("fifo", "sjf")
+AGING = 0.1  # bekleme saniyesi başına maliyetten düşülen saniye
+# tahmini süre (sn): belge başına sabit (model/LaTeX derleme) + sayfa + MB
+JOB_SECONDS, PAGE_SECONDS, MB_SECONDS = 10.0, 4.0, 0.5
+
+
+@dataclass
+class JobInfo:
+    path: Path
+    pages: int
+    size: int          # bayt
+    priority: int = 0  # yüksek önce
+    cost: float = 0.0  # tahmini süre (sn)
+    arrival: float = field(default=0.0, compare=False)
+
+
+def estimate(path: Path, priority: int = 0) -> JobInfo:
+    """Sayfa sayısı ve boyuttan maliyet tahmini; açılamayan PDF'te yalnızca boyut."""
+    path = Path(path)
+    size = path.stat().st_size
+    try:
+        with fitz.open(path) as doc:
+            pages = doc.page_count
+    except Exception:
+        pages = 0
+    return JobInfo(path, pages, size, priority, JOB_SECONDS + PAGE_SECONDS * pages + MB_SECONDS * size / 2**20)
+
+
+def parse_priorities(specs: Sequence[str]) -> Dict[str, int]:
+    """["kitap.pdf=-5", "acil.pdf=10"] → {dosya adı: öncelik}."""
+    out = {}
+    for spec in specs:
+        name, _, value = spec.rpartition("=")
+        if not name:
+            raise ValueError(f"Öncelik 'dosya=sayı' biçiminde olmalı: {spec}")
+        out[name] = int(value)
+    return out
+
+
+class JobQueue:
+    """
+    Thread-safe iş kuyruğu. fifo: öncelik, sonra geliş sırası. sjf: öncelik, sonra
+    `cost - aging * bekleme`. Bekleyen herkes aynı hızda yaşlandığından anahtar
+    `cost + aging * geliş` olarak bir kez hesaplanır ve yığında tutulur.
+    """
+
+    def __init__(self, policy: str = "sjf", aging: float = AGING, clock: Callable[[], float] = time.monotonic):
+        if policy not in POLICIES:
+            raise ValueError(f"Bilinmeyen politika: {policy}")
+        self.policy, self.aging, self.clock = policy, aging, clock
+        self._heap: list = []
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def put(self, job: JobInfo):
+        with self._cond:
+            job.arrival = self.clock()
+            key = job.arrival if self.policy == "fifo" else job.cost + self.aging * job.arrival
+            heapq.heappush(self._heap, (-job.priority, key, self._seq, job))
+            self._seq += 1
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[JobInfo]:
+        """Sıradaki iş; kuyruk `timeout` boyunca boş kalırsa None."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._heap, timeout):
+                return None
+            return heapq.heappop(self._heap)[3]
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap)
+
+
+def order(jobs: Sequence[JobInfo], policy: str = "sjf") -> List[JobInfo]:
+    """Aynı anda kuyruğa giren işlerin verilme sırası."""
+    q = JobQueue(policy, clock=lambda: 0.0)
+    for j in jobs:
+        q.put(j)
+    return [q.get() for _ in jobs]
+
+
+# ------------------------ rapor
+def percentile(values: Sequence[float], p: float) -> float:
+    """En yakın sıra yöntemiyle yüzdelik (p: 0-100)."""
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[max(0, math.ceil(p / 100 * len(s)) - 1)]
+
+
+def completion_stats(times: Sequence[float]) -> Dict[str, float]:
+    """Tamamlanma süreleri (iş gelişinden bitişe, sn) → n, ortalama, p95, en büyük."""
+    return {"n": len(times), "mean": sum(times) / len(times) if times else 0.0,
+            "p95": percentile(times, 95), "max": max(times, default=0.0)}
+
+
+def format_stats(name: str, stats: Dict[str, float]) -> str:
+    return (f"{name:<12} {stats['n']:>4} iş  ortalama {stats['mean']:>8.1f} sn  "
+            f"p95 {stats['p95']:>8.1f} sn  en uzun {stats['max']:>8.1f} sn")
+
+
+def simulate(jobs: Sequence[JobInfo], policy: str = "sjf", workers: int = 1, aging: float = AGING,
+             arrivals: Optional[Sequence[float]] = None) -> List[float]:
+    """
+    Tahmini maliyetlerle olay simülasyonu: `workers` worker, iş i `arrivals[i]`
+    anında gelir (varsayılan hepsi 0). İş başına tamamlanma süresini döner.
+    """
+    now = 0.0
+    q = JobQueue(policy, aging, clock=lambda: now)
+    arrivals = list(arrivals) if arrivals is not None else [0.0] * len(jobs)
+    incoming = sorted(range(len(jobs)), key=lambda i: arrivals[i])
+    index = {id(j): i for i, j in enumerate(jobs)}
+    free = [0.0] * max(1, workers)  # worker'ların boşa çıkacağı anlar
+    done = [0.0] * len(jobs)
+    k = 0
+    while k < len(incoming) or len(q):
+        now = min(free)
+        if not len(q):
+            now = max(now, arrivals[incoming[k]])
+        while k < len(incoming) and arrivals[incoming[k]] <= now:
+            q.put(jobs[incoming[k]])
+            k += 1
+        job = q.get(timeout=0)
+        i = index[id(job)]
+        w = free.index(min(free))
+        free[w] = now + job.cost
+        done[i] = free[w] - arrivals[i]
+    return done
+
+
+def main(argv=None):
+    from modules import pdf_utils
+    parser = argparse.ArgumentParser(description="İş sıralama politikalarını tahmini maliyetlerle karşılaştır")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("simulate")
+    p.add_argument("input", type=str, help="PDF klasörü")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--aging", type=float, default=AGING)
+    p.add_argument("--priority", action="append", default=[], help="dosya=öncelik (tekrarlanabilir)")
+    args = parser.parse_args(argv)
+    prio = parse_priorities(args.priority)
+    jobs = [estimate(f, prio.get(f.name, 0)) for f in sorted(pdf_utils.list_pdfs(Path(args.input)))]
+    for policy in POLICIES:
+        print(format_stats(policy, completion_stats(simulate(jobs, policy, args.workers, args.aging))))
+
+
+if __name__ == "__main__":
+    main()
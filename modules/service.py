@@ -0,0 +1,302 @@
+"""
+Kalıcı çeviri servisi: model bir kez yüklenir, PDF işleri yerel bir HTTP API
+üzerinden kuyruğa alınır ve aynı süreç içinde sırayla/eşzamanlı işlenir.
+
+Uç noktalar:
+    POST /jobs?name=x.pdf&src=..&tgt=..&priority=0   gövde: PDF baytları  -> 202 {"id": ...}
+    GET  /jobs/<id>                        iş durumu (JSON)
+    GET  /jobs/<id>/result                 çevrilmiş PDF
+    GET  /health                           servis durumu
+    GET  /metrics                          Prometheus metin formatı (--metrics ile)
+"""
+import argparse
+import json
+import signal
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+import pipeline
+from modules import metrics, resources, scheduling
+from modules.batcher import BatchScheduler
+from modules.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+
+
+class QueueFull(Exception):
+    pass
+
+
+class ServiceStopping(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    pdf_path: str
+    src_lang: str
+    tgt_lang: str
+    state: str = "queued"  # queued -> running -> done / failed
+    error: Optional[str] = None
+    output: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d.pop("pdf_path")
+        return d
+
+
+class TranslationService:
+    """
+    İş kuyruğu + sabit sayıda worker thread. Model, GROBID oturumu ve çeviri
+    önbelleği pipeline modülünde süreç boyunca tutulur; işler bunları paylaşır.
+    Bekleyen işler scheduling.JobQueue ile sıralanır (varsayılan sjf + yaşlandırma).
+    """
+
+    def __init__(self, work_dir: Path, workers: int = 1, max_queue: int = 32,
+                 batch_tokens: int = 4096, batch_wait: float = 0.05,
+                 schedule: str = "sjf", aging: float = scheduling.AGING):
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, workers)
+        self.jobs: Dict[str, Job] = {}
+        self.max_queue = max_queue
+        self._queue = scheduling.JobQueue(schedule, aging)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        # tüm işlerin segmentleri tek bir batching kuyruğunu paylaşır
+        self.scheduler = BatchScheduler(pipeline.translate_texts, max_tokens=batch_tokens, max_wait=batch_wait)
+
+    def start(self):
+        pipeline.ensure_model_loaded()
+        pipeline.set_scheduler(self.scheduler.start())
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"translate-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info(f"Servis hazır: {self.workers} worker")
+
+    def submit(self, name: str, data: bytes, src_lang: str, tgt_lang: str, priority: int = 0) -> Job:
+        if self._stopping.is_set():
+            raise ServiceStopping("Servis kapanıyor")
+        if len(self._queue) >= self.max_queue:
+            raise QueueFull("İş kuyruğu dolu")
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = self.work_dir / job_id
+        job_dir.mkdir(parents=True)
+        pdf_path = job_dir / (Path(name).stem or "document")
+        pdf_path = pdf_path.with_suffix(".pdf")
+        pdf_path.write_bytes(data)
+        job = Job(job_id, name, str(pdf_path), src_lang, tgt_lang)
+        with self._lock:
+            self.jobs[job_id] = job
+        self._queue.put(scheduling.estimate(pdf_path, priority))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            states = [j.state for j in self.jobs.values()]
+        return {
+            "workers": self.workers,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "done": states.count("done"),
+            "failed": states.count("failed"),
+            "stopping": self._stopping.is_set(),
+            "grobid": [{"url": ep["url"], "healthy": ep["healthy"], "in_flight": ep["in_flight"]}
+                       for ep in pipeline.grobid_pool().stats()],
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Yeni iş kabulünü durdurur; kuyruktaki işler bitene kadar bekler."""
+        self._stopping.set()  # worker'lar kuyruk boşalınca çıkar
+        if wait:
+            for t in self._threads:
+                t.join()
+            pipeline.set_scheduler(None)
+            self.scheduler.stop()
+        logger.info("Servis durduruldu.")
+
+    def _worker(self):
+        while True:
+            info = self._queue.get(timeout=0.2)
+            if info is None:
+                if self._stopping.is_set():
+                    return
+                continue
+            job = self.get(info.path.parent.name)  # iş klasörü: <work_dir>/<id>/
+            job.state, job.started = "running", time.time()
+            try:
+                pdf_path = Path(job.pdf_path)
+                # ayrı klasör: çıktı <ad>.pdf yüklenen <ad>.pdf'in (ve eşlenmiş tamponunun) üzerine yazılmaz
+                out = Path(pipeline.translate_pdf(pdf_path, job.src_lang, job.tgt_lang,
+                                                  output_dir=pdf_path.parent / "out"))
+                # eski/eksik çıktı sonuç diye sunulmasın (1 sn: dosya sistemi zaman çözünürlüğü)
+                if out == pdf_path or not out.exists() or out.stat().st_mtime < job.started - 1:
+                    raise RuntimeError(f"Çeviri PDF'i üretilmedi: {out}")
+                job.output, job.state = str(out), "done"
+            except Exception as e:
+                logger.error(f"İş başarısız {job.id}: {e}")
+                job.error, job.state = str(e), "failed"
+            finally:
+                job.finished = time.time()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: TranslationService = None
+    expose_metrics: bool = False
+
+    def log_message(self, fmt, *args):
+        logger.info("%s - %s" % (self.address_string(), fmt % args))
+
+    def _json(self, code: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self._json(404, {"error": "not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            return self._json(400, {"error": "boş gövde"})
+        if length > MAX_UPLOAD_BYTES:
+            return self._json(413, {"error": "dosya çok büyük"})
+        data = self.rfile.read(length)
+        if not data.startswith(b"%PDF"):
+            return self._json(415, {"error": "PDF bekleniyor"})
+        qs = parse_qs(url.query)
+        name = qs.get("name", ["document.pdf"])[0]
+        src = qs.get("src", [pipeline.SRC_LANG])[0]
+        tgt = qs.get("tgt", [pipeline.TGT_LANG])[0]
+        try:
+            priority = int(qs.get("priority", ["0"])[0])
+        except ValueError:
+            return self._json(400, {"error": "priority tamsayı olmalı"})
+        try:
+            job = self.service.submit(name, data, src, tgt, priority)
+        except QueueFull as e:
+            return self._json(429, {"error": str(e)})
+        except ServiceStopping as e:
+            return self._json(503, {"error": str(e)})
+        self._json(202, {"id": job.id, "status_url": f"/jobs/{job.id}"})
+
+    def do_GET(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if parts == ["health"]:
+            return self._json(200, self.service.stats())
+        if parts == ["metrics"] and self.expose_metrics:
+            body = metrics.RUN.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if len(parts) < 2 or parts[0] != "jobs":
+            return self._json(404, {"error": "not found"})
+        job = self.service.get(parts[1])
+        if job is None:
+            return self._json(404, {"error": "iş bulunamadı"})
+        if len(parts) == 2:
+            return self._json(200, job.to_dict())
+        if parts[2:] == ["result"]:
+            if job.state != "done" or not job.output or not Path(job.output).exists():
+                return self._json(409, {"error": f"sonuç hazır değil ({job.state})"})
+            data = Path(job.output).read_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Disposition", f'attachment; filename="{Path(job.output).name}"')
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        self._json(404, {"error": "not found"})
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, workers: int = 1,
+          max_queue: int = 32, work_dir: Path = pipeline.OUTPUT_DIR / "service",
+          batch_tokens: int = 4096, batch_wait: float = 0.05,
+          expose_metrics: bool = False, report_path: Optional[Path] = None, procs: int = 1,
+          warmup: bool = False, schedule: str = "sjf", aging: float = scheduling.AGING):
+    metrics.RUN.configure(report_path)
+    # worker'lar modeli paylaşır (generate kilitli); çekirdekler yalnızca aynı makinedeki servis süreçlerine bölünür
+    resources.apply(resources.plan(procs))
+    service = TranslationService(work_dir, workers=workers, max_queue=max_queue,
+                                 batch_tokens=batch_tokens, batch_wait=batch_wait, schedule=schedule, aging=aging)
+    service.start()
+    if warmup:
+        # istek kabul edilmeden önce: ilk işin model/GROBID/TeX ilk çağrı maliyetini ödememesi için
+        from modules import warmup as warm
+        results = warm.run()
+        if not all(r.ok for r in results):
+            service.shutdown(wait=True)
+            raise SystemExit("Isınma başarısız:\n" + warm.format_results(results))
+    handler = type("Handler", (_Handler,), {"service": service, "expose_metrics": expose_metrics})
+    httpd = ThreadingHTTPServer((host, port), handler)
+
+    def _stop(signum, frame):
+        logger.info(f"Sinyal alındı ({signum}), servis kapatılıyor...")
+        # serve_forever'ı aynı thread'den durdurmak kilitlenir
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    logger.info(f"Çeviri servisi dinliyor: http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        service.shutdown(wait=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Academic PDF Translator servis modu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Eşzamanlı işlenecek belge sayısı")
+    parser.add_argument("--max-queue", type=int, default=32, help="Bekleyen iş üst sınırı")
+    parser.add_argument("--work-dir", type=str, default=str(pipeline.OUTPUT_DIR / "service"))
+    parser.add_argument("--batch-tokens", type=int, default=4096, help="Batch başına token bütçesi (padding dahil)")
+    parser.add_argument("--batch-wait-ms", type=float, default=50, help="Batch dolmasını en fazla bekleme süresi")
+    parser.add_argument("--metrics", action="store_true", help="GET /metrics Prometheus uç noktasını aç")
+    parser.add_argument("--report", type=str, default=None, help="Belge başına JSON-lines çalışma raporu")
+    parser.add_argument("--procs", type=int, default=1,
+                        help="Aynı makinede çalışan servis süreci sayısı (torch iş parçacıkları buna göre bölünür)")
+    parser.add_argument("--warmup", action="store_true",
+                        help="İş kabul etmeden önce modeli, GROBID'i ve LaTeX'i ısıt; başarısızsa başlama")
+    parser.add_argument("--schedule", choices=scheduling.POLICIES, default="sjf",
+                        help="Bekleyen işlerin sırası: sjf (tahmini kısa iş önce, yaşlandırmalı) ya da fifo")
+    parser.add_argument("--aging", type=float, default=scheduling.AGING,
+                        help="sjf yaşlandırması: bekleme saniyesi başına tahmini maliyetten düşülen saniye")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.max_queue, Path(args.work_dir),
+          args.batch_tokens, args.batch_wait_ms / 1000.0,
+          expose_metrics=args.metrics, report_path=Path(args.report) if args.report else None,
+          procs=args.procs, warmup=args.warmup, schedule=args.schedule, aging=args.aging)
+
+
+if __name__ == "__main__":
+    main()
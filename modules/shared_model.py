@@ -0,0 +1,221 @@
+"""
+Model ağırlıklarını süreçler arasında paylaşma.
+
+Her çeviri süreci modeli ayrı yüklerse (M2M100 418M fp32 ~1.9 GB) aynı
+ağırlıklar bellekte süreç sayısı kadar tutulur. İki paylaşım kipi:
+
+- mmap: ağırlıklar bir kez `.safetensors` dosyasına yazılır (soğuk başlangıçta
+  dosya kilidiyle tek süreç yazar, diğerleri bekler); her süreç dosyayı
+  salt-okunur kopyala-yaz (MAP_PRIVATE) eşler ve tensörler doğrudan bu
+  sayfalara bakar. Fiziksel sayfalar çekirdeğin sayfa önbelleğinde tek kopya.
+- fork: model ana süreçte yüklenir, `gc.freeze()` sonrası worker'lar fork ile
+  açılır; tensör depoları yazılmadığı için sayfalar kopyalanmaz.
+
+Süreç başına RSS/PSS `/proc/<pid>/smaps_rollup` ile ölçülür (PSS paylaşılan
+sayfaları süreç sayısına böler; gerçek bellek maliyetini gösterir).
+
+    MODEL_SHARING=mmap python main.py --input pdfs/ --procs 8
+    python -m modules.shared_model report --procs 4 --mode mmap
+"""
+import argparse
+import fcntl
+import gc
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODES = ("none", "mmap", "fork")
+SHARED_DIR = Path(os.environ.get("SHARED_MODEL_DIR", "output/models"))
+
+_DTYPES = {"F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+           "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool"}
+_maps: List[mmap.mmap] = []  # eşlemeler süreç ömrü boyunca açık kalır
+_export_lock = threading.Lock()  # aynı süreçteki thread'ler; süreçler arası `.lock` dosyası
+
+
+# ------------------------ safetensors
+def checkpoint_path(model_name: str) -> Path:
+    return SHARED_DIR / (model_name.replace("/", "--") + ".safetensors")
+
+
+def read_header(path: Path) -> Tuple[Dict[str, dict], int]:
+    """safetensors başlığı -> ({ad: {dtype, shape, data_offsets}}, veri bölümünün ofseti)."""
+    with open(path, "rb") as f:
+        (n,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(n))
+    header.pop("__metadata__", None)
+    return header, 8 + n
+
+
+def mmap_state_dict(path: Path) -> dict:
+    """Dosyayı MAP_PRIVATE eşler; her tensör kopyalanmadan eşlenmiş baytlara bakar."""
+    import torch
+    header, base = read_header(path)
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    _maps.append(mm)
+    state = {}
+    for name, info in header.items():
+        dtype = getattr(torch, _DTYPES[info["dtype"]])
+        a, b = info["data_offsets"]
+        count = (b - a) // torch.empty((), dtype=dtype).element_size()
+        t = torch.frombuffer(mm, dtype=dtype, count=count, offset=base + a) if count else torch.empty(0, dtype=dtype)
+        state[name] = t.view(info["shape"])
+    return state
+
+
+def export(model, path: Path):
+    """Ağırlıkları safetensors olarak yazar (bağlı ağırlıklar bir kez)."""
+    from safetensors.torch import save_model
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    save_model(model, str(tmp))
+    tmp.replace(path)
+    logger.info(f"Paylaşımlı ağırlıklar yazıldı: {path} ({path.stat().st_size / 2**20:.0f} MB)")
+
+
+def ensure_exported(path: Path, load_model):
+    """
+    Dosya yoksa `load_model()` sonucunu bir kez dışa aktarır. Soğuk başlangıçta
+    aynı anda açılan worker süreçleri `<dosya>.lock` üzerindeki flock'ta bekler;
+    kilidi alan ilk süreç yazar, diğerleri hazır dosyayı eşler.
+    """
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _export_lock, open(path.with_name(f"{path.name}.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # dosya kapanınca bırakılır
+        if not path.exists():
+            export(load_model(), path)
+            gc.collect()
+
+
+def load_mmap(model_cls, model_name: str):
+    """
+    `model_cls` modelini eşlenmiş ağırlıklarla kurar. Dosya yoksa model bir kez
+    normal yüklenip dışa aktarılır. Sınıfın kendi başlatması (rastgele ağırlık)
+    atlanır; eşlenmiş tensörler `assign=True` ile parametrelerin yerine geçer.
+    """
+    from transformers import AutoConfig
+    path = checkpoint_path(model_name)
+    ensure_exported(path, lambda: model_cls.from_pretrained(model_name))
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:  # eski sürümler
+        from contextlib import nullcontext as no_init_weights
+    with no_init_weights():
+        model = model_cls(AutoConfig.from_pretrained(model_name))
+    missing, unexpected = model.load_state_dict(mmap_state_dict(path), strict=False, assign=True)
+    model.tie_weights()
+    if unexpected:
+        raise RuntimeError(f"{path}: beklenmeyen ağırlıklar: {unexpected[:5]}")
+    tied = {k for k in missing if k.endswith("lm_head.weight") or "embed_tokens" in k}
+    if set(missing) - tied:
+        raise RuntimeError(f"{path}: eksik ağırlıklar: {sorted(set(missing) - tied)[:5]}")
+    gc.collect()  # başlatmada ayrılan özel kopyalar bırakılsın
+    return model.eval().requires_grad_(False)
+
+
+def prepare_fork():
+    """fork'tan hemen önce: mevcut nesneleri GC taramasından çıkar (başlık yazımı sayfa kopyalatmasın)."""
+    gc.collect()
+    gc.freeze()
+
+
+# ------------------------ bellek ölçümü
+def memory_usage(pid="self") -> Dict[str, float]:
+    """smaps_rollup'tan MB cinsinden rss, pss, shared, private."""
+    fields: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0])
+    except OSError:
+        return {}
+
+    def mb(*keys):
+        return round(sum(fields.get(k, 0) for k in keys) / 1024, 1)
+
+    return {"pid": os.getpid() if pid == "self" else int(pid), "rss_mb": mb("Rss"), "pss_mb": mb("Pss"),
+            "shared_mb": mb("Shared_Clean", "Shared_Dirty"), "private_mb": mb("Private_Clean", "Private_Dirty")}
+
+
+def child_pids() -> List[int]:
+    pids: List[int] = []
+    for task in Path("/proc/self/task").glob("*"):
+        try:
+            pids += [int(p) for p in (task / "children").read_text().split()]
+        except OSError:
+            continue
+    return sorted(set(pids))
+
+
+def format_memory(rows: List[Dict[str, float]]) -> str:
+    lines = [f"{'pid':>8}{'RSS MB':>10}{'PSS MB':>10}{'paylaşılan':>12}{'özel':>10}"]
+    for r in rows:
+        lines.append(f"{r['pid']:>8}{r['rss_mb']:>10.1f}{r['pss_mb']:>10.1f}{r['shared_mb']:>12.1f}{r['private_mb']:>10.1f}")
+    if rows:
+        lines.append(f"{'toplam':>8}{sum(r['rss_mb'] for r in rows):>10.1f}{sum(r['pss_mb'] for r in rows):>10.1f}"
+                     "   (PSS toplamı gerçek fiziksel kullanım)")
+    return "\n".join(lines)
+
+
+# ------------------------ ölçüm aracı
+def _report_worker(conn):
+    import pipeline
+    pipeline.ensure_model_loaded()
+    pipeline.translate_texts(["Bellek ölçümü için kısa bir cümle."])
+    conn.send(memory_usage())
+    conn.recv()  # ana süreç hepsini ölçene kadar bekle
+
+
+def report(procs: int, mode: str) -> List[Dict[str, float]]:
+    """`procs` worker modeli `mode` ile yükleyip bir cümle çevirir; süreç başına bellek."""
+    import multiprocessing
+    import pipeline
+    pipeline.MODEL_SHARING = mode
+    if mode == "fork":
+        pipeline.ensure_model_loaded()
+        prepare_fork()
+    ctx = multiprocessing.get_context("fork")
+    pipes, workers = [], []
+    for _ in range(procs):
+        parent, child = ctx.Pipe()
+        w = ctx.Process(target=_report_worker, args=(child,))
+        w.start()
+        pipes.append(parent)
+        workers.append(w)
+    for p in pipes:
+        p.recv()
+    rows = [memory_usage(w.pid) for w in workers]  # hepsi yüklüyken aynı anda ölç
+    for p in pipes:
+        p.send("done")
+    for w in workers:
+        w.join()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Model paylaşımının süreç başına bellek etkisi")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("report")
+    p.add_argument("--procs", type=int, default=4)
+    p.add_argument("--mode", choices=MODES, default="mmap")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    print(f"{args.procs} süreç, paylaşım: {args.mode}")
+    print(format_memory(report(args.procs, args.mode)))
+
+
+if __name__ == "__main__":
+    main()
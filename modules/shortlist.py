@@ -0,0 +1,282 @@
+"""
+Hedef dil sözcük kısa listesi (vocabulary shortlist).
+
+M2M100'ün ~128k tokenlık sözlüğü 100 dili kapsar; decoder'ın her adımında çıkış
+izdüşümü (1024 x 128k matris çarpımı) bütün sözlük için hesaplanır. Oysa bir
+hedef dil için bunun küçük bir kısmı üretilebilir. Kısa liste:
+
+- tokenizer'ın sözlüğünden hedef dilin yazı sistemine (Latin, Kiril, ...) ve
+  ortak karakterlere (rakam, noktalama) uyan parçalar; ya da yerel bir hedef
+  dil derleminde (satır başına bir cümle) görülen tokenlar + ortak karakterler;
+- her zaman özel tokenlar (eos, pad, dil kodları);
+- her çağrıda kaynak cümlelerin tokenları (özel adlar, formül yer tutucuları
+  kaynaktan kopyalanabilsin).
+
+`ShortlistHead` modelin çıkış katmanının yerine geçer: izdüşüm yalnızca
+listedeki satırlarla hesaplanır, diğer tokenların logit'i -inf olur (generate
+tam boyutlu logit bekler; pahalı kısım matris çarpımıdır, -inf doldurma değil).
+Kısa listeler `output/shortlists/<model>.<dil>.<kip>.json` dosyasında tutulur.
+
+    VOCAB_SHORTLIST=1 python main.py --input pdfs/
+    python -m modules.shortlist build --tgt en [--corpus en.txt]
+    python -m modules.shortlist bench --tgt en --n 64
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SHORTLIST_DIR = Path(os.environ.get("SHORTLIST_DIR", "output/shortlists"))
+SPACE = "▁"  # sentencepiece sözcük başı işareti
+
+# yazı sistemi -> Unicode aralıkları
+_SCRIPTS: Dict[str, Tuple[Tuple[int, int], ...]] = {
+    "latin": ((0x00C0, 0x024F), (0x1E00, 0x1EFF)),
+    "cyrillic": ((0x0400, 0x052F),),
+    "greek": ((0x0370, 0x03FF), (0x1F00, 0x1FFF)),
+    "arabic": ((0x0600, 0x06FF), (0x0750, 0x077F), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF)),
+    "hebrew": ((0x0590, 0x05FF),),
+    "devanagari": ((0x0900, 0x097F),),
+    "cjk": ((0x3000, 0x30FF), (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xFF00, 0xFFEF)),
+    "hangul": ((0x1100, 0x11FF), (0x3130, 0x318F), (0xAC00, 0xD7AF)),
+}
+_LANG_SCRIPT = {"ru": "cyrillic", "uk": "cyrillic", "bg": "cyrillic", "kk": "cyrillic", "el": "greek",
+                "ar": "arabic", "fa": "arabic", "he": "hebrew", "hi": "devanagari", "zh": "cjk", "ja": "cjk",
+                "ko": "hangul"}
+# her dilde çıkabilen: ASCII harf/rakam/noktalama, genel noktalama, para birimi, matematik
+_COMMON = ((0x0020, 0x007E), (0x00A0, 0x00BF), (0x00D7, 0x00D7), (0x00F7, 0x00F7), (0x2000, 0x206F),
+           (0x20A0, 0x20CF), (0x2190, 0x22FF))
+
+
+def script_of(lang: str) -> str:
+    return _LANG_SCRIPT.get(lang, "latin")
+
+
+def _in(ch: str, ranges) -> bool:
+    o = ord(ch)
+    return any(a <= o <= b for a, b in ranges)
+
+
+def piece_allowed(piece: str, lang: str, common_only: bool = False) -> bool:
+    """Parçanın tüm karakterleri ortak aralıklarda ya da (common_only değilse) hedef yazı sisteminde mi."""
+    text = piece.replace(SPACE, "")
+    if not text:
+        return True
+    ranges = _COMMON if common_only else _COMMON + _SCRIPTS[script_of(lang)]
+    if script_of(lang) == "latin" and not common_only:
+        # ASCII dışı Latin harfleri: birleşik işaretlerle de yazılabilir (NFD)
+        text = "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+    return all(_in(c, ranges) for c in text)
+
+
+# ------------------------ kısa liste oluşturma
+def build(tokenizer, lang: str, corpus: Optional[Iterable[str]] = None, min_count: int = 1) -> List[int]:
+    """
+    Hedef dil için token kimlikleri. corpus yoksa yazı sistemi süzgeci; varsa
+    derlemde en az `min_count` kez görülen tokenlar + ortak karakterli parçalar.
+    """
+    vocab = tokenizer.get_vocab()
+    ids: Set[int] = set(tokenizer.all_special_ids)
+    if corpus is None:
+        ids.update(i for p, i in vocab.items() if piece_allowed(p, lang))
+    else:
+        counts: Counter = Counter()
+        for line in corpus:
+            if line.strip():
+                counts.update(tokenizer(line.strip(), add_special_tokens=False)["input_ids"])
+        ids.update(i for i, n in counts.items() if n >= min_count)
+        ids.update(i for p, i in vocab.items() if piece_allowed(p, lang, common_only=True))
+    return sorted(ids)
+
+
+def shortlist_path(model_name: str, lang: str, mode: str) -> Path:
+    return SHORTLIST_DIR / f"{model_name.replace('/', '--')}.{lang}.{mode}.json"
+
+
+def load_or_build(tokenizer, model_name: str, lang: str, corpus_path: Optional[Path] = None) -> List[int]:
+    mode = "corpus" if corpus_path else "script"
+    path = shortlist_path(model_name, lang, mode)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("vocab_size") == len(tokenizer):
+            return data["ids"]
+    except (OSError, ValueError):
+        pass
+    t0 = time.perf_counter()
+    if corpus_path:
+        with open(corpus_path, encoding="utf-8") as f:
+            ids = build(tokenizer, lang, f)
+    else:
+        ids = build(tokenizer, lang)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"model": model_name, "lang": lang, "mode": mode, "vocab_size": len(tokenizer),
+                               "ids": ids}), encoding="utf-8")
+    tmp.replace(path)
+    logger.info(f"Kısa liste ({lang}, {mode}): {len(ids)}/{len(tokenizer)} token, "
+                f"{time.perf_counter() - t0:.1f} sn -> {path}")
+    return ids
+
+
+# ------------------------ çıkış katmanı
+@functools.lru_cache(maxsize=None)
+def _head_class():
+    import torch
+    from torch import nn
+
+    class ShortlistHead(nn.Module):
+        """
+        Çıkış izdüşümünü etkin token alt kümesiyle sınırlar. `active` None iken
+        özgün katman gibi davranır. Alt ağırlık matrisi liste değiştiğinde bir kez
+        kesilir (generate boyunca her adımda değil).
+        """
+
+        def __init__(self, full: nn.Linear):
+            super().__init__()
+            self.full = full
+            self.active: Optional[torch.Tensor] = None
+            self._weight: Optional[torch.Tensor] = None
+            self._bias: Optional[torch.Tensor] = None
+
+        def set_active(self, ids: Optional[torch.Tensor]):
+            self.active = ids
+            if ids is None:
+                self._weight = self._bias = None
+                return
+            self._weight = self.full.weight.index_select(0, ids)
+            self._bias = self.full.bias.index_select(0, ids) if self.full.bias is not None else None
+
+        def forward(self, hidden: torch.Tensor) -> torch.Tensor:
+            if self.active is None:
+                return self.full(hidden)
+            small = nn.functional.linear(hidden, self._weight, self._bias)
+            out = small.new_full((*small.shape[:-1], self.full.out_features), float("-inf"))
+            out[..., self.active] = small
+            return out
+
+    return ShortlistHead
+
+
+_lock = threading.Lock()
+_cache: Dict[tuple, object] = {}  # (model, dil, derlem) -> id tensörü
+
+
+def install(model):
+    """Modelin çıkış katmanını ShortlistHead ile sarar (bir kez); sarmalayıcıyı döner."""
+    head = model.get_output_embeddings()
+    cls = _head_class()
+    if isinstance(head, cls):
+        return head
+    wrapped = cls(head)
+    model.set_output_embeddings(wrapped)
+    return wrapped
+
+
+@contextmanager
+def restrict(model, tokenizer, model_name: str, tgt_lang: str, input_ids=None,
+             corpus_path: Optional[Path] = None):
+    """
+    generate çağrısını hedef dil kısa listesi + kaynak tokenlarıyla sınırlar.
+    Çağıran model kilidini (pipeline._MODEL_LOCK) tutmalıdır.
+    """
+    import torch
+    key = (model_name, tgt_lang, corpus_path)
+    with _lock:
+        if key not in _cache:
+            _cache[key] = torch.tensor(load_or_build(tokenizer, model_name, tgt_lang, corpus_path))
+        base = _cache[key]
+    head = install(model)
+    ids = base if input_ids is None else torch.unique(torch.cat([base, input_ids.reshape(-1)]))
+    head.set_active(ids)
+    try:
+        yield ids
+    finally:
+        head.set_active(None)
+
+
+def maybe_restrict(enabled: bool, *args, **kwargs):
+    return restrict(*args, **kwargs) if enabled else nullcontext()
+
+
+# ------------------------ kalite ve hız ölçümü
+def chrf(hyp: str, ref: str, n: int = 6, beta: float = 2.0) -> float:
+    """Karakter n-gram F-skoru (chrF, 0-100); boşluklar yok sayılır."""
+    hyp, ref = hyp.replace(" ", ""), ref.replace(" ", "")
+    precs, recs = [], []
+    for k in range(1, n + 1):
+        h = Counter(hyp[i:i + k] for i in range(len(hyp) - k + 1))
+        r = Counter(ref[i:i + k] for i in range(len(ref) - k + 1))
+        if not h or not r:
+            continue
+        match = sum((h & r).values())
+        precs.append(match / sum(h.values()))
+        recs.append(match / sum(r.values()))
+    if not precs:
+        return 100.0 if hyp == ref else 0.0
+    p, r = sum(precs) / len(precs), sum(recs) / len(recs)
+    return 0.0 if p + r == 0 else 100 * (1 + beta ** 2) * p * r / (beta ** 2 * p + r)
+
+
+def compare(full: Sequence[str], short: Sequence[str]) -> Dict[str, float]:
+    """Kısa listeli çıktının tam sözlük çıktısına göre birebir eşleşme oranı ve ortalama chrF."""
+    same = sum(a == b for a, b in zip(full, short))
+    return {"exact": same / len(full) if full else 1.0,
+            "chrf": sum(chrf(b, a) for a, b in zip(full, short)) / len(full) if full else 100.0}
+
+
+def bench(tgt: str, n: int = 64, batch: int = 16, corpus: Optional[Path] = None) -> dict:
+    """Aynı cümleleri tam sözlük ve kısa listeyle çevirir; token/sn ve kalite."""
+    import pipeline
+    from benchmarks.synth import paragraphs
+    from modules import metrics
+    texts = paragraphs(n, seed=11, words=25)
+    pipeline.ensure_model_loaded()
+    pipeline.translate_texts(texts[:2], tgt_lang=tgt)  # ısınma
+    out = {}
+    for name, enabled in (("full", False), ("shortlist", True)):
+        pipeline.VOCAB_SHORTLIST, pipeline.SHORTLIST_CORPUS = enabled, corpus
+        metrics.RUN.reset()
+        t0 = time.perf_counter()
+        result = [y for k in range(0, n, batch) for y in pipeline.translate_texts(texts[k:k + batch], tgt_lang=tgt)]
+        elapsed = time.perf_counter() - t0
+        out[name] = {"seconds": round(elapsed, 2), "tokens_per_sec": round(metrics.RUN.counters["tokens_out"] / elapsed, 1),
+                     "outputs": result}
+    out["quality"] = compare(out["full"].pop("outputs"), out["shortlist"].pop("outputs"))
+    out["shortlist"]["size"] = len(load_or_build(pipeline.tokenizer, pipeline.MODEL_NAME, tgt, corpus))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hedef dil sözcük kısa listesi")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build", help="Kısa listeyi oluştur ve kaydet")
+    p_bench = sub.add_parser("bench", help="Tam sözlükle hız ve kalite karşılaştırması")
+    for p in (p_build, p_bench):
+        p.add_argument("--tgt", type=str, default="en")
+        p.add_argument("--corpus", type=str, default=None, help="Hedef dilde derlem (satır başına bir cümle)")
+    p_bench.add_argument("--n", type=int, default=64)
+    p_bench.add_argument("--batch", type=int, default=16)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    corpus = Path(args.corpus) if args.corpus else None
+    if args.cmd == "build":
+        import pipeline
+        pipeline.ensure_model_loaded()
+        ids = load_or_build(pipeline.tokenizer, pipeline.MODEL_NAME, args.tgt, corpus)
+        print(f"{len(ids)}/{len(pipeline.tokenizer)} token")
+    else:
+        print(json.dumps(bench(args.tgt, args.n, args.batch, corpus), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,270 @@
-from pathlib import Path
+"""
+LaTeX doğrulama ve otomatik onarım.
+
+.tex yazılırken her bloğun satır aralığı yan dosyaya (`<ad>.blocks.jsonl`)
+kaydedilir: {"block": i, "start": ilk_satır, "end": son_satır, "page": s,
+"fallback": "..."}. Derleme başarısız olursa:
+
+1. pdflatex günlüğündeki hata satırları (`l.123` / `dosya.tex:123:`) bloklara
+   eşlenir, bu bloklar güvenli kaçışlı düz metinle değiştirilip -draftmode ile
+   yeniden denenir;
+2. günlük bir bloğa işaret etmiyorsa (ör. dosya sonunda "Runaway argument")
+   bölümler ikiye bölünerek paralel -draftmode derlemeleriyle aranır; tek
+   başına derlenemeyen bölümler yedekleriyle değiştirilir.
+
+Bloklar arası bağımlılık olmadığından (her blok kendi içinde kapalı) her
+deneme yalnızca önsöz + seçilen bölümler + kapanıştan oluşur.
+"""
+import itertools
+import json
+import logging
+import os
+import re
 import subprocess
-from modules.logger import get_logger
+import tempfile
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from modules import metrics
+from modules.formulas import SYMBOLS
+
+logger = logging.getLogger(__name__)
+
+PDFLATEX = os.environ.get("PDFLATEX", "pdflatex")
+WORKERS = 4
+MAX_ROUNDS = 3  # günlükten yerelleştirme turu; sonra ikiye bölme
+
+_LOG_LINE = re.compile(r"^(?:[^\n:]*\.tex:(\d+): |l\.(\d+) )", re.MULTILINE)
+_ESCAPES = {"\\": r"\textbackslash{}", "&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#", "_": r"\_",
+            "{": r"\{", "}": r"\}", "~": r"\textasciitilde{}", "^": r"\textasciicircum{}",
+            "<": r"\textless{}", ">": r"\textgreater{}"}
+
 
-logger = get_logger(__name__)
+def blockmap_path(tex_path: Path) -> Path:
+    return Path(tex_path).with_suffix(".blocks.jsonl")
 
-def validate_latex(tex_path: Path) -> bool:
-    try:
-        cmd = ["pdflatex", "-interaction=nonstopmode", "-halt-on-error", str(tex_path)]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            logger.info(f"LaTeX compiled successfully: {tex_path}")
-            return True
+
+def safe_text(text: str) -> str:
+    """
+    Her koşulda derlenen düz metin: tek geçişte kaçış, bilinen matematik
+    sembolleri `\\(...\\)`, inputenc'in tanımadığı diğer karakterler ASCII
+    karşılığı ya da "?".
+    """
+    out = []
+    for ch in re.sub(r"\s+", " ", text).strip():
+        if ch in _ESCAPES:
+            out.append(_ESCAPES[ch])
+        elif ord(ch) < 0x180:  # Latin-1 + Latin Extended-A (Türkçe harfler dahil)
+            out.append(ch)
+        elif ch in SYMBOLS:
+            out.append(rf"\({SYMBOLS[ch]}\)")
         else:
-            logger.error(f"LaTeX compilation failed:\n{result.stderr}")
-            return False
-    except Exception as e:
-        logger.error(f"Validation error: {e}")
-        return False
+            ascii_ = unicodedata.normalize("NFKD", ch).encode("ascii", "ignore").decode()
+            out.append(_escape_ascii(ascii_) if ascii_ else "?")
+    return "".join(out)
+
+
+def _escape_ascii(text: str) -> str:
+    return "".join(_ESCAPES.get(c, c) for c in text)
+
+
+# ------------------------ yan dosya yazımı
+class TexWriter:
+    """
+    .tex dosyasına yazar, satır sayar ve `write_block` ile yazılan blokların
+    satır aralığını yedek metinleriyle birlikte yan dosyaya kaydeder.
+    """
+
+    def __init__(self, tex_path: Path):
+        self.path = Path(tex_path)
+        self.line = 1  # sıradaki yazımın başladığı satır
+        self.blocks = 0
+        self._tex = open(self.path, "w", encoding="utf-8")
+        self._map = open(blockmap_path(self.path), "w", encoding="utf-8")
+
+    def write(self, s: str):
+        self._tex.write(s)
+        self.line += s.count("\n")
+
+    def write_block(self, s: str, fallback: str, page: Optional[int] = None):
+        if not s:
+            return
+        start = self.line
+        self.write(s)
+        end = self.line - 1 if s.endswith("\n") else self.line
+        self._map.write(json.dumps({"block": self.blocks, "start": start, "end": end, "page": page,
+                                    "fallback": fallback}, ensure_ascii=False) + "\n")
+        self.blocks += 1
+
+    def close(self):
+        self._tex.close()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ------------------------ derleme
+def parse_log(log: str) -> List[int]:
+    """pdflatex günlüğündeki hata satır numaraları (sırasıyla, tekrarsız)."""
+    seen: List[int] = []
+    for m in _LOG_LINE.finditer(log):
+        n = int(m.group(1) or m.group(2))
+        if n not in seen:
+            seen.append(n)
+    return seen
+
+
+def _compile(text: str, cwd: Path, workdir: Path, name: str, pdflatex: str,
+             halt: bool = True) -> Tuple[bool, str]:
+    """
+    Taslak derleme (PDF yazılmaz); görsel yolları için cwd .tex klasörüdür.
+    halt=False: ilk hatada durmaz, günlükte tüm hata satırları olur.
+    """
+    src = workdir / f"{name}.tex"
+    src.write_text(text, encoding="utf-8")
+    metrics.count("latex_trial_compiles")
+    proc = subprocess.run([pdflatex, "-draftmode", "-interaction=nonstopmode", "-file-line-error"]
+                          + (["-halt-on-error"] if halt else []) + [f"-output-directory={workdir}", str(src)],
+                          cwd=str(cwd), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    log_path = workdir / f"{name}.log"
+    log = log_path.read_text(encoding="utf-8", errors="replace") if log_path.exists() else proc.stdout
+    return proc.returncode == 0, log
+
+
+def validate_latex(tex_path: Path, pdflatex: str = PDFLATEX) -> bool:
+    tex_path = Path(tex_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        ok, log = _compile(tex_path.read_text(encoding="utf-8"), tex_path.parent, Path(tmp), "check", pdflatex)
+    if ok:
+        logger.info(f"LaTeX derlendi: {tex_path}")
+    else:
+        logger.error(f"LaTeX derlenemedi: {tex_path} (satırlar: {parse_log(log)[:5]})")
+    return ok
+
+
+# ------------------------ yerelleştirme ve onarım
+class _Document:
+    """Önsöz + gövde bölümleri + kapanış; her bölüm ya bir blok ya da bloklar arası satırlar."""
+
+    def __init__(self, tex_path: Path):
+        lines = Path(tex_path).read_text(encoding="utf-8").splitlines(keepends=True)
+        begin = next(i for i, l in enumerate(lines) if l.startswith(r"\begin{document}"))
+        end = max(i for i, l in enumerate(lines) if l.startswith(r"\end{document}"))
+        with open(blockmap_path(tex_path), encoding="utf-8") as f:
+            records = [json.loads(l) for l in f if l.strip()]
+        self.head, self.tail = "".join(lines[:begin + 1]), "".join(lines[end:])
+        self.parts: List[str] = []       # bölüm metni
+        self.fallback: List[str] = []    # bölüm yedeği (blok dışı satırlar için boş)
+        self.block: List[Optional[int]] = []
+        pos = begin + 1  # 0 tabanlı sıradaki gövde satırı
+        for r in records:
+            s, e = r["start"] - 1, r["end"]
+            if s > pos:
+                self._add("".join(lines[pos:s]), "", None)
+            self._add("".join(lines[s:e]), r["fallback"], r["block"])
+            pos = e
+        if pos < end:
+            self._add("".join(lines[pos:end]), "", None)
+        self.replaced: Dict[int, str] = {}
+
+    def _add(self, text: str, fallback: str, block: Optional[int]):
+        self.parts.append(text)
+        self.fallback.append(fallback)
+        self.block.append(block)
+
+    def assemble(self, sections: Sequence[int]) -> Tuple[str, List[Tuple[int, int, int]]]:
+        """Seçili bölümlerden .tex metni ve (ilk_satır, son_satır, bölüm) eşlemesi."""
+        out, ranges = [self.head], []
+        line = self.head.count("\n") + 1
+        for k in sections:
+            text = self.replaced.get(k, self.parts[k])
+            n = text.count("\n")
+            ranges.append((line, line + max(n - 1, 0), k))
+            out.append(text)
+            line += n
+        out.append(self.tail)
+        return "".join(out), ranges
+
+    def replace(self, k: int):
+        fb = "" if k in self.replaced else self.fallback[k]  # yedeği de derlenmiyorsa bölüm atlanır
+        tag = f"block {self.block[k]}" if self.block[k] is not None else "satırlar"
+        self.replaced[k] = f"% validator: {tag} yedekle değiştirildi\n" + (fb + "\n\n" if fb else "")
+
+
+def _sections_at(lines: Sequence[int], ranges: Sequence[Tuple[int, int, int]]) -> List[int]:
+    return sorted({k for n in lines for a, b, k in ranges if a <= n <= b})
+
+
+def repair(tex_path: Path, log: Optional[str] = None, workers: int = WORKERS,
+           pdflatex: str = PDFLATEX) -> List[int]:
+    """
+    Derlenemeyen blokları bulur, yedek metinleriyle değiştirip .tex'i yeniden
+    yazar. Değiştirilen blok numaralarını döner (yan dosya yoksa ya da belge
+    zaten derleniyorsa boş liste). `log`: başarısız derlemenin günlüğü, varsa
+    ilk deneme atlanır.
+    """
+    tex_path = Path(tex_path)
+    if not blockmap_path(tex_path).exists():
+        return []
+    doc = _Document(tex_path)
+    every = list(range(len(doc.parts)))
+    with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        tmp = Path(tmp)
+        trial = itertools.count()
+
+        def check(sections: Sequence[int], halt: bool = True) -> Tuple[bool, str, list]:
+            text, ranges = doc.assemble(sections)
+            ok, out = _compile(text, tex_path.parent, tmp, f"trial{next(trial)}", pdflatex, halt)
+            return ok, out, ranges
+
+        _, ranges = doc.assemble(every)
+        ok = False
+        if log is None:
+            ok, log, ranges = check(every, halt=False)
+        # 1) günlükteki satırlardan
+        for _ in range(MAX_ROUNDS):
+            if ok:
+                break
+            bad = [k for k in _sections_at(parse_log(log), ranges) if k not in doc.replaced]
+            if not bad:
+                break
+            for k in bad:
+                doc.replace(k)
+            ok, log, ranges = check(every, halt=False)
+        # 2) paralel ikiye bölme: her turda tüm aralıklar aynı anda denenir
+        if not ok and not check([])[0]:
+            logger.error(f"{tex_path.name}: önsöz derlenmiyor, bloklar onarılamaz")
+        elif not ok:
+            # tam belgenin başarısız olduğu biliniyor: doğrudan yarılarla başla
+            frontier, bad = ([every[:len(every) // 2], every[len(every) // 2:]] if len(every) > 1 else [every]), []
+            while frontier:
+                results = list(pool.map(lambda s: check(s)[0], frontier))
+                nxt = []
+                for sections, passed in zip(frontier, results):
+                    if passed:
+                        continue
+                    if len(sections) == 1:
+                        bad.append(sections[0])
+                    else:
+                        mid = len(sections) // 2
+                        nxt += [sections[:mid], sections[mid:]]
+                frontier = nxt
+            for k in bad:
+                doc.replace(k)
+            ok = check(every)[0] if bad else False
+        if not doc.replaced:
+            return []
+        text, _ = doc.assemble(every)
+    tex_path.write_text(text, encoding="utf-8")
+    blocks = sorted(doc.block[k] for k in doc.replaced if doc.block[k] is not None)
+    metrics.count("latex_blocks_replaced", len(blocks))
+    (logger.info if ok else logger.warning)(
+        f"{tex_path.name}: {len(doc.replaced)} bölüm yedekle değiştirildi (bloklar: {blocks[:20]})"
+        + ("" if ok else "; belge hâlâ derlenmiyor"))
+    return blocks
@@ -0,0 +1,137 @@
+"""
+Isınma ve hazırlık denetimi.
+
+Bir çalışmanın ilk belgesi diğerlerinden çok daha yavaştır: model yükleme,
+generate'in ilk çağrısındaki bellek ayırıcı/çekirdek hazırlığı, GROBID'in
+modellerini ilk istekte yüklemesi ve TeX'in font önbellekleri. Bu adımlar iş
+kabul edilmeden önce paralel olarak çalıştırılır:
+
+- model: çeviri modelini yükler ve küçük bir batch çevirir;
+- grobid: her GROBID örneğine pipeline'ın kullandığı profille tek satırlık bir PDF gönderir;
+- latex: proje önsözüyle tek satırlık bir belge derler (draftmode değil: fontlar yüklenir).
+
+    python main.py warmup [--skip grobid]
+    python main.py --input pdfs/ --warmup
+    python main.py serve --warmup
+"""
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+STEPS = ("model", "grobid", "latex")
+WARMUP_TEXTS = ["Bu bir ısınma cümlesidir.",
+                "Model, ilk çağrıda bellek ayırıcısını ve hesaplama çekirdeklerini hazırlar; "
+                "farklı uzunluktaki cümleler padding yolunu da çalıştırır."]
+
+
+@dataclass
+class WarmupResult:
+    name: str
+    ok: bool
+    seconds: float
+    detail: str = ""
+
+
+def _tiny_pdf() -> bytes:
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "Warm-up: a short line of text.")
+        return doc.tobytes()
+
+
+def warm_model() -> str:
+    import pipeline
+    t0 = time.perf_counter()
+    pipeline.ensure_model_loaded()
+    t1 = time.perf_counter()
+    pipeline.translate_texts(WARMUP_TEXTS)
+    return f"yükleme {t1 - t0:.1f} sn, ilk batch {time.perf_counter() - t1:.1f} sn"
+
+
+def warm_grobid() -> str:
+    """Her örneğe ayrı istek: havuz yük dağıttığı için tek istek yalnızca birini ısıtır."""
+    import pipeline
+    from modules.grobid_client import PROFILES, choose_profile
+    pool = pipeline.grobid_pool()
+    p = PROFILES[pipeline.GROBID_PROFILE] if pipeline.GROBID_PROFILE else choose_profile(pipeline.GROBID_NEEDS)
+    data = _tiny_pdf()
+
+    def post(url: str) -> float:
+        t0 = time.perf_counter()
+        resp = pool.session.post(f"{url}/api/{p.service}", files={"input": ("warmup.pdf", data)},
+                                 data=p.data or (), timeout=120)
+        if resp.status_code != 200:
+            raise RuntimeError(f"{url}: HTTP {resp.status_code}")
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=len(pool.urls)) as ex:
+        times = list(ex.map(post, pool.urls))
+    return ", ".join(f"{u} {t:.1f} sn" for u, t in zip(pool.urls, times))
+
+
+def warm_latex() -> str:
+    import pipeline
+    if shutil.which(pipeline.PDFLATEX) is None:
+        raise RuntimeError(f"{pipeline.PDFLATEX} bulunamadı")
+    with tempfile.TemporaryDirectory() as tmp:
+        tex = Path(tmp) / "warmup.tex"
+        tex.write_text(pipeline.LATEX_PREAMBLE + "\nIsınma: \\(x^2 \\leq y\\) çğşı.\n" + pipeline.LATEX_POSTAMBLE,
+                       encoding="utf-8")
+        if not pipeline._run_pdflatex(tex):
+            raise RuntimeError("önsöz derlenemedi")
+    return "önsöz derlendi"
+
+
+WARMERS: Dict[str, Callable[[], str]] = {"model": warm_model, "grobid": warm_grobid, "latex": warm_latex}
+
+
+def run(steps: Sequence[str] = STEPS) -> List[WarmupResult]:
+    """Adımları paralel çalıştırır; her adımın süresi ve sonucu (hata dahil) döner."""
+    def one(name: str) -> WarmupResult:
+        t0 = time.perf_counter()
+        try:
+            detail, ok = WARMERS[name](), True
+        except Exception as e:
+            detail, ok = f"{type(e).__name__}: {e}", False
+        res = WarmupResult(name, ok, time.perf_counter() - t0, detail)
+        (logger.info if ok else logger.error)(f"Isınma {name}: {'hazır' if ok else 'başarısız'} "
+                                              f"({res.seconds:.1f} sn) {detail}")
+        return res
+
+    if not steps:
+        return []
+    with ThreadPoolExecutor(max_workers=len(steps)) as ex:
+        return list(ex.map(one, steps))
+
+
+def format_results(results: Sequence[WarmupResult]) -> str:
+    lines = [f"{'adım':<8}{'durum':>8}{'süre':>9}  ayrıntı"]
+    for r in results:
+        lines.append(f"{r.name:<8}{'✅' if r.ok else '❌':>8}{r.seconds:>8.1f}s  {r.detail}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> bool:
+    parser = argparse.ArgumentParser(description="Model, GROBID ve LaTeX ısınması")
+    parser.add_argument("--skip", action="append", choices=STEPS, default=[], help="Atlanacak adım")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    t0 = time.perf_counter()
+    results = run([s for s in STEPS if s not in args.skip])
+    print(format_results(results))
+    print(f"toplam (paralel): {time.perf_counter() - t0:.1f} sn")
+    return all(r.ok for r in results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
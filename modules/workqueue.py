@@ -0,0 +1,304 @@
+"""
+Paylaşılan iş kuyruğu: birden fazla makine aynı (ağ depolamasındaki) PDF
+derlemini, bir belgeyi iki kez işlemeden tüketir.
+
+Kuyruk tek bir SQLite dosyasıdır (ör. derlemle aynı paylaşılan klasörde).
+Her iş süreli bir kira (lease) ile alınır; worker iş sürerken kirayı düzenli
+aralıklarla yeniler (heartbeat). Kirası dolan iş (worker düştü, ağ koptu)
+başka bir worker tarafından yeniden alınır; sahibi değişmiş işin sonucu eski
+worker tarafından yazılamaz. Sonuçlar ve hatalar kuyrukta tutulur; bir iş
+MAX_ATTEMPTS denemeden sonra `failed` olarak kalır.
+
+Not: SQLite kilitleri NFS gibi ağ dosya sistemlerinde POSIX kilitlerinin doğru
+çalışmasına bağlıdır (WAL kullanılmaz). Kilit desteği güvenilir değilse dosya
+tek bir makinede tutulmalıdır.
+
+    python main.py queue --db /mnt/corpus/queue.db enqueue /mnt/corpus/pdfs
+    python main.py queue --db /mnt/corpus/queue.db work --output /mnt/corpus/out   # her makinede
+    python main.py queue --db /mnt/corpus/queue.db status
+"""
+import argparse
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from modules import scheduling
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 600.0
+HEARTBEAT_SECONDS = 60.0
+MAX_ATTEMPTS = 3
+POLL_SECONDS = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    state TEXT NOT NULL DEFAULT 'queued',   -- queued | running | done | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL,
+    heartbeat REAL,
+    result TEXT,
+    error TEXT,
+    enqueued REAL NOT NULL,
+    cost REAL NOT NULL DEFAULT 0,           -- tahmini süre (sn), scheduling.estimate
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_until);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    path: str
+    attempts: int
+    owner: str
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class WorkQueue:
+    """SQLite tabanlı kuyruk; her çağrı kendi bağlantısını açar (süreç/thread güvenli)."""
+
+    def __init__(self, db_path: Path, lease: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS,
+                 schedule: str = "sjf", aging: float = scheduling.AGING):
+        if schedule not in scheduling.POLICIES:
+            raise ValueError(f"Bilinmeyen politika: {schedule}")
+        self.db_path = Path(db_path)
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.schedule, self.aging = schedule, aging
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.executescript(_SCHEMA)
+            if "cost" not in {r["name"] for r in db.execute("PRAGMA table_info(jobs)")}:  # eski kuyruk dosyası
+                db.execute("ALTER TABLE jobs ADD COLUMN cost REAL NOT NULL DEFAULT 0")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def _write(self, fn):
+        """`fn(db)`'yi tek bir yazma işleminde çalıştırır (BEGIN IMMEDIATE: yazarlar sıralanır)."""
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(db)
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+            return out
+        finally:
+            db.close()
+
+    # ------------------------ üretici
+    def enqueue(self, paths: Iterable[Path]) -> int:
+        """Yeni yolları kuyruğa ekler; zaten kuyrukta olanlar atlanır. Eklenen sayısını döner."""
+        rows = [(str(Path(p).resolve()), time.time(), _cost(Path(p))) for p in paths]
+
+        def insert(db):
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO jobs (path, enqueued, cost) VALUES (?, ?, ?)", rows)
+            return db.total_changes - before
+        return self._write(insert)
+
+    def retry_failed(self) -> int:
+        """Başarısız işleri deneme sayacını sıfırlayarak kuyruğa geri koyar."""
+        return self._write(lambda db: db.execute(
+            "UPDATE jobs SET state='queued', attempts=0, owner=NULL, lease_until=NULL, error=NULL "
+            "WHERE state='failed'").rowcount)
+
+    # ------------------------ worker
+    def claim(self, owner: str) -> Optional[Job]:
+        """
+        Sıradaki işi `owner` adına kiralar: bekleyen ya da kirası dolmuş (worker'ı
+        düşmüş) işlerden fifo'da en eskisi, sjf'de scheduling.JobQueue ile aynı
+        anahtara (`cost + aging * geliş`) göre sıradaki. Deneme hakkı biten süresi
+        dolmuş işler `failed` olur.
+        """
+        order, params = ("id", ()) if self.schedule == "fifo" else ("cost + ? * enqueued, id", (self.aging,))
+
+        def take(db):
+            now = time.time()
+            db.execute("UPDATE jobs SET state='failed', owner=NULL, finished=?, "
+                       "error=COALESCE(error, 'kira doldu: worker yanıt vermedi') "
+                       "WHERE state='running' AND lease_until < ? AND attempts >= ?",
+                       (now, now, self.max_attempts))
+            row = db.execute("SELECT id, path, attempts, state FROM jobs WHERE state='queued' "
+                             f"OR (state='running' AND lease_until < ?) ORDER BY {order} LIMIT 1",
+                             (now, *params)).fetchone()
+            if row is None:
+                return None
+            if row["state"] == "running":
+                logger.warning(f"Kirası dolan iş yeniden alındı: {row['path']} (deneme {row['attempts'] + 1})")
+            db.execute("UPDATE jobs SET state='running', owner=?, attempts=attempts+1, lease_until=?, "
+                       "heartbeat=?, started=? WHERE id=?", (owner, now + self.lease, now, now, row["id"]))
+            return Job(row["id"], row["path"], row["attempts"] + 1, owner)
+        return self._write(take)
+
+    def heartbeat(self, job: Job) -> bool:
+        """Kirayı uzatır; iş artık bu worker'a ait değilse False."""
+        now = time.time()
+        return self._write(lambda db: db.execute(
+            "UPDATE jobs SET lease_until=?, heartbeat=? WHERE id=? AND owner=? AND state='running'",
+            (now + self.lease, now, job.id, job.owner)).rowcount == 1)
+
+    def complete(self, job: Job, result: str) -> bool:
+        return self._finish(job, "done", result=result)
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Hata kaydeder; deneme hakkı kaldıysa iş kuyruğa geri döner."""
+        state = "queued" if job.attempts < self.max_attempts else "failed"
+        return self._finish(job, state, error=error)
+
+    def _finish(self, job: Job, state: str, result: Optional[str] = None, error: Optional[str] = None) -> bool:
+        ok = self._write(lambda db: db.execute(
+            "UPDATE jobs SET state=?, result=?, error=?, owner=NULL, lease_until=NULL, finished=? "
+            "WHERE id=? AND owner=? AND state='running'",
+            (state, result, error, time.time(), job.id, job.owner)).rowcount == 1)
+        if not ok:
+            logger.warning(f"{job.path}: kira kaybedilmiş, sonuç yazılmadı (iş başka worker'da)")
+        return ok
+
+    # ------------------------ durum
+    def status(self) -> Dict[str, int]:
+        with closing(self._connect()) as db:
+            counts = dict(db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+            expired = db.execute("SELECT COUNT(*) FROM jobs WHERE state='running' AND lease_until < ?",
+                                 (time.time(),)).fetchone()[0]
+        out = {s: counts.get(s, 0) for s in ("queued", "running", "done", "failed")}
+        out["expired_leases"] = expired
+        return out
+
+    def jobs(self, state: Optional[str] = None) -> List[dict]:
+        with closing(self._connect()) as db:
+            rows = db.execute("SELECT * FROM jobs" + (" WHERE state=?" if state else "") + " ORDER BY id",
+                              (state,) if state else ()).fetchall()
+        return [dict(r) for r in rows]
+
+
+def _cost(path: Path) -> float:
+    """Tahmini süre; kuyruğa eklenirken dosya henüz yoksa belge başına sabit."""
+    try:
+        return scheduling.estimate(path).cost
+    except OSError:
+        return scheduling.JOB_SECONDS
+
+
+# ------------------------ worker döngüsü
+class _Heartbeat(threading.Thread):
+    def __init__(self, q: WorkQueue, job: Job, interval: float):
+        super().__init__(name=f"heartbeat-{job.id}", daemon=True)
+        self.q, self.job, self.interval = q, job, interval
+        self.stop = threading.Event()
+        self.lost = False
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            try:
+                if not self.q.heartbeat(self.job):
+                    self.lost = True
+                    logger.warning(f"{self.job.path}: kira kaybedildi")
+                    return
+            except sqlite3.Error as e:  # geçici kilit/ağ hatası: bir sonraki turda yeniden denenir
+                logger.warning(f"Heartbeat yazılamadı: {e}")
+
+
+def run_worker(q: WorkQueue, handler: Callable[[Path], object], owner: Optional[str] = None,
+               heartbeat: float = HEARTBEAT_SECONDS, wait: bool = False, poll: float = POLL_SECONDS,
+               stop: Optional[threading.Event] = None) -> int:
+    """
+    Kuyruk boşalana kadar (wait=True: `stop` gelene kadar) iş alıp `handler(pdf)`
+    ile işler. İşlenen iş sayısını döner.
+    """
+    owner = owner or worker_id()
+    stop = stop or threading.Event()
+    n = 0
+    while not stop.is_set():
+        job = q.claim(owner)
+        if job is None:
+            if not wait:
+                break
+            stop.wait(poll)
+            continue
+        beat = _Heartbeat(q, job, heartbeat)
+        beat.start()
+        try:
+            out = handler(Path(job.path))
+        except Exception as e:
+            beat.stop.set(); beat.join()
+            logger.error(f"❌ {job.path}: {e}")
+            q.fail(job, f"{type(e).__name__}: {e}")
+        else:
+            beat.stop.set(); beat.join()
+            q.complete(job, str(out))
+        n += 1
+    return n
+
+
+def _translate(output_dir: Path, engine: Optional[str]) -> Callable[[Path], object]:
+    import pipeline
+
+    def handler(pdf: Path):
+        return pipeline.process_pdf(pdf, output_dir / pdf.stem, engine=engine)
+    return handler
+
+
+def main(argv=None):
+    from modules import pdf_utils
+    parser = argparse.ArgumentParser(description="Paylaşılan iş kuyruğu")
+    parser.add_argument("--db", type=str, required=True, help="Kuyruk dosyası (paylaşılan depolamada)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_enq = sub.add_parser("enqueue", help="PDF dosyalarını/klasörlerini kuyruğa ekle")
+    p_enq.add_argument("paths", nargs="+")
+    p_work = sub.add_parser("work", help="Kuyruktan iş alıp çevir")
+    p_work.add_argument("--output", type=str, default="output", help="Çıktı klasörü (belge başına alt klasör)")
+    p_work.add_argument("--engine", choices=["grobid", "local", "auto"], default=None)
+    p_work.add_argument("--lease", type=float, default=LEASE_SECONDS, help="Kira süresi (sn)")
+    p_work.add_argument("--heartbeat", type=float, default=HEARTBEAT_SECONDS, help="Kira yenileme aralığı (sn)")
+    p_work.add_argument("--wait", action="store_true", help="Kuyruk boşalınca çıkma, yeni iş bekle")
+    p_work.add_argument("--schedule", choices=scheduling.POLICIES, default="sjf",
+                        help="İş alma sırası: sjf (tahmini kısa iş önce, yaşlandırmalı) ya da fifo (ekleme sırası)")
+    p_work.add_argument("--aging", type=float, default=scheduling.AGING,
+                        help="sjf yaşlandırması: bekleme saniyesi başına tahmini maliyetten düşülen saniye")
+    p_stat = sub.add_parser("status", help="Kuyruk durumu")
+    p_stat.add_argument("--failed", action="store_true", help="Başarısız işleri hatalarıyla listele")
+    sub.add_parser("retry-failed", help="Başarısız işleri yeniden kuyruğa al")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.cmd == "enqueue":
+        pdfs = [f for p in map(Path, args.paths) for f in (pdf_utils.list_pdfs(p) if p.is_dir() else [p])]
+        print(f"{WorkQueue(Path(args.db)).enqueue(pdfs)}/{len(pdfs)} iş eklendi")
+    elif args.cmd == "work":
+        q = WorkQueue(Path(args.db), lease=args.lease, schedule=args.schedule, aging=args.aging)
+        n = run_worker(q, _translate(Path(args.output), args.engine), heartbeat=args.heartbeat, wait=args.wait)
+        print(f"{n} iş işlendi; kuyruk: {q.status()}")
+    elif args.cmd == "status":
+        q = WorkQueue(Path(args.db))
+        print(" ".join(f"{k}={v}" for k, v in q.status().items()))
+        if args.failed:
+            for j in q.jobs("failed"):
+                print(f"{j['path']}  ({j['attempts']} deneme): {j['error']}")
+    else:
+        print(f"{WorkQueue(Path(args.db)).retry_failed()} iş yeniden kuyrukta")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 import xml.etree.ElementTree as ET
 
+from modules.blocks import Block, TEXT, PAGE_BREAK, ERROR
+
 def parse_tei(xml_content):
     """
     TEI XML çıktısını parse eder ve bloklara ayırır.
-    Dönüş listesi: [{ "type": "paragraph"/"formula"/"pb", "content": "..." }]
+    Dönüş listesi: Block(kind="text"/"formula"/"pb", text="...", page=...)
     """
     items = []
+    page = 1
     try:
         root = ET.fromstring(xml_content)
 
@@ -15,15 +18,26 @@ def parse_tei(xml_content):
             if tag.endswith("p"):  # paragraf
                 text = (elem.text or "").strip()
                 if text:
-                    items.append({"type": "paragraph", "content": text})
+                    items.append(Block(TEXT, text, page=page))
             elif "formula" in tag:  # formüller
                 formula = (elem.text or "").strip()
                 if formula:
-                    items.append({"type": "formula", "content": formula})
+                    items.append(Block.formula(formula))
+                    items[-1].page = page
             elif tag.endswith("pb"):  # page break
-                items.append({"type": "pb", "content": ""})
+                items.append(Block(PAGE_BREAK, page=page))
+                page += 1
 
     except Exception as e:
-        items.append({"type": "error", "content": f"XML parse error: {e}"})
+        items.append(Block(ERROR, f"XML parse error: {e}"))
 
     return items
+
+
+def extract_blocks(xml_content):
+    """
+    Gevşek (tek köklü olmak zorunda olmayan) TEI parçalarından blok çıkarır.
+    Dönüş listesi: Block(kind="text"/"formula"/"table", ...)
+    """
+    from parser import extract_blocks as _extract_blocks
+    return _extract_blocks(xml_content)
@@ -3,13 +3,14 @@ from bs4 import BeautifulSoup
 import re
 
 from config import GROBID_URL
+from modules.blocks import Block, TEXT, TABLE
 
 def parse_pdf_with_grobid(pdf_path):
     with open(pdf_path, "rb") as f:
         response = requests.post(
             GROBID_URL,
             files={"input": f},
-            data={"consolidate": "1"}
+            data={"consolidateHeader": "0", "consolidateCitations": "0"}  # konsolidasyon kullanılmıyor
         )
     response.raise_for_status()
     return response.text
@@ -20,9 +21,11 @@ def extract_blocks(tei_xml: str):
     blocks = []
     for elem in soup.find_all(["p", "formula", "table"]):
         if elem.name == "p":
-            blocks.append({"type": "text", "content": elem.get_text()})
+            blocks.append(Block(TEXT, elem.get_text()))
         elif elem.name == "formula":
-            blocks.append({"type": "formula", "content": elem.get_text()})
+            blocks.append(Block.formula(elem.get_text()))
         elif elem.name == "table":
-            blocks.append({"type": "table", "content": elem})
+            rows = tuple(tuple(c.get_text(strip=True) for c in row.find_all("cell"))
+                         for row in elem.find_all("row"))
+            blocks.append(Block(TABLE, " ".join(" ".join(r) for r in rows), rows=rows))
     return blocks
@@ -5,20 +5,56 @@ image extraction → LaTeX → final translated PDF
 """
 
 from pathlib import Path
-import re, logging, subprocess, html, os
-from typing import List, Dict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from io import BytesIO
+from itertools import islice
+import re, logging, subprocess, html, os, threading, tempfile
+from typing import List, Dict, Optional, Iterator, Union
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 import fitz  # PyMuPDF
 
+from modules import metrics, profiling
+from modules.grobid_client import GrobidPool, base_url, choose_profile, PROFILES, BODY, COORDS
+from modules.blocks import Block, FORMULA, TABLE, parse_coords
+from modules import local_extract, formulas, validator, shared_model, pdf_optimize, shortlist
+from modules.document_source import DocumentSource, fitz_open, measure_io
+from modules import images as image_prep
+from formatter import format_table
+
 # ------------------------
 # CONFIG
 # ------------------------
 GROBID_URL = "http://localhost:8070/api/processFulltextDocument"
+# Birden fazla GROBID örneği: GROBID_URLS=http://h1:8070,http://h2:8070 (boşsa GROBID_URL)
+GROBID_URLS = [u for u in os.environ.get("GROBID_URLS", "").split(",") if u.strip()]
+# Çeviri ve LaTeX aşamaları gövdeyi (metin, formül, tablo) ve görselleri sayfalarına
+# yerleştirmek için blok koordinatlarını kullanır; kaynakça konsolidasyonu istenmez.
+# PAGE_AWARE=False ile koordinatsız (daha ucuz) profile dönülür. GROBID_PROFILE ile zorlanabilir.
+PAGE_AWARE = os.environ.get("PAGE_AWARE", "1") != "0"
+GROBID_NEEDS = {BODY, COORDS} if PAGE_AWARE else {BODY}
+GROBID_PROFILE = os.environ.get("GROBID_PROFILE") or None
+# Çıkarma motoru: grobid | local (PyMuPDF) | auto (kısa tek sütunlu belgeler ve GROBID hatasında local)
+ENGINES = ("grobid", "local", "auto")
+EXTRACT_ENGINE = os.environ.get("EXTRACT_ENGINE", "auto")
+LOCAL_MAX_PAGES = 4
 MODEL_NAME = "facebook/m2m100_418M"
+# Çok süreçli çalışmada ağırlık paylaşımı: none | mmap (safetensors eşleme) | fork (ana süreçte yükle, COW)
+MODEL_SHARING = os.environ.get("MODEL_SHARING", "none")
 SRC_LANG, TGT_LANG = "tr", "en"
+# Hedef dil sözcük kısa listesi: çıkış izdüşümü yalnızca hedef dilin tokenlarıyla (modules/shortlist.py)
+VOCAB_SHORTLIST = os.environ.get("VOCAB_SHORTLIST", "0") == "1"
+SHORTLIST_CORPUS = Path(os.environ["SHORTLIST_CORPUS"]) if os.environ.get("SHORTLIST_CORPUS") else None
 OUTPUT_DIR = Path("output"); OUTPUT_DIR.mkdir(exist_ok=True)
+PDFLATEX = os.environ.get("PDFLATEX", "pdflatex")
+LATEX_REPAIR_WORKERS = 4  # derlenemeyen blokları arayan paralel -draftmode derlemeleri
+LATEX_COMPILE_WORKERS = 4  # çok dilli çıktıda aynı anda derlenen .tex sayısı
+# Derleme sonrası PDF küçültme (font alt kümesi, garbage=4, deflate); LINEARIZE_PDF=1 web için doğrusallaştırır
+OPTIMIZE_PDF = os.environ.get("OPTIMIZE_PDF", "0") == "1"
+LINEARIZE_PDF = os.environ.get("LINEARIZE_PDF", "0") == "1"
 
 # ------------------------
 # Logging
@@ -30,21 +66,67 @@ log = logging.getLogger("pipeline")
 # Translation model (lazy)
 # ------------------------
 try:
+    import torch
     from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
     _TRANSFORMERS = True
 except ImportError:
     _TRANSFORMERS = False
 
 tokenizer, model = None, None
+_MODEL_LOCK = threading.Lock()  # tokenizer.src_lang ve generate thread-safe değil
 def ensure_model_loaded():
     global tokenizer, model
     if not _TRANSFORMERS:
         raise RuntimeError("transformers kütüphanesi gerekli (pip install transformers sentencepiece torch)")
-    if tokenizer is None or model is None:
-        log.info("Çeviri modeli yükleniyor...")
-        tokenizer = M2M100Tokenizer.from_pretrained(MODEL_NAME)
-        model = M2M100ForConditionalGeneration.from_pretrained(MODEL_NAME)
-        log.info("Model hazır.")
+    with _MODEL_LOCK:
+        if tokenizer is None or model is None:
+            log.info("Çeviri modeli yükleniyor...")
+            tokenizer = M2M100Tokenizer.from_pretrained(MODEL_NAME)
+            if MODEL_SHARING == "mmap":
+                model = shared_model.load_mmap(M2M100ForConditionalGeneration, MODEL_NAME)
+            else:
+                model = M2M100ForConditionalGeneration.from_pretrained(MODEL_NAME)
+            log.info(f"Model hazır (paylaşım: {MODEL_SHARING}).")
+
+# ------------------------
+# Paylaşılan kaynaklar (servis modunda işler arasında yeniden kullanılır)
+# ------------------------
+_session: Optional[requests.Session] = None
+def grobid_session() -> requests.Session:
+    """GROBID için keep-alive bağlantılı tek bir HTTP oturumu."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+_pool: Optional[GrobidPool] = None
+_pool_lock = threading.Lock()
+def grobid_pool() -> GrobidPool:
+    """GROBID_URLS (yoksa GROBID_URL) için paylaşılan, sağlık durumunu izleyen havuz."""
+    global _pool
+    urls = GROBID_URLS or [GROBID_URL]
+    with _pool_lock:
+        if _pool is None or _pool.urls != [base_url(u) for u in urls]:
+            if _pool is not None: _pool.close()
+            _pool = GrobidPool(urls, session=grobid_session())
+        return _pool
+
+TRANSLATION_CACHE_SIZE = 20000
+_translation_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def cache_get(key: tuple) -> Optional[str]:
+    with _cache_lock:
+        out = _translation_cache.get(key)
+        if out is not None: _translation_cache.move_to_end(key)
+        return out
+
+def cache_put(key: tuple, value: str):
+    with _cache_lock:
+        _translation_cache[key] = value
+        _translation_cache.move_to_end(key)
+        while len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+            _translation_cache.popitem(last=False)
 
 # ------------------------
 # Helpers
@@ -59,92 +141,418 @@ def escape_latex(text: str) -> str:
         "<": r"\textless{}", ">": r"\textgreater{}",
     }
     text = html.unescape(text)
-    for k,v in replacements.items():
-        text = text.replace(k,v)
+    # tek geçiş: sıralı replace \textbackslash{} içindeki {} parantezlerini yeniden kaçırıyordu
+    text = re.sub(r"[\\&%$#_{}~^<>]", lambda m: replacements[m.group()], text)
     return re.sub(r"\s+\n", "\n", text)
 
 # ------------------------
 # 1) GROBID parse
 # ------------------------
-def grobid_parse(pdf_path: Path, consolidate: int = 1, timeout: int = 120) -> str:
-    log.info(f"GROBID parse başlatılıyor: {pdf_path}")
-    with open(pdf_path, "rb") as f:
-        resp = requests.post(
-            GROBID_URL,
-            files={"input": f},
-            data={"consolidate": str(consolidate)},
-            timeout=timeout
-        )
-    if resp.status_code != 200:
-        raise RuntimeError(f"GROBID hata {resp.status_code}: {resp.text[:500]}")
-    return resp.text
+@metrics.timed("grobid_parse")
+def grobid_parse(pdf_path: Path, profile: Optional[str] = None, timeout: int = 120,
+                 source: Optional[DocumentSource] = None, dest: Optional[Path] = None) -> Union[str, Path]:
+    """
+    source verilirse yükleme dosyayı yeniden okumadan eşlenmiş tampondan yapılır.
+    dest verilirse TEI belleğe alınmadan parça parça bu dosyaya yazılır ve dest döner.
+    """
+    name = profile or GROBID_PROFILE
+    p = PROFILES[name] if name else choose_profile(GROBID_NEEDS)
+    log.info(f"GROBID parse başlatılıyor ({p.name}): {pdf_path}")
+    resp = grobid_pool().process(pdf_path, service=p.service, data=p.data, timeout=timeout,
+                                 content=source.upload() if source is not None else None, stream=dest is not None)
+    with resp:
+        if resp.status_code != 200:
+            raise RuntimeError(f"GROBID hata {resp.status_code}: {resp.text[:500]}")
+        if dest is None: return resp.text
+        with open(dest, "wb") as f:
+            for chunk in resp.iter_content(1 << 16): f.write(chunk)
+    return dest
 
 # ------------------------
 # 2) TEI XML → bloklar
 # ------------------------
-def extract_text_and_formulas(tei_xml: str) -> List[Dict]:
-    soup = BeautifulSoup(tei_xml, "lxml-xml")
-    body = soup.find("text") or soup
-    blocks, allowed = [], {"p","head","figure","table","note","div","list","row","cell","figDesc","label"}
-
-    for elem in body.find_all(True):
-        if elem.name not in allowed: continue
-        raw_html = str(elem)
-        formulas = ["".join(str(x) for x in f.contents).strip() for f in elem.find_all("formula")]
-        text_plain = raw_html
-        if formulas:
-            def repl(m,c=[0]):
-                token=f"__FORMULA_{c[0]}__"; c[0]+=1; return token
-            text_plain = re.sub(r"<formula[^>]*>.*?</formula>", repl, raw_html, flags=re.DOTALL)
-        text_plain = re.sub(r"<[^>]+>", " ", text_plain)
-        text_plain = html.unescape(re.sub(r"\s+"," ",text_plain)).strip()
-        blocks.append({"type": elem.name,"raw": raw_html,"formulas": formulas,"text_plain": text_plain})
+BLOCK_TAGS = {"p","head","figure","table","note","div","list","row","cell","figDesc","label"}
+FORMULA_CONTAINERS = {"div","body","front","back"}  # doğrudan altındaki <formula> display formüldür
+_WS = re.compile(r"\s+")
+
+def _localname(el) -> str:
+    return etree.QName(el).localname if isinstance(el.tag, str) else ""
+
+def _block_record(el, kind: str, page: Optional[int]) -> Block:
+    """Sonraki aşamaların ihtiyaç duyduğu kompakt kayıt: tür, metin, formül ofsetleri, sayfa."""
+    parts, coords = [], [el.get("coords")]
+    def walk(e):
+        if e.text: parts.append((False, e.text))
+        for c in e:
+            if not coords[0]: coords[0] = c.get("coords")  # <p> koordinatsızsa ilk <s>/<formula>
+            if _localname(c) == "formula":
+                parts.append((True, formulas.tei_source(c)))
+            else:
+                walk(c)
+            if c.tail: parts.append((False, c.tail))
+    walk(el)
+    pc = parse_coords(coords[0])
+    return Block.from_parts(kind, parts, page=pc[0] if pc else page, coords=pc[1] if pc else None)
+
+def _table_record(el, page: Optional[int]) -> Block:
+    """<table><row><cell>… → satır x hücre metinleri tutan tek TABLE bloğu."""
+    rows = tuple(
+        tuple(_WS.sub(" ", "".join(c.itertext())).strip() for c in row if _localname(c) == "cell")
+        for row in el.iter() if _localname(row) == "row")
+    rows = tuple(r for r in rows if any(r))
+    pc = parse_coords(el.get("coords"))
+    return Block(TABLE, "\n".join(" | ".join(r) for r in rows), rows=rows,
+                 page=pc[0] if pc else page, coords=pc[1] if pc else None)
+
+def _iter_tei_blocks(source) -> Iterator[Block]:
+    scope, nesting = 0, []  # nesting: açık blok elemanları için "alt blok içeriyor mu"
+    root_is_tei = None
+    page = None  # son <pb/> ya da koordinattan bilinen sayfa
+    in_table = 0  # tablo içindeki row/cell'ler ayrı blok olmaz; tablo tek blok olarak çıkar
+    in_formula, display = 0, False  # formül içindeki <label> blok değildir; display: kapsayıcının altında
+    for event, el in etree.iterparse(source, events=("start","end"), recover=True, huge_tree=True):
+        name = _localname(el)
+        if event == "start":
+            if root_is_tei is None:
+                root_is_tei = name == "TEI"
+                if not root_is_tei: scope += 1  # TEI parçası: her şey kapsamda
+            if name == "text": scope += 1
+            if scope and name == "table":
+                in_table += 1
+                if in_table == 1:
+                    if nesting: nesting[-1] = True
+                    nesting.append(True)
+            elif scope and not in_table and name == "formula":
+                in_formula += 1
+                if in_formula == 1:
+                    parent = el.getparent()
+                    display = not nesting or parent is None or _localname(parent) in FORMULA_CONTAINERS
+                    if display and nesting: nesting[-1] = True  # div'in metni alt bloklarda
+            elif scope and not in_table and not in_formula and name in BLOCK_TAGS:
+                if nesting: nesting[-1] = True
+                nesting.append(False)
+            continue
+        processed = False  # el bir blok olarak işlendi: alt ağacına artık gerek yok
+        if in_table:
+            if name == "table":
+                in_table -= 1
+                if not in_table:
+                    nesting.pop(); processed = True
+                    rec = _table_record(el, page)
+                    page = rec.page
+                    if rec.rows: yield rec
+        elif in_formula:
+            if name == "formula":
+                in_formula -= 1
+            if not in_formula and display:
+                # paragraf dışındaki (display) formül
+                processed = True
+                formula = Block.formula(formulas.tei_source(el))
+                pc = parse_coords(el.get("coords"))
+                if pc: page, formula.coords = pc
+                formula.page = page
+                if formula.text: yield formula
+        elif scope and name in BLOCK_TAGS:
+            processed = True
+            # yalnızca yaprak bloklar: div/table gibi kapsayıcıların metni zaten alt bloklarda
+            if not nesting.pop():
+                rec = _block_record(el, name, page)
+                page = rec.page
+                if rec.text: yield rec
+        elif name == "pb":
+            n = el.get("n")
+            page = int(n) if n and n.isdigit() else (page or 0) + 1
+        if name == "text": scope -= 1
+        if (processed or not nesting) and not in_formula:
+            # işlenmiş alt ağacı ve önceki kardeşleri bırak (üstteki div hâlâ açık olsa da:
+            # blok içeren elemanın kendi metni kullanılmaz); bellek pencere boyuna bağlı kalır
+            el.clear()
+            parent = el.getparent()
+            while parent is not None and el.getprevious() is not None:
+                del parent[0]
+
+def iter_blocks(tei: Union[str, bytes, Path]) -> Iterator[Block]:
+    """TEI'yi lxml iterparse ile akış halinde okuyup blokları belge sırasıyla üretir."""
+    if isinstance(tei, Path): return _iter_tei_blocks(str(tei))
+    data = tei.encode("utf-8") if isinstance(tei, str) else tei
+    return _iter_tei_blocks(BytesIO(data))
+
+def _subset_pdf(pdf_path: Union[Path, DocumentSource], pages: List[int], out_dir: Path) -> Path:
+    """Yalnızca `pages` sayfalarını içeren geçici PDF (GROBID'e daha az iş)."""
+    sub=out_dir/f"{pdf_path.stem}.pdf"
+    with fitz_open(pdf_path) as src, fitz.open() as dst:
+        for p in pages: dst.insert_pdf(src,from_page=p-1,to_page=p-1)
+        dst.save(sub)
+    return sub
+
+def _remap_pages(blocks: Iterator[Block], pages: List[int]) -> Iterator[Block]:
+    for b in blocks:
+        if b.page is not None and 1 <= b.page <= len(pages): b.page=pages[b.page-1]
+        yield b
+
+def _cleanup_after(blocks: Iterator[Block], tmp: tempfile.TemporaryDirectory) -> Iterator[Block]:
+    try: yield from blocks
+    finally: tmp.cleanup()
+
+def open_blocks(pdf_path: Path, engine: Optional[str] = None, pages: Optional[List[int]] = None,
+                source: Optional[DocumentSource] = None) -> Iterator[Block]:
+    """
+    Seçilen motorla belge bloklarını akış halinde döner. auto: kısa ve tek sütunlu
+    belgeler yerel çıkarılır; diğerleri GROBID'e gider, GROBID başarısızsa yerel yola düşer.
+    pages (1 tabanlı) verilirse GROBID'e yalnızca o sayfalar gönderilir.
+    source: dosyanın eşlenmiş tamponu; verilirse PDF yeniden okunmaz (akış bitene kadar açık kalmalı).
+    GROBID yanıtı geçici dosyaya akıtılır ve oradan iterparse ile okunur; akış bitince silinir.
+    """
+    engine = engine or EXTRACT_ENGINE
+    pdf = source or pdf_path
+    if engine not in ENGINES: raise ValueError(f"Bilinmeyen motor: {engine}")
+    if engine == "auto" and local_extract.is_simple(pdf, LOCAL_MAX_PAGES):
+        engine = "local"
+    if engine != "local":
+        tmp=tempfile.TemporaryDirectory(prefix="tei_")
+        try:
+            tei_path=Path(tmp.name)/"tei.xml"
+            if not pages:
+                tei=grobid_parse(pdf_path,source=source,dest=tei_path)
+                return _cleanup_after(iter_blocks(tei),tmp)
+            tei=grobid_parse(_subset_pdf(pdf,pages,Path(tmp.name)),dest=tei_path)
+            return _cleanup_after(_remap_pages(iter_blocks(tei),pages),tmp)
+        except Exception as e:
+            tmp.cleanup()
+            if engine == "grobid": raise
+            log.warning(f"GROBID kullanılamadı, yerel çıkarmaya geçiliyor: {e}")
+    log.info(f"Yerel (PyMuPDF) çıkarma: {pdf_path}")
+    metrics.count("local_extract")
+    return local_extract.iter_pdf_blocks(pdf, pages)
+
+@metrics.timed("extract_text_and_formulas")
+def extract_text_and_formulas(tei_xml: str) -> List[Block]:
+    blocks = list(iter_blocks(tei_xml))
     log.info(f"{len(blocks)} blok çıkarıldı.")
+    metrics.count("blocks", len(blocks))
     return blocks
 
 # ------------------------
 # 3) Çeviri
 # ------------------------
-def translate_blocks(blocks: List[Dict], src_lang=SRC_LANG, tgt_lang=TGT_LANG) -> List[Dict]:
+BATCH_SIZE = 16
+_scheduler = None  # modules.batcher.BatchScheduler; set_scheduler ile paylaşılır
+
+def set_scheduler(scheduler):
+    """Belgeler arası dinamik batching için paylaşılan zamanlayıcıyı ayarlar (None: kapalı)."""
+    global _scheduler
+    _scheduler = scheduler
+
+def _shortlist(tgt_lang: str, input_ids):
+    """VOCAB_SHORTLIST açıksa generate'i hedef dil + kaynak tokenlarıyla sınırlar (_MODEL_LOCK altında)."""
+    return shortlist.maybe_restrict(VOCAB_SHORTLIST, model, tokenizer, MODEL_NAME, tgt_lang, input_ids,
+                                    corpus_path=SHORTLIST_CORPUS)
+
+def translate_texts(texts: List[str], src_lang=SRC_LANG, tgt_lang=TGT_LANG) -> List[str]:
+    """Metin listesini tek bir (padding'li) generate çağrısıyla çevirir."""
     ensure_model_loaded()
-    for i, b in enumerate(blocks):
-        plain = b.get("text_plain") or ""
-        if not plain: b["translated"]=""; continue
-        try:
-            tokenizer.src_lang = src_lang
-            inputs = tokenizer(plain, return_tensors="pt", truncation=True)
+    if not texts: return []
+    with _MODEL_LOCK:
+        tokenizer.src_lang = src_lang
+        inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True)
+        with profiling.torch_ops("generate"), _shortlist(tgt_lang, inputs["input_ids"]):
             gen = model.generate(
                 **inputs,
                 forced_bos_token_id=tokenizer.get_lang_id(tgt_lang),
-                max_length=min(1024, len(inputs["input_ids"][0])*3),
+                max_length=min(1024, inputs["input_ids"].shape[1]*3),
                 num_beams=4, early_stopping=True
             )
-            out = tokenizer.batch_decode(gen, skip_special_tokens=True)[0]
-            # formül placeholderları geri koy
-            for idx, f in enumerate(b.get("formulas", [])):
-                out = out.replace(f"__FORMULA_{idx}__", f"[[FORMULA_{i}_{idx}]]{f}[[/FORMULA_{i}_{idx}]]", 1)
-            b["translated"]=out
-        except Exception as e:
-            log.warning(f"Çeviri hatası (blok {i}): {e}"); b["translated"]=plain
+        metrics.count("generate_calls")
+        metrics.count("tokens_in", int(inputs["attention_mask"].sum()))
+        metrics.count("tokens_out", int((gen != tokenizer.pad_token_id).sum()))
+        return tokenizer.batch_decode(gen, skip_special_tokens=True)
+
+def translate_texts_multi(texts: List[str], src_lang=SRC_LANG, tgt_langs=(TGT_LANG,)) -> Dict[str, List[str]]:
+    """
+    Aynı batch'i birden çok hedef dile çevirir: tokenizasyon ve encoder bir kez,
+    her dil için yalnızca decoder (generate) çalışır.
+    """
+    ensure_model_loaded()
+    if not texts: return {t: [] for t in tgt_langs}
+    from transformers.modeling_outputs import BaseModelOutput
+    out = {}
+    with _MODEL_LOCK:
+        tokenizer.src_lang = src_lang
+        inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True)
+        with profiling.torch_ops("encode"), torch.inference_mode():
+            hidden = model.get_encoder()(**inputs).last_hidden_state
+        metrics.count("encoder_calls")
+        metrics.count("tokens_in", int(inputs["attention_mask"].sum()))
+        for tgt in tgt_langs:
+            with profiling.torch_ops("generate"), _shortlist(tgt, inputs["input_ids"]):
+                # generate encoder çıktısını beam sayısına genişletirken nesneyi yerinde değiştirir: her dile kopya
+                gen = model.generate(
+                    encoder_outputs=BaseModelOutput(last_hidden_state=hidden),
+                    attention_mask=inputs["attention_mask"],
+                    forced_bos_token_id=tokenizer.get_lang_id(tgt),
+                    max_length=min(1024, inputs["input_ids"].shape[1]*3),
+                    num_beams=4, early_stopping=True
+                )
+            metrics.count("generate_calls")
+            metrics.count("tokens_out", int((gen != tokenizer.pad_token_id).sum()))
+            out[tgt] = tokenizer.batch_decode(gen, skip_special_tokens=True)
+    return out
+
+# NLLB/FLORES kodları (tur_Latn) -> M2M100 kodları (tr)
+_ISO3 = {"tur": "tr", "eng": "en", "deu": "de", "fra": "fr", "spa": "es", "ita": "it", "por": "pt", "rus": "ru",
+         "arb": "ar", "ara": "ar", "zho": "zh", "jpn": "ja", "kor": "ko", "nld": "nl", "pol": "pl", "ukr": "uk",
+         "ell": "el", "swe": "sv", "ces": "cs", "ron": "ro", "hun": "hu", "fin": "fi", "dan": "da", "bul": "bg",
+         "pes": "fa", "fas": "fa", "hin": "hi", "heb": "he", "ind": "id", "vie": "vi", "aze": "az", "kaz": "kk"}
+
+def lang_code(code: str) -> str:
+    code=code.strip()
+    if "_" not in code and len(code) <= 3 and code not in _ISO3: return code
+    iso=_ISO3.get(code.split("_")[0])
+    if iso is None: raise ValueError(f"Bilinmeyen dil kodu: {code}")
+    return iso
+
+def parse_langs(spec: Optional[str]) -> List[str]:
+    """ "tur_Latn,deu_Latn" ya da "tr,de" → ["tr", "de"] (tekrarsız, sıralı)."""
+    out=[]
+    for c in (spec or "").split(","):
+        if c.strip() and lang_code(c) not in out: out.append(lang_code(c))
+    return out
+
+_ONLY_FORMULAS = re.compile(r"(\s*__FORMULA_\d+__\s*)+")
+
+def _restore_formulas(out: str, b: Block, i: int) -> str:
+    for idx, f in enumerate(b.formulas):
+        out = out.replace(f"__FORMULA_{idx}__", f"[[FORMULA_{i}_{idx}]]{f}[[/FORMULA_{i}_{idx}]]", 1)
+    return out
+
+# Çevrilmeyecek tablo hücreleri: sayılar, yüzdeler, aralıklar, ± değerleri, tek sembol
+_NUMERIC_CELL = re.compile(r"[\s\d.,:;%‰±+\-−–—()\[\]/×x*^<>=≤≥~≈$€£]*|\W")
+TABLE_BATCH_SIZE = 64  # hücreler kısa: bir tablonun hücreleri tek batch'e sığsın
+
+def _is_translatable_cell(cell: str) -> bool:
+    return bool(cell) and not _NUMERIC_CELL.fullmatch(cell)
+
+@metrics.timed("translate_blocks")
+def translate_blocks(blocks: List[Block], src_lang=SRC_LANG, tgt_lang=TGT_LANG, scheduler=None,
+                     prefilled: Optional[Dict[str, str]] = None) -> List[Block]:
+    """prefilled: bu dil için önceden çevrilmiş metinler (çok dilli çeviride ortak encoder geçişinden)."""
+    scheduler = scheduler or _scheduler
+    prefilled = prefilled or {}
+    # önbellekte olmayan metinler (belge içinde tekrarlar tek sefer çevrilir)
+    # hedef: blok indeksi ya da tablo hücresi için (blok, satır, sütun)
+    pending: Dict[str, List[Union[int, tuple]]] = {}
+    cells: Dict[int, List[List[str]]] = {}  # tablo bloğu -> çevrilen satırlar
+    for i, b in enumerate(blocks):
+        if b.kind == TABLE:
+            cells[i] = [list(r) for r in b.rows or ()]
+            for r, row in enumerate(b.rows or ()):
+                for c, cell in enumerate(row):
+                    if not _is_translatable_cell(cell): metrics.count("table_cells_skipped"); continue
+                    out = prefilled.get(cell) or cache_get((src_lang, tgt_lang, cell))
+                    if out is not None: metrics.count("cache_hits"); cells[i][r][c] = out; continue
+                    pending.setdefault(cell, []).append((i, r, c))
+            continue
+        plain = b.text_plain
+        if not plain: b.translated=""; continue
+        if _ONLY_FORMULAS.fullmatch(plain): b.translated=_restore_formulas(plain, b, i); continue
+        out = prefilled.get(plain) or cache_get((src_lang, tgt_lang, plain))
+        if out is not None:
+            metrics.count("cache_hits"); b.translated=_restore_formulas(out, b, i); continue
+        pending.setdefault(plain, []).append(i)
+
+    def _apply(plain: str, out: Optional[str], err: Optional[Exception] = None):
+        if err is None: cache_put((src_lang, tgt_lang, plain), out)
+        for t in pending[plain]:
+            if isinstance(t, tuple):
+                if err is None: cells[t[0]][t[1]][t[2]] = out
+                continue
+            if err is not None:
+                log.warning(f"Çeviri hatası (blok {t}): {err}"); blocks[t].translated=plain
+            else:
+                blocks[t].translated=_restore_formulas(out, blocks[t], t)
+
+    # hücreler ayrı ve büyük batch'lerde: kısa oldukları için padding maliyeti düşük
+    cell_texts = sorted((t for t, tg in pending.items() if all(isinstance(x, tuple) for x in tg)), key=len)
+    cell_set = set(cell_texts)
+    texts = sorted((t for t in pending if t not in cell_set), key=len)  # benzer uzunluklar aynı batch'e
+    metrics.count("table_cells", sum(len(pending[t]) for t in cell_texts))
+    if scheduler is not None:
+        futures = [(t, scheduler.submit(t, src_lang, tgt_lang)) for t in texts + cell_texts]
+        for t, fut in futures:
+            try: _apply(t, fut.result())
+            except Exception as e: _apply(t, None, e)
+    else:
+        if pending: ensure_model_loaded()
+        for group, size in ((texts, BATCH_SIZE), (cell_texts, TABLE_BATCH_SIZE)):
+            for k in range(0, len(group), size):
+                chunk = group[k:k+size]
+                try:
+                    outs = translate_texts(chunk, src_lang, tgt_lang)
+                except Exception as e:
+                    for t in chunk: _apply(t, None, e)
+                    continue
+                for t, out in zip(chunk, outs): _apply(t, out)
+    for i, rows in cells.items():
+        blocks[i].translated_rows = tuple(tuple(r) for r in rows)
     return blocks
 
+def translate_blocks_multi(blocks: List[Block], src_lang=SRC_LANG, tgt_langs=(TGT_LANG,)) -> Dict[str, List[Block]]:
+    """
+    Blokları birden çok dile çevirir; her dil için blokların kopyası döner.
+    Eksik metinler ortak batch'lerde translate_texts_multi ile (encoder bir kez)
+    çevrilir; hata olursa o metinler dil başına translate_blocks'ta yeniden denenir.
+    """
+    if len(tgt_langs) == 1:
+        return {tgt_langs[0]: translate_blocks(blocks, src_lang, tgt_langs[0])}
+    texts=set()
+    for b in blocks:
+        if b.kind == TABLE:
+            texts.update(c for r in b.rows or () for c in r if _is_translatable_cell(c))
+        elif b.text_plain and not _ONLY_FORMULAS.fullmatch(b.text_plain):
+            texts.add(b.text_plain)
+    prefilled={t: {} for t in tgt_langs}
+    missing=sorted((x for x in texts if any(cache_get((src_lang, t, x)) is None for t in tgt_langs)), key=len)
+    for k in range(0, len(missing), BATCH_SIZE):
+        chunk=missing[k:k+BATCH_SIZE]
+        try:
+            outs=translate_texts_multi(chunk, src_lang, tgt_langs)
+        except Exception as e:
+            log.warning(f"Çok dilli batch çevrilemedi, diller tek tek denenecek: {e}")
+            continue
+        for t in tgt_langs:
+            for x, y in zip(chunk, outs[t]):
+                prefilled[t][x]=y; cache_put((src_lang, t, x), y)
+    return {t: translate_blocks([replace(b) for b in blocks], src_lang, t, prefilled=prefilled[t])
+            for t in tgt_langs}
+
 # ------------------------
 # 4) PDF görselleri
 # ------------------------
-def extract_images_from_pdf(pdf_path: Path, outdir: Path) -> Dict[int,List[Path]]:
-    doc = fitz.open(pdf_path); page_imgs={}
-    for i,page in enumerate(doc, start=1):
-        imgs=[]
-        for j,img in enumerate(page.get_images(full=True)):
-            xref=img[0]
-            try:
-                pix=fitz.Pixmap(doc,xref)
-                if pix.n>=5: pix=fitz.Pixmap(fitz.csRGB,pix)
-                ipath=outdir/f"{pdf_path.stem}_p{i}_img{j}.png"
-                pix.save(ipath); imgs.append(ipath)
-            except Exception as e:
-                log.warning(f"Resim çıkarma hatası p{i} img{j}: {e}")
-        if imgs: page_imgs[i]=imgs
+@metrics.timed("extract_images_from_pdf")
+def extract_images_from_pdf(pdf_path: Path, outdir: Path, pages: Optional[List[int]] = None,
+                            source: Optional[DocumentSource] = None) -> Dict[int,List[Path]]:
+    """Görselleri hedef DPI'ya küçültüp JPEG/PNG yazar (IMAGE_DPI=0: tam çözünürlük PNG)."""
+    page_imgs={}; bytes_in=bytes_out=0
+    with fitz_open(source or pdf_path) as doc:
+        for i in pages or range(1, doc.page_count+1):
+            page=doc[i-1]; imgs=[]
+            for j,img in enumerate(page.get_images(full=True)):
+                base=outdir/f"{pdf_path.stem}_p{i}_img{j}"
+                try:
+                    if image_prep.IMAGE_DPI:
+                        prep=image_prep.prepare(doc,img,base,image_prep.IMAGE_DPI)
+                        imgs.append(prep.path); bytes_in+=prep.bytes_in; bytes_out+=prep.bytes_out
+                        continue
+                    pix=fitz.Pixmap(doc,img[0])
+                    if pix.n>=5: pix=fitz.Pixmap(fitz.csRGB,pix)
+                    ipath=base.with_suffix(".png")
+                    pix.save(ipath); imgs.append(ipath); bytes_out+=ipath.stat().st_size
+                except Exception as e:
+                    log.warning(f"Resim çıkarma hatası p{i} img{j}: {e}")
+            if imgs: page_imgs[i]=imgs
+    metrics.count("images", sum(len(v) for v in page_imgs.values()))
+    metrics.count("image_bytes_in", bytes_in)
+    metrics.count("image_bytes_out", bytes_out)
     return page_imgs
 
 # ------------------------
@@ -152,55 +560,227 @@ def extract_images_from_pdf(pdf_path: Path, outdir: Path) -> Dict[int,List[Path]
 # ------------------------
 LATEX_PREAMBLE = r"""\documentclass[12pt]{article}
 \usepackage[utf8]{inputenc}
-\usepackage{amsmath,amssymb,graphicx,geometry,fancyvrb}
+\usepackage{amsmath,amssymb,graphicx,geometry,fancyvrb,booktabs}
 \geometry{margin=2cm}
 \begin{document}"""
 LATEX_POSTAMBLE = r"\end{document}"
 
-def create_latex_pdf(blocks: List[Dict], images: Dict[int,List[Path]], output_base: Path):
+_FORMULA_MARK = re.compile(r"\[\[FORMULA_\d+_\d+\]\](.*?)\[\[/FORMULA_\d+_\d+\]\]", re.DOTALL)
+
+def render_latex_block(b: Block) -> str:
+    if b.kind == TABLE:
+        rows=b.translated_rows or b.rows
+        if not rows: return ""
+        body=format_table(rows, escape=escape_latex)
+        if max(len(r) for r in rows) > 6: body=f"\\resizebox{{\\textwidth}}{{!}}{{%\n{body}}}\n"
+        return f"\\begin{{center}}\n{body}\\end{{center}}\n\n"
+    txt=(b.translated or "").strip()
+    if not txt: return ""
+    # split: metin ve formül parçaları sırayla gelir; formüller önbellekli LaTeX matematiğine çevrilir
+    parts=_FORMULA_MARK.split(txt)
+    display=b.kind == FORMULA or (len(parts) == 3 and not parts[0].strip() and not parts[2].strip())
+    out="".join(formulas.render(p, display=display) if k % 2 else escape_latex(p) for k,p in enumerate(parts))
+    return out.strip()+"\n\n"
+
+def render_fallback_block(b: Block) -> str:
+    """Blok derlenemezse yerine yazılan düz metin (formüller kaynak haliyle)."""
+    if b.kind == TABLE:
+        return "\\par\n".join(validator.safe_text(" | ".join(r)) for r in (b.translated_rows or b.rows or ()))
+    return validator.safe_text(_FORMULA_MARK.sub(r" \1 ", b.translated or b.text).replace(formulas.LATEX_MARK, ""))
+
+def write_latex_images(tex, images: Dict[int,List[Path]], out_dir: Path):
+    for p,imgs in sorted(images.items()):
+        tex.write(f"% page {p} images\n")
+        for ip in imgs:
+            rel=os.path.relpath(ip,out_dir)
+            tex.write("\\begin{center}\n"
+                      f"\\includegraphics[width={image_prep.DISPLAY_WIDTH}\\textwidth,"
+                      f"height={image_prep.DISPLAY_HEIGHT}\\textheight,keepaspectratio]{{{rel}}}\n"
+                      "\\end{center}\n\n")
+
+class PageWriter:
+    """
+    Blokları .tex'e yazar; her sayfanın görsellerini o sayfanın metninden hemen
+    sonra yerleştirir. Sayfası bilinmeyen bloklarda görseller sona kalır.
+    """
+    def __init__(self, tex, images: Optional[Dict[int,List[Path]]], out_dir: Path):
+        self.tex, self.out_dir = tex, out_dir
+        self.pending = sorted((images or {}).items())
+        self.page: Optional[int] = None
+
+    def write(self, b: Block):
+        if b.page is not None and b.page != self.page:
+            self.flush(before=b.page)
+            self.tex.write(f"% page {b.page}\n")
+            self.page = b.page
+        text=render_latex_block(b)
+        if hasattr(self.tex,"write_block"):  # validator.TexWriter: satır aralığı ve yedek kaydedilir
+            self.tex.write_block(text,render_fallback_block(b),b.page)
+        else:
+            self.tex.write(text)
+
+    def flush(self, before: Optional[int] = None):
+        """`before` sayfasından önceki (None: tüm) bekleyen görselleri yazar."""
+        k = 0
+        while k < len(self.pending) and (before is None or self.pending[k][0] < before): k += 1
+        if k:
+            write_latex_images(self.tex, dict(self.pending[:k]), self.out_dir)
+            del self.pending[:k]
+
+def _run_pdflatex(tex_path: Path) -> bool:
+    proc=subprocess.run(
+        [PDFLATEX,"-interaction=nonstopmode","-halt-on-error",tex_path.name],
+        cwd=str(tex_path.parent),check=False,stdout=subprocess.PIPE,stderr=subprocess.PIPE,text=True
+    )
+    return proc.returncode==0
+
+def compile_latex(tex_path: Path) -> Path:
+    """Derlenen PDF'in yolu; pdflatex hiçbir geçişte başaramazsa RuntimeError (varlığını çağıran denetler)."""
+    # compile twice (görsel yolları .tex'e göreli olduğundan çıktı klasöründe çalıştır)
+    ok=_run_pdflatex(tex_path)
+    if not ok:
+        # hatalı blokları günlükten/ikiye bölerek bul, yedekleriyle değiştir ve yeniden dene
+        log_path=tex_path.with_suffix(".log")
+        log_text=log_path.read_text(encoding="utf-8",errors="replace") if log_path.exists() else None
+        with metrics.stage("latex_repair"):
+            bad=validator.repair(tex_path,log_text,workers=LATEX_REPAIR_WORKERS,pdflatex=PDFLATEX)
+        if bad: log.warning(f"{len(bad)} blok derlenemedi, düz metinle yazıldı: {bad[:10]}")
+        ok=_run_pdflatex(tex_path)
+    ok=_run_pdflatex(tex_path) or ok
+    pdf=tex_path.with_suffix(".pdf")
+    if not ok:
+        raise RuntimeError(f"LaTeX derlemesi başarısız: {tex_path.with_suffix('.log')}")
+    log.info(f"PDF oluşturuldu: {pdf}")
+    return pdf
+
+@metrics.timed("create_latex_pdf")
+def create_latex_pdf(blocks: List[Block], images: Dict[int,List[Path]], output_base: Path):
     tex_path=output_base.with_suffix(".tex")
-    with open(tex_path,"w",encoding="utf-8") as tex:
+    with validator.TexWriter(tex_path) as tex:
         tex.write(LATEX_PREAMBLE+"\n")
-        for b in blocks:
-            txt=b.get("translated","").strip()
-            if not txt: continue
-            # formülleri LaTeX Verbatim olarak geri koy
-            txt=re.sub(r"\[\[FORMULA_\d+_\d+\]\](.*?)\[\[/FORMULA_\d+_\d+\]\]",
-                       lambda m:f"\n\\begin{{Verbatim}}[fontsize=\\small]\n{m.group(1)}\n\\end{{Verbatim}}\n",txt,flags=re.DOTALL)
-            # güvenli escape
-            parts=re.split(r"(\\begin\{Verbatim\}.*?\\end\{Verbatim\})",txt,flags=re.DOTALL)
-            for p in parts:
-                tex.write(p if p.startswith("\\begin{Verbatim}") else escape_latex(p))
-                tex.write("\n\n")
-        # ek görseller
-        for p,imgs in sorted(images.items()):
-            tex.write("\\clearpage\n% page {p} images\n")
-            for ip in imgs:
-                rel=os.path.relpath(ip,OUTPUT_DIR)
-                tex.write(f"\\includegraphics[width=0.9\\textwidth]{{{rel}}}\n\n")
+        writer=PageWriter(tex,images,output_base.parent)
+        for b in blocks: writer.write(b)
+        writer.flush()
         tex.write(LATEX_POSTAMBLE)
-    # compile twice
-    for _ in range(2):
-        subprocess.run(
-            ["pdflatex","-interaction=nonstopmode","-halt-on-error",
-             "-output-directory",str(OUTPUT_DIR),str(tex_path)],
-            check=False,stdout=subprocess.PIPE,stderr=subprocess.PIPE,text=True
-        )
-    log.info(f"PDF oluşturuldu: {output_base.with_suffix('.pdf')}")
+    return compile_latex(tex_path)
 
 # ------------------------
 # 6) Ana orkestrasyon
 # ------------------------
-def translate_pdf(pdf_path: Path, src_lang=SRC_LANG, tgt_lang=TGT_LANG):
+STREAM_WINDOW = 256  # aynı anda bellekte tutulan blok sayısı
+
+def stream_translate_to_latex(source: Union[str, bytes, Path, Iterator[Block]], tex_path: Path, src_lang=SRC_LANG,
+                              tgt_lang=TGT_LANG, images: Optional[Dict[int,List[Path]]] = None,
+                              window: int = STREAM_WINDOW) -> int:
+    """
+    TEI (ya da hazır blok akışı) → çeviri → .tex akışını sabit boyutlu pencerelerle yürütür.
+    Tepe bellek belge boyuna değil pencere boyuna bağlıdır. Yazılan blok sayısını döner.
+    """
+    return stream_translate_multi(source,{tgt_lang:tex_path},src_lang,images,window)
+
+def stream_translate_multi(source: Union[str, bytes, Path, Iterator[Block]], tex_paths: Dict[str, Path],
+                           src_lang=SRC_LANG, images: Optional[Dict[int,List[Path]]] = None,
+                           window: int = STREAM_WINDOW) -> int:
+    """
+    Aynı blok akışını her hedef dil için ayrı .tex'e yazar ({dil: yol}). Bloklar bir
+    kez ayrıştırılır; her pencere translate_blocks_multi ile tüm dillere çevrilir.
+    """
+    blocks_iter=iter_blocks(source) if isinstance(source,(str,bytes,Path)) else iter(source); del source
+    langs=list(tex_paths)
+    n=0
+    texs={t: validator.TexWriter(p) for t,p in tex_paths.items()}
+    opened=set()
+    def stage(name):
+        # pencere başına açılan aşamalar belge başına bir çağrı sayılır
+        call=name not in opened; opened.add(name)
+        return metrics.stage(name,call=call)
+    try:
+        writers={t: PageWriter(texs[t],images,tex_paths[t].parent) for t in langs}
+        for tex in texs.values(): tex.write(LATEX_PREAMBLE+"\n")
+        while True:
+            with stage("extract_text_and_formulas"):
+                win=list(islice(blocks_iter,window))
+            if not win: break
+            metrics.count("blocks",len(win))
+            with stage("translate_blocks"):
+                out=translate_blocks_multi(win,src_lang,langs)
+            with stage("create_latex_pdf"):
+                for t in langs:
+                    for b in out[t]: writers[t].write(b)
+            n+=len(win); del win,out
+        with stage("create_latex_pdf"):
+            for t in langs:
+                writers[t].flush()
+                texs[t].write(LATEX_POSTAMBLE)
+    finally:
+        for tex in texs.values(): tex.close()
+    log.info(f"{n} blok çevrildi ve yazıldı ({', '.join(langs)}).")
+    return n
+
+def parse_pages(spec: Optional[str]) -> Optional[List[int]]:
+    """Sayfa aralığı: "1-3,7" → [1, 2, 3, 7]; boş/None → None (tüm sayfalar)."""
+    if not spec: return None
+    pages=set()
+    for part in spec.split(","):
+        a,_,b=part.strip().partition("-")
+        pages.update(range(int(a),int(b or a)+1))
+    return sorted(pages)
+
+def translate_pdf(pdf_path: Path, src_lang=SRC_LANG, tgt_lang: Union[str, List[str]] = TGT_LANG,
+                  output_dir: Path = OUTPUT_DIR, engine: Optional[str] = None,
+                  pages: Optional[List[int]] = None, optimize: Optional[bool] = None) -> Union[Path, Dict[str, Path]]:
+    """
+    pages verilirse yalnızca o sayfalar çevrilir; çıktı `<ad>_p<ilk>-<son>.pdf` olur.
+    tgt_lang bir liste ise ayrıştırma, görseller ve encoder bir kez çalışır ve {dil: pdf}
+    döner. Adlandırma yalnızca dil sayısına bağlıdır: tek dil `<ad>.pdf`, birden çok dil
+    her dile `<ad>_<dil>.pdf`. optimize: None ise OPTIMIZE_PDF.
+    """
     log.info(f"Çeviri pipeline başlatıldı: {pdf_path}")
-    tei=grobid_parse(pdf_path)
-    blocks=extract_text_and_formulas(tei)
-    blocks=translate_blocks(blocks,src_lang,tgt_lang)
-    images=extract_images_from_pdf(pdf_path,OUTPUT_DIR)
-    create_latex_pdf(blocks,images,OUTPUT_DIR/pdf_path.stem)
+    output_dir=Path(output_dir); output_dir.mkdir(parents=True,exist_ok=True)
+    stem=pdf_path.stem if not pages else f"{pdf_path.stem}_p{pages[0]}-{pages[-1]}"
+    langs=[tgt_lang] if isinstance(tgt_lang,str) else list(tgt_lang)
+    tex_paths={t: (output_dir/(f"{stem}_{t}" if len(langs)>1 else stem)).with_suffix(".tex") for t in langs}
+    with metrics.document(pdf_path.name if not pages else f"{stem}{pdf_path.suffix}"):
+        # PDF bir kez eşlenir: GROBID yüklemesi, yerel çıkarma ve görseller aynı tamponu okur
+        with measure_io() as io, DocumentSource(pdf_path) as source:
+            blocks=open_blocks(pdf_path,engine,pages,source)
+            images=extract_images_from_pdf(pdf_path,output_dir,pages,source)  # diller aynı görsel dosyalarını kullanır
+            stream_translate_multi(blocks,tex_paths,src_lang,images); del blocks
+        metrics.count("pdf_bytes",source.size)
+        metrics.count("io_read_bytes",io.get("read_bytes",0))
+        metrics.count("io_rchar",io.get("rchar",0))
+        with metrics.stage("create_latex_pdf",call=False):  # .tex yazımıyla aynı çağrı
+            if len(langs)==1:
+                pdfs={langs[0]: compile_latex(tex_paths[langs[0]])}
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(langs),LATEX_COMPILE_WORKERS)) as pool:
+                    pdfs=dict(zip(langs,pool.map(metrics.bind(compile_latex),tex_paths.values())))
+        if OPTIMIZE_PDF if optimize is None else optimize:
+            with metrics.stage("optimize_pdf"):
+                for p in pdfs.values():
+                    if p.exists(): pdf_optimize.optimize(p,linearize=LINEARIZE_PDF)
     log.info("Pipeline tamamlandı.")
+    return pdfs if not isinstance(tgt_lang,str) else pdfs[langs[0]]
+
+def process_pdf(pdf_path: Path, output_dir: Path = OUTPUT_DIR, engine: Optional[str] = None,
+                pages: Optional[List[int]] = None, tgt_langs: Optional[List[str]] = None):
+    """main.py ve batch çalıştırıcıları için giriş noktası. tgt_langs: birden çok hedef dil."""
+    return translate_pdf(Path(pdf_path), tgt_lang=tgt_langs or TGT_LANG, output_dir=output_dir,
+                         engine=engine, pages=pages)
 
 if __name__=="__main__":
-    import sys
-    if len(sys.argv)<2: print("Kullanım: python pipeline.py dosya.pdf"); exit(1)
-    translate_pdf(Path(sys.argv[1]))
+    import argparse
+    ap=argparse.ArgumentParser(description="Tek PDF çevirisi")
+    ap.add_argument("pdf",type=str)
+    ap.add_argument("--profile",type=str,nargs="?",const=str(OUTPUT_DIR/"profile"),default=None,
+                    help="Aşamaları cProfile ile sar; .prof ve flamegraph (.collapsed) çıktıları bu klasöre")
+    ap.add_argument("--profile-torch",action="store_true",help="model.generate için torch operatör profili de kaydet")
+    ap.add_argument("--engine",choices=ENGINES,default=None,help=f"Metin çıkarma motoru (varsayılan: {EXTRACT_ENGINE})")
+    ap.add_argument("--pages",type=str,default=None,help="Yalnızca bu sayfaları çevir, ör. 3 ya da 1-4,9")
+    ap.add_argument("--tgt-lang",type=str,default=None,
+                    help="Hedef dil(ler), virgülle: en ya da tur_Latn,deu_Latn,fra_Latn (her dile ayrı PDF)")
+    args=ap.parse_args()
+    if args.profile: profiling.enable(Path(args.profile),torch_ops=args.profile_torch)
+    langs=parse_langs(args.tgt_lang)
+    translate_pdf(Path(args.pdf),tgt_lang=langs or TGT_LANG,engine=args.engine,pages=parse_pages(args.pages))
+    if args.profile: print(profiling.report(Path(args.profile)))
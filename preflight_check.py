@@ -1,6 +1,6 @@
 import importlib
 import os
-import subprocess
+import shutil
 import sys
 import requests
 
@@ -27,8 +27,10 @@ DIRECTORIES = [
     "logs"
 ]
 
-# Grobid varsayılan
+# Grobid varsayılan (birden fazla örnek için GROBID_URLS=http://h1:8070,http://h2:8070)
 GROBID_URL = "http://localhost:8070/api/isalive"
+GROBID_URLS = [u.strip().rstrip("/") + "/api/isalive"
+               for u in os.environ.get("GROBID_URLS", "").split(",") if u.strip()] or [GROBID_URL]
 
 
 # ==============================
@@ -56,9 +58,9 @@ def check_system_binaries():
     print("\n🔍 Sistem bağımlılıkları kontrol ediliyor...")
     missing = []
     for binary in REQUIRED_SYSTEM_BINARIES:
-        result = subprocess.run(["which", binary], capture_output=True, text=True)
-        if result.returncode == 0 and result.stdout.strip():
-            print(f"  ✅ {binary} bulundu: {result.stdout.strip()}")
+        found = shutil.which(binary)
+        if found:
+            print(f"  ✅ {binary} bulundu: {found}")
         else:
             print(f"  ❌ {binary} bulunamadı!")
             missing.append(binary)
@@ -93,18 +95,22 @@ def check_directories():
 
 def check_grobid():
     print("\n🔍 Grobid servisi kontrol ediliyor...")
-    try:
-        response = requests.get(GROBID_URL, timeout=5)
-        if response.status_code == 200:
-            print("  ✅ Grobid çalışıyor")
-            return True
-        else:
-            print(f"  ❌ Grobid cevap veriyor ama hata kodu döndü: {response.status_code}")
-            return False
-    except requests.RequestException as e:
-        print(f"  ❌ Grobid’e ulaşılamadı: {e}")
+    alive = 0
+    for url in GROBID_URLS:
+        try:
+            response = requests.get(url, timeout=5)
+            if response.status_code == 200:
+                print(f"  ✅ Grobid çalışıyor: {url}")
+                alive += 1
+            else:
+                print(f"  ❌ Grobid cevap veriyor ama hata kodu döndü: {response.status_code} ({url})")
+        except requests.RequestException as e:
+            print(f"  ❌ Grobid’e ulaşılamadı: {e}")
+    if not alive:
         print("👉 Grobid'i başlat: docker-compose up -d")
-        return False
+    elif alive < len(GROBID_URLS):
+        print(f"  ⚠️ {len(GROBID_URLS) - alive} örnek kapalı; istekler çalışan {alive} örneğe yönlendirilecek")
+    return alive > 0
 
 
 # ==============================
@@ -135,6 +141,7 @@ def main():
     print("===================================")
     if all_ok:
         print("🎉 Her şey hazır! Pipeline güvenle çalıştırılabilir.")
+        print("👉 İlk belgeyi hızlandırmak için: python main.py warmup (model, GROBID, LaTeX paralel ısınma)")
         sys.exit(0)
     else:
         print("⚠️ Bazı sorunlar var. Yukarıdaki hataları düzeltmelisin.")
@@ -0,0 +1,39 @@
+import threading
+
+from modules.batcher import BatchScheduler
+
+
+def test_segments_from_many_documents_share_batches():
+    calls = []
+
+    def fake_translate(texts, src, tgt):
+        calls.append(list(texts))
+        return [f"{tgt}:{t}" for t in texts]
+
+    with BatchScheduler(fake_translate, max_tokens=10_000, max_batch=64, max_wait=0.2) as sched:
+        results = {}
+
+        def doc(n):
+            results[n] = sched.translate([f"doc{n} seg{k}" for k in range(3)], "tr", "en")
+
+        threads = [threading.Thread(target=doc, args=(n,)) for n in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert results[2] == ["en:doc2 seg0", "en:doc2 seg1", "en:doc2 seg2"]
+    assert sum(len(c) for c in calls) == 15
+    assert len(calls) < 15
+
+
+def test_token_budget_splits_batches():
+    sizes = []
+
+    def fake_translate(texts, src, tgt):
+        sizes.append(len(texts))
+        return texts
+
+    with BatchScheduler(fake_translate, max_tokens=20, max_wait=0.01, count_tokens=lambda t: 5) as sched:
+        assert sched.translate([str(i) for i in range(10)], "tr", "en") == [str(i) for i in range(10)]
+    assert max(sizes) <= 4
@@ -0,0 +1,24 @@
+import urllib.request
+
+import requests
+
+from benchmarks.grobid_stub import GrobidStub
+from benchmarks.run import run_benchmark
+
+
+def test_stub_serves_tei_and_injects_errors(tmp_path):
+    (tmp_path / "doc.tei.xml").write_text("<TEI>doc</TEI>", encoding="utf-8")
+    with GrobidStub(tei_dir=tmp_path, error_rate=1.0) as stub:
+        assert urllib.request.urlopen(f"{stub.base_url}/api/isalive").read() == b"true"
+        resp = requests.post(stub.fulltext_url, files={"input": ("doc.pdf", b"%PDF")})
+        assert resp.status_code == 503
+        stub.error_rate = 0.0
+        resp = requests.post(stub.fulltext_url, files={"input": ("doc.pdf", b"%PDF")})
+        assert resp.text == "<TEI>doc</TEI>"
+
+
+def test_benchmark_runs_offline(tmp_path):
+    res = run_benchmark(sizes=(1, 2), repeat=1, latency=0.0, cost_per_token=0.0, work_dir=tmp_path)
+    assert res["docs_ok"] == 2 and res["docs_failed"] == 0
+    assert set(res["sizes"]) == {"1", "2"}
+    assert "grobid_parse" in res["sizes"]["1"]["stages"]
@@ -0,0 +1,28 @@
+import sys
+
+from modules.blocks import Block, TEXT
+from modules.xml_parser import parse_tei
+from formatter import build_latex
+from parser import extract_blocks
+
+
+def test_formula_spans_are_offsets_into_text():
+    b = Block.from_parts("p", [(False, " Let\n "), (True, " x+y "), (False, " be   small.")])
+    assert b.text == "Let x+y be small."
+    assert b.formulas == ["x+y"]
+    assert b.text_plain == "Let __FORMULA_0__ be small."
+    assert b.kind is sys.intern("text")
+
+
+def test_stages_share_block_model():
+    tei = '<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><p>Merhaba</p><formula>a=b</formula><pb/></text></TEI>'
+    kinds = [b.kind for b in parse_tei(tei)]
+    assert kinds == ["text", "formula", "pb"]
+
+    blocks = extract_blocks("<p>Hi</p><table><row><cell>1</cell><cell>2</cell></row></table>")
+    assert blocks[0].kind == TEXT and blocks[1].rows == (("1", "2"),)
+    assert "1 & 2" in build_latex(blocks, {})
+
+
+def test_slots_block_has_no_dict():
+    assert not hasattr(Block(TEXT, "x"), "__dict__")
@@ -0,0 +1,90 @@
+import fitz
+import pytest
+
+import pipeline
+from benchmarks.fake_translator import FakeTranslator
+from benchmarks.synth import make_pdf
+from modules import chunked
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Modelsiz çeviri; pdflatex yerine her .tex için tek sayfalık PDF."""
+    compiled = []
+
+    def fake_compile(tex_path):
+        out = tex_path.with_suffix(".pdf")
+        with fitz.open() as doc:
+            doc.new_page().insert_text((72, 72), tex_path.stem)
+            doc.save(out)
+        compiled.append(tex_path.stem)
+        return out
+
+    monkeypatch.setattr(pipeline, "compile_latex", fake_compile)
+    restore = FakeTranslator(cost_per_token=0.0, call_overhead=0.0).install(pipeline)
+    yield compiled
+    restore()
+
+
+def test_plan_chunks():
+    assert chunked.plan_chunks(7, 3) == [[1, 2, 3], [4, 5, 6], [7]]
+    assert chunked.plan_chunks(7, 2, pages=[2, 3, 5, 6, 7, 9]) == [[2, 3], [5, 6], [7]]
+
+
+def test_chunked_run_honours_page_selection(tmp_path, offline):
+    pdf = make_pdf(tmp_path / "book.pdf", pages=7)
+    out = chunked.translate_chunked(pdf, output_dir=tmp_path / "out", chunk_pages=2, workers=2, engine="local",
+                                    pages=[2, 3, 5, 6, 7])
+    assert out.name == "book_p2-7.pdf"
+    assert sorted(offline) == ["book_p2-3", "book_p5-6", "book_p7-7"]
+
+
+def test_chunks_merge_in_order_and_retry(tmp_path, offline, monkeypatch):
+    pdf = make_pdf(tmp_path / "book.pdf", pages=7)
+    real = pipeline.translate_pdf
+    calls = {"n": 0}
+
+    def flaky(pdf_path, *a, pages=None, **kw):
+        if pages[0] == 4 and calls["n"] == 0:
+            calls["n"] += 1
+            raise RuntimeError("geçici hata")
+        return real(pdf_path, *a, pages=pages, **kw)
+
+    monkeypatch.setattr(pipeline, "translate_pdf", flaky)
+    out = chunked.translate_chunked(pdf, output_dir=tmp_path / "out", chunk_pages=3, workers=3, engine="local")
+    with fitz.open(out) as doc:
+        assert [p.get_text().strip() for p in doc] == ["book_p1-3", "book_p4-6", "book_p7-7"]
+    assert sorted(offline) == ["book_p1-3", "book_p4-6", "book_p7-7"]
+
+
+def test_failed_chunk_is_the_only_one_rerun(tmp_path, offline, monkeypatch):
+    pdf = make_pdf(tmp_path / "book.pdf", pages=4)
+    real = pipeline.translate_pdf
+
+    def broken(pdf_path, *a, pages=None, **kw):
+        if pages[0] == 3:
+            raise RuntimeError("kalıcı hata")
+        return real(pdf_path, *a, pages=pages, **kw)
+
+    monkeypatch.setattr(pipeline, "translate_pdf", broken)
+    with pytest.raises(RuntimeError, match="3-4"):
+        chunked.translate_chunked(pdf, output_dir=tmp_path / "out", chunk_pages=2, workers=2, engine="local")
+    assert offline == ["book_p1-2"]
+
+    monkeypatch.setattr(pipeline, "translate_pdf", real)
+    chunked.translate_chunked(pdf, output_dir=tmp_path / "out", chunk_pages=2, workers=2, engine="local")
+    assert offline == ["book_p1-2", "book_p3-4"]
+
+    chunked.translate_chunked(pdf, output_dir=tmp_path / "out", chunk_pages=2, engine="local", redo=[1])
+    assert offline[-1] == "book_p1-2" and len(offline) == 3
+
+
+def test_chunked_run_merges_each_target_language(tmp_path, offline):
+    pdf = make_pdf(tmp_path / "book.pdf", pages=4)
+    out = chunked.translate_chunked(pdf, tgt_lang=["en", "de"], output_dir=tmp_path / "out", chunk_pages=2,
+                                    workers=2, engine="local")
+    assert {t: p.name for t, p in out.items()} == {"en": "book_en.pdf", "de": "book_de.pdf"}
+    with fitz.open(out["de"]) as doc:
+        assert [p.get_text().strip() for p in doc] == ["book_p1-2_de", "book_p3-4_de"]
+    single = chunked.translate_chunked(pdf, tgt_lang=["en"], output_dir=tmp_path / "one", chunk_pages=2, engine="local")
+    assert single == {"en": tmp_path / "one" / "book.pdf"}
@@ -0,0 +1,33 @@
+import hashlib
+
+import pipeline
+from benchmarks.grobid_stub import GrobidStub
+from benchmarks.synth import make_pdf
+from modules import document_source
+from modules.document_source import DocumentSource
+
+
+def test_one_buffer_serves_every_reader(tmp_path, monkeypatch):
+    pdf = make_pdf(tmp_path / "doc.pdf", pages=2)
+    raw = pdf.read_bytes()
+    with DocumentSource(pdf) as src, GrobidStub() as stub:
+        assert src.digest == hashlib.blake2b(raw, digest_size=16).hexdigest()
+        assert src.page_count == 2 and src.size == len(raw) and src.upload() == ("doc.pdf", raw)
+        pdf.unlink()  # bundan sonra dosya yoluyla açılış başarısız olurdu
+        blocks = list(pipeline.open_blocks(pdf, "local", source=src))
+        images = pipeline.extract_images_from_pdf(pdf, tmp_path, source=src)
+        monkeypatch.setattr(pipeline, "GROBID_URLS", [stub.base_url])
+        tei = pipeline.grobid_parse(pdf, source=src)
+    assert {b.page for b in blocks} == {1, 2} and images and "<TEI" in tei
+    assert stub.requests == 1
+
+
+def test_measure_reads_less_than_separate_opens(tmp_path):
+    pdf = make_pdf(tmp_path / "doc.pdf", pages=3)
+    with document_source.measure_io() as io:
+        pdf.read_bytes()
+    if not io:  # /proc/self/io yok (Linux dışı)
+        return
+    assert io["rchar"] >= pdf.stat().st_size
+    m = document_source.measure(pdf)
+    assert m["source"]["rchar"] < m["legacy"]["rchar"]
@@ -0,0 +1,64 @@
+from lxml import etree
+
+import pipeline
+from modules import formulas, metrics
+from modules.blocks import Block, FORMULA
+
+MML = ('<formula xmlns="http://www.tei-c.org/ns/1.0"><math xmlns="http://www.w3.org/1998/Math/MathML"><mrow>'
+       '<msup><mi>x</mi><mn>2</mn></msup><mo>+</mo><mfrac><mn>1</mn><mi>α</mi></mfrac>'
+       '</mrow></math><label>(3)</label></formula>')
+
+
+def test_unicode_and_mathml_to_latex():
+    assert formulas.convert("α² ≤ β") == (True, r"\alpha ^{2} \leq \beta")
+    assert formulas.convert("sin x + 50%") == (True, r"\sin x + 50\%")
+    assert formulas.tei_source(etree.fromstring(MML)) == formulas.LATEX_MARK + r"{x}^{2} + \frac{1}{\alpha}"
+    plain = etree.fromstring('<formula xmlns="http://www.tei-c.org/ns/1.0">E = mc 2 <label>(1)</label></formula>')
+    assert formulas.tei_source(plain) == "E = mc 2"
+
+
+def test_validate_rejects_what_pdflatex_would():
+    assert formulas.validate(r"\frac{a}{b}")
+    assert not formulas.validate(r"\frac{a}{b")
+    assert not formulas.validate(r"\foo x")
+    assert not formulas.validate("x^")
+    assert not formulas.validate("a & b")
+    assert not formulas.validate(r"\left( x")
+    assert formulas.validate(r"\begin{pmatrix} a & b \end{pmatrix}")
+
+
+def test_cache_and_fallback():
+    formulas.clear_cache()
+    run = metrics.RunMetrics()
+    with metrics.document("d", run=run) as doc:
+        first = formulas.render("∑ x_i", display=True)
+        assert formulas.render("∑ x_i", display=True) == first == r"\[\sum x_i\]"
+        assert formulas.render("ş^") == r"\texttt{ş\^{}}"
+        assert "Verbatim" in formulas.render("ş^", display=True)
+    assert doc.counters["formula_cache_hits"] == 2
+    assert doc.counters["formula_fallbacks"] == 1
+
+
+def test_mathml_source_is_not_converted_twice():
+    braces = etree.fromstring('<formula xmlns="http://www.tei-c.org/ns/1.0"><math xmlns="http://www.w3.org/1998/'
+                              'Math/MathML"><mo>{</mo><mi>x</mi><mo>}</mo></math></formula>')
+    source = formulas.tei_source(braces)
+    assert formulas.render(source) == r"\(\{ x \}\)"
+    assert "textbackslash" not in formulas.render(source, display=True)
+
+
+def test_fallback_has_no_raw_unicode_symbols():
+    inline = formulas.render("∑ ≤ ş^")
+    display = formulas.render("∑ ≤ ş^ ☃", display=True)
+    assert inline == r"\texttt{\(\sum\) \(\leq\) ş\^{}}"
+    assert "Verbatim" in display and r"\sum" in display and "∑" not in display and "☃" not in display
+
+
+def test_render_latex_block_uses_math_mode():
+    b = Block.from_parts("text", [(False, "Burada "), (True, "α ≤ 1"), (False, " olsun.")])
+    b.translated = pipeline._restore_formulas("Here __FORMULA_0__ holds.", b, 0)
+    assert pipeline.render_latex_block(b).strip() == r"Here \(\alpha \leq 1\) holds."
+    f = Block.formula("x² = y")
+    f.translated = pipeline._restore_formulas(f.text_plain, f, 1)
+    assert f.kind == FORMULA
+    assert pipeline.render_latex_block(f).strip() == r"\[x^{2} = y\]"
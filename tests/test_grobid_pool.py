@@ -0,0 +1,105 @@
+import threading
+
+from benchmarks.grobid_stub import GrobidStub
+from modules.grobid_client import BODY, COORDS, HEADER_META, GrobidPool, base_url, choose_profile
+
+
+def _pdf(tmp_path):
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    return pdf
+
+
+def test_base_url_strips_api_path():
+    assert base_url("http://h:8070/api/processFulltextDocument") == "http://h:8070"
+    assert base_url("http://h:8070/") == "http://h:8070"
+
+
+def test_spreads_load_across_instances(tmp_path):
+    pdf = _pdf(tmp_path)
+    with GrobidStub(latency=0.05) as a, GrobidStub(latency=0.05) as b:
+        pool = GrobidPool([a.base_url, b.base_url])
+        threads = [threading.Thread(target=pool.process, args=(pdf,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert a.requests > 0 and b.requests > 0
+        assert a.requests + b.requests == 8
+
+
+def test_ejects_failing_instance_and_readmits(tmp_path):
+    pdf = _pdf(tmp_path)
+    with GrobidStub(error_rate=1.0, error_status=500) as bad, GrobidStub() as good:
+        pool = GrobidPool([bad.base_url, good.base_url], max_failures=2, probe_interval=60)
+        for _ in range(6):
+            assert pool.process(pdf).status_code == 200  # 500 -> diğer örnekle yeniden dener
+        assert bad.requests == 2
+        assert [ep["healthy"] for ep in pool.stats()] == [False, True]
+
+        bad.error_rate = 0.0
+        assert pool.probe() == 1
+        assert all(ep["healthy"] for ep in pool.stats())
+        pool.close()
+
+
+def test_busy_instances_are_not_ejected(tmp_path):
+    pdf = _pdf(tmp_path)
+    with GrobidStub(error_rate=1.0) as busy, GrobidStub() as good:
+        pool = GrobidPool([busy.base_url, good.base_url], max_failures=1, busy_backoff=0.01)
+        for _ in range(4):
+            assert pool.process(pdf).status_code == 200
+        assert [ep["healthy"] for ep in pool.stats()] == [True, True]
+        assert pool.stats()[0]["busy"] > 0 and pool.stats()[0]["errors"] == 0
+
+        good.error_rate = 1.0  # hepsi dolu: bekleyip yeniden dener, yine de çıkarmaz
+        pool.busy_retries = 2
+        assert pool.process(pdf).status_code == 503
+        assert good.requests == 4 + 3 and all(ep["healthy"] for ep in pool.stats())
+        pool.close()
+
+
+def test_document_failing_everywhere_is_not_charged_to_instances(tmp_path):
+    pdf = _pdf(tmp_path)
+    with GrobidStub(error_rate=1.0, error_status=500) as a, GrobidStub(error_rate=1.0, error_status=500) as b:
+        pool = GrobidPool([a.base_url, b.base_url], max_failures=1)
+        for _ in range(3):  # bozuk belge: her örnek 500
+            assert pool.process(pdf).status_code == 500
+        assert all(ep["healthy"] and ep["failures"] == 0 for ep in pool.stats())
+        assert a.requests == b.requests == 3
+        pool.close()
+
+
+def test_unreachable_instance_stays_ejected(tmp_path):
+    pdf = _pdf(tmp_path)
+    with GrobidStub() as good:
+        pool = GrobidPool(["http://127.0.0.1:9", good.base_url], max_failures=1, probe_interval=60)
+        for _ in range(3):
+            assert pool.process(pdf, timeout=5).status_code == 200
+        assert pool.probe() == 0
+        assert [ep["healthy"] for ep in pool.stats()] == [False, True]
+        pool.close()
+
+
+def test_choose_profile_picks_cheapest_that_covers_needs():
+    assert choose_profile({BODY}).name == "fast"
+    assert choose_profile({BODY, COORDS}).name == "layout"
+    assert choose_profile({HEADER_META}).name == "header"
+
+
+def test_pipeline_requests_cheapest_profile(tmp_path, monkeypatch):
+    import pipeline
+    pdf = _pdf(tmp_path)
+    with GrobidStub(consolidation_latency=0.5) as stub:
+        monkeypatch.setattr(pipeline, "GROBID_URLS", [stub.base_url])
+        monkeypatch.setattr(pipeline, "GROBID_NEEDS", {BODY})
+        pipeline.grobid_parse(pdf)
+        assert stub.last_fields.get("consolidateCitations") == ["0"]
+        assert "teiCoordinates" not in stub.last_fields
+        monkeypatch.setattr(pipeline, "GROBID_NEEDS", {BODY, COORDS})
+        pipeline.grobid_parse(pdf)
+        assert stub.last_fields.get("consolidateCitations") == ["0"]
+        assert "p" in stub.last_fields["teiCoordinates"]
+        pipeline.grobid_parse(pdf, profile="full")
+        assert stub.last_fields["consolidateCitations"] == ["1"]
+        assert stub.service_time("/api/processFulltextDocument", 0, stub.last_fields) >= 1.0
@@ -0,0 +1,76 @@
+import random
+
+import fitz
+
+import pipeline
+from modules import images, metrics
+
+
+def _pdf(path):
+    doc = fitz.open()
+    page = doc.new_page()
+    rnd = random.Random(1)
+    tile = fitz.Pixmap(fitz.csRGB, 32, 40, rnd.randbytes(32 * 40 * 3), False)
+    page.insert_image(fitz.Rect(0, 0, 612, 396), pixmap=fitz.Pixmap(tile, 2400, 3000, None))  # tarama
+    line_art = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 300, 200), False)
+    line_art.set_rect(line_art.irect, (255,))
+    line_art.set_rect(fitz.IRect(20, 20, 280, 30), (0,))
+    page.insert_image(fitz.Rect(0, 400, 300, 600), pixmap=line_art)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_target_size_fits_display_box_without_upscaling():
+    _, box_h = images.display_box_in()
+    w, h = images.target_size(3000, 3000, dpi=100)
+    assert w == h == round(box_h * 100)  # kare görsel yükseklik sınırına takılır
+    assert images.target_size(200, 100, dpi=150) == (200, 100)
+
+
+def test_photos_become_jpeg_line_art_stays_png_and_results_are_cached(tmp_path, monkeypatch):
+    pdf = _pdf(tmp_path / "scan.pdf")
+    monkeypatch.setattr(images, "IMAGE_DPI", 150)
+    monkeypatch.setattr(images, "CACHE_DIR", tmp_path / "cache")
+    run = metrics.RunMetrics()
+    with metrics.document("scan.pdf", run=run) as doc:
+        first = pipeline.extract_images_from_pdf(pdf, tmp_path)[1]
+        again = pipeline.extract_images_from_pdf(pdf, tmp_path)[1]
+    assert [p.suffix for p in first] == [".jpg", ".png"] and again == first
+    with fitz.open(first[0]) as img:
+        assert max(img[0].rect.width, img[0].rect.height) <= round(images.display_box_in()[1] * 150)
+    assert doc.counters["images_resampled"] == 1 and doc.counters["image_cache_hits"] == 2
+    assert doc.counters["image_bytes_out"] < doc.counters["image_bytes_in"] // 10
+    tex = tmp_path / "doc.tex"
+    with open(tex, "w", encoding="utf-8") as f:
+        pipeline.write_latex_images(f, {1: first}, tmp_path)
+    assert "scan_p1_img0.jpg" in tex.read_text(encoding="utf-8")
+
+
+def test_dpi_zero_keeps_full_resolution_png(tmp_path, monkeypatch):
+    pdf = _pdf(tmp_path / "scan.pdf")
+    monkeypatch.setattr(images, "IMAGE_DPI", 0)
+    out = pipeline.extract_images_from_pdf(pdf, tmp_path)[1]
+    assert [p.name for p in out] == ["scan_p1_img0.png", "scan_p1_img1.png"]
+    assert fitz.Pixmap(str(out[0])).width == 2400
+
+
+def test_cache_key_covers_image_dictionary_and_smask(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "CACHE_DIR", tmp_path / "cache")
+    doc = fitz.open()
+    page = doc.new_page()
+    rnd = random.Random(2)
+    noise = fitz.Pixmap(fitz.csGRAY, 80, 60, rnd.randbytes(80 * 60), False)
+    wide = page.insert_image(fitz.Rect(0, 0, 160, 120), pixmap=noise)
+    tall = doc.get_new_xref()  # aynı ham baytlar, boyutlar ters
+    doc.update_object(tall, doc.xref_object(wide).replace("/Width 80", "/Width 60").replace("/Height 60", "/Height 80"))
+    doc.update_stream(tall, doc.xref_stream_raw(wide), compress=False)
+    page.insert_image(fitz.Rect(200, 0, 260, 80), xref=tall)
+    alpha = fitz.Pixmap(fitz.csRGB, 80, 60, rnd.randbytes(80 * 60 * 3), False)
+    alpha = fitz.Pixmap(alpha, fitz.Pixmap(fitz.csGRAY, 80, 60, bytes([128]) * 80 * 60, False))
+    page.insert_image(fitz.Rect(0, 200, 160, 320), pixmap=alpha)
+    prepared = {img[0]: images.prepare(doc, img, tmp_path / f"img{img[0]}") for img in page.get_images(full=True)}
+    assert fitz.Pixmap(str(prepared[wide].path)).width == 80
+    assert fitz.Pixmap(str(prepared[tall].path)).width == 60 and not prepared[tall].cached
+    [masked] = [p for x, p in prepared.items() if x not in (wide, tall)]
+    assert masked.path.suffix == ".png" and fitz.Pixmap(str(masked.path)).alpha  # çok renkli ama saydam
@@ -0,0 +1,61 @@
+import fitz
+import pytest
+
+import pipeline
+from benchmarks.fake_translator import FakeTranslator
+from benchmarks.synth import make_pdf
+from modules import local_extract
+from modules.local_extract import is_math_span, iter_pdf_blocks
+
+
+def _pdf(path):
+    doc = fitz.open()
+    for n in (1, 2):
+        page = doc.new_page()
+        page.insert_text((72, 40), "Running header", fontsize=9)
+        page.insert_text((72, 120), f"Section {n}", fontsize=16)
+        page.insert_textbox(fitz.Rect(72, 150, 520, 260), "Plain paragraph text on the page.", fontsize=11)
+        page.insert_text((72, 300), "Let ", fontsize=11)
+        page.insert_text((100, 300), "a", fontsize=11, fontname="Symbol")
+    doc.save(path)
+    return path
+
+
+def test_blocks_carry_pages_headings_and_formulas(tmp_path):
+    blocks = list(iter_pdf_blocks(_pdf(tmp_path / "d.pdf")))
+    assert [b.page for b in blocks] == [1, 1, 1, 2, 2, 2]
+    assert [b.kind for b in blocks[:3]] == ["head", "text", "text"]
+    assert not any("Running header" in b.text for b in blocks)
+    assert blocks[2].text_plain == "Let __FORMULA_0__" and len(blocks[2].formulas) == 1
+    assert [b.page for b in iter_pdf_blocks(tmp_path / "d.pdf", pages=[2])] == [2, 2, 2]
+
+
+def test_math_span_heuristics():
+    span = lambda text, font="Helvetica", flags=0, size=11: {"text": text, "font": font, "flags": flags, "size": size}
+    assert is_math_span(span("x", "CambriaMath"), 11)
+    assert is_math_span(span("∫ f ≤ α"), 11)
+    assert is_math_span(span("2", flags=1, size=8), 11)
+    assert is_math_span(span("x", flags=2), 11)
+    assert not is_math_span(span("ordinary words"), 11)
+    assert not is_math_span(span("emphasis", flags=2), 11)
+
+
+def test_auto_engine_prefers_local_and_falls_back(tmp_path, monkeypatch):
+    short = make_pdf(tmp_path / "short.pdf", pages=1)
+    long = make_pdf(tmp_path / "long.pdf", pages=pipeline.LOCAL_MAX_PAGES + 1)
+    assert local_extract.is_simple(short, pipeline.LOCAL_MAX_PAGES)
+    assert not local_extract.is_simple(long, pipeline.LOCAL_MAX_PAGES)
+
+    def down(*a, **kw):
+        raise RuntimeError("GROBID down")
+    monkeypatch.setattr(pipeline, "grobid_parse", down)
+    restore = FakeTranslator(cost_per_token=0.0, call_overhead=0.0).install(pipeline)
+    monkeypatch.setattr(pipeline, "PDFLATEX", "true")
+    try:
+        for pdf in (short, long):
+            pipeline.translate_pdf(pdf, output_dir=tmp_path / "out", engine="auto")
+            assert (tmp_path / "out" / f"{pdf.stem}.tex").stat().st_size > 500
+        with pytest.raises(RuntimeError):
+            pipeline.translate_pdf(long, output_dir=tmp_path / "out", engine="grobid")
+    finally:
+        restore()
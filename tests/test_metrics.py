@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from modules import metrics
+
+
+def test_document_report_and_summary(tmp_path):
+    run = metrics.RunMetrics()
+    run.configure(tmp_path / "report.jsonl")
+
+    with metrics.document("a.pdf", run=run):
+        with metrics.stage("grobid_parse", run=run):
+            pass
+        metrics.count("blocks", 3, run=run)
+
+    with pytest.raises(ValueError):
+        with metrics.document("b.pdf", run=run):
+            raise ValueError("boom")
+
+    lines = [json.loads(l) for l in (tmp_path / "report.jsonl").read_text().splitlines()]
+    assert [l["status"] for l in lines] == ["ok", "failed"]
+    assert lines[0]["counters"] == {"blocks": 3}
+    assert lines[0]["stages"]["grobid_parse"]["calls"] == 1
+    assert "grobid_parse" in run.summary_table()
+    assert 'pdf_translator_events_total{name="blocks"} 3' in run.prometheus_text()
+
+
+def test_nested_stages_excluded_from_total_and_window_calls():
+    run = metrics.RunMetrics()
+    with metrics.document("a.pdf", run=run) as doc:
+        for window in range(3):
+            with metrics.stage("create_latex_pdf", run=run, call=window == 0):
+                with metrics.stage("create_latex_pdf", run=run):  # dekoratörlü iç çağrı
+                    pass
+        with metrics.stage("create_latex_pdf", run=run, call=False):
+            with metrics.stage("latex_repair", run=run):
+                pass
+
+    assert doc.stages["create_latex_pdf"].calls == 1
+    assert doc.stages["latex_repair"].to_dict()["parent"] == "create_latex_pdf"
+    assert run.stages["create_latex_pdf"].calls == 1
+    table = run.summary_table().splitlines()
+    repair = next(l for l in table if "latex_repair" in l)
+    assert repair.lstrip().startswith("└")
+    total = next(l for l in table if l.startswith("toplam"))
+    assert f"{run.stages['create_latex_pdf'].wall:.2f}" in total and "100.0%" in total
+
+
+def test_worker_snapshot_merges_into_parent_totals():
+    child, parent = metrics.RunMetrics(), metrics.RunMetrics()
+    for _ in range(2):  # iki worker aynı belgeyi işlemiş gibi
+        child.reset()
+        with metrics.document("a.pdf", run=child):
+            with metrics.stage("create_latex_pdf", run=child):
+                with metrics.stage("latex_repair", run=child):
+                    pass
+            metrics.count("blocks", 3, run=child)
+        parent.merge(json.loads(json.dumps(child.snapshot())))
+
+    assert parent.n_documents == 2 and parent.counters == {"blocks": 6, "documents_ok": 2}
+    assert parent.stages["create_latex_pdf"].calls == 2
+    assert parent.stages["latex_repair"].parent == "create_latex_pdf"
+    assert "belgeler: 2" in parent.summary_table()
@@ -0,0 +1,58 @@
+import fitz
+import pytest
+
+import pipeline
+from benchmarks.fake_translator import FakeTranslator
+from benchmarks.synth import make_pdf
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    compiled = []
+
+    def fake_compile(tex_path):
+        out = tex_path.with_suffix(".pdf")
+        with fitz.open() as doc:
+            doc.new_page()
+            doc.save(out)
+        compiled.append(tex_path.name)
+        return out
+
+    monkeypatch.setattr(pipeline, "compile_latex", fake_compile)
+    pipeline._translation_cache.clear()
+    fake = FakeTranslator(cost_per_token=0.0, call_overhead=0.0)
+    restore = fake.install(pipeline)
+    yield fake, compiled
+    restore()
+    pipeline._translation_cache.clear()
+
+
+def test_lang_codes():
+    assert pipeline.parse_langs("tur_Latn, deu_Latn,fra_Latn,de") == ["tr", "de", "fr"]
+    assert pipeline.parse_langs("en") == ["en"] and pipeline.parse_langs(None) == []
+    with pytest.raises(ValueError):
+        pipeline.lang_code("xyz_Latn")
+
+
+def test_fan_out_parses_once_and_encodes_once(tmp_path, offline, monkeypatch):
+    fake, compiled = offline
+    pdf = make_pdf(tmp_path / "doc.pdf", pages=2)
+    opened = []
+    real_open = pipeline.open_blocks
+    monkeypatch.setattr(pipeline, "open_blocks", lambda *a, **kw: opened.append(a) or real_open(*a, **kw))
+
+    single = pipeline.process_pdf(pdf, tmp_path / "one", engine="local", tgt_langs=["en"])
+    assert single == {"en": tmp_path / "one" / "doc.pdf"}  # tek dil: main.py ile aynı ad
+    encoder_single = fake.encoder_calls
+    pipeline._translation_cache.clear()
+    fake.encoder_calls = fake.calls = 0
+
+    out = pipeline.translate_pdf(pdf, tgt_lang=["en", "de", "fr"], output_dir=tmp_path / "multi", engine="local")
+    assert {t: p.name for t, p in out.items()} == {"en": "doc_en.pdf", "de": "doc_de.pdf", "fr": "doc_fr.pdf"}
+    assert sorted(compiled) == ["doc.tex", "doc_de.tex", "doc_en.tex", "doc_fr.tex"]
+    assert len(opened) == 2  # her çalıştırmada bir ayrıştırma
+    assert fake.encoder_calls == encoder_single and fake.calls == 3 * encoder_single
+    en = (tmp_path / "multi" / "doc_en.tex").read_text(encoding="utf-8")
+    de = (tmp_path / "multi" / "doc_de.tex").read_text(encoding="utf-8")
+    assert "[en]" in en and "[de]" not in en and "[de]" in de
+    assert en.replace("[en]", "[de]") == de
@@ -0,0 +1,50 @@
+import io
+from pathlib import Path
+
+import pipeline
+from benchmarks.fake_translator import FakeTranslator
+from benchmarks.synth import make_pdf
+from modules.blocks import Block, TEXT
+
+TEI = ('<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body>'
+       '<p coords="1,72,100,300,20">Birinci</p><p>Devam</p>'
+       '<p><s coords="2,72,90,200,12">İkinci</s></p><pb n="3"/><p>Üçüncü</p>'
+       '</body></text></TEI>')
+
+
+def test_tei_blocks_carry_pages_and_coords():
+    blocks = list(pipeline.iter_blocks(TEI))
+    assert [(b.text, b.page) for b in blocks] == [("Birinci", 1), ("Devam", 1), ("İkinci", 2), ("Üçüncü", 3)]
+    assert blocks[0].coords == (72.0, 100.0, 372.0, 120.0)
+
+
+def test_images_follow_their_page_text(tmp_path):
+    out = io.StringIO()
+    writer = pipeline.PageWriter(out, {1: [tmp_path / "a.png"], 2: [tmp_path / "b.png"]}, tmp_path)
+    for text, page in (("bir", 1), ("iki", 2), ("iki-b", 2)):
+        writer.write(Block(TEXT, text, translated=text, page=page))
+    writer.flush()
+    tex = out.getvalue()
+    assert tex.index("bir") < tex.index("a.png") < tex.index("iki") < tex.index("iki-b") < tex.index("b.png")
+    assert "\\clearpage" not in tex
+
+
+def test_page_range_translation(tmp_path, monkeypatch):
+    pdf = make_pdf(tmp_path / "doc.pdf", pages=3)
+    restore = FakeTranslator(cost_per_token=0.0, call_overhead=0.0).install(pipeline)
+    monkeypatch.setattr(pipeline, "PDFLATEX", "true")
+    try:
+        out = pipeline.translate_pdf(pdf, output_dir=tmp_path / "out", engine="local", pages=[2])
+    finally:
+        restore()
+    assert out.name == "doc_p2-2.pdf"
+    tex = out.with_suffix(".tex").read_text(encoding="utf-8")
+    assert "% page 2" in tex and "% page 1" not in tex and "% page 3" not in tex
+    assert "doc_p2_img0.png" in tex and "doc_p1_img0.png" not in tex
+
+
+def test_parse_pages_and_remap():
+    assert pipeline.parse_pages("1-3,7") == [1, 2, 3, 7]
+    assert pipeline.parse_pages(None) is None
+    blocks = [Block(TEXT, "a", page=1), Block(TEXT, "b", page=2), Block(TEXT, "c")]
+    assert [b.page for b in pipeline._remap_pages(iter(blocks), [5, 9])] == [5, 9, None]
@@ -0,0 +1,45 @@
+import fitz
+
+from modules import metrics, pdf_optimize
+from modules.chunked import merge_pdfs
+
+
+def _image_xrefs(path):
+    with fitz.open(path) as doc:
+        return {img[0] for page in doc for img in page.get_images()}
+
+
+def test_optimize_dedups_subsets_and_records_size(tmp_path):
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 200), False)
+    pix.set_rect(pix.irect, (200, 30, 30))
+    font = fitz.Font("cjk").buffer  # tam gömülü büyük font
+    parts = []
+    for i in range(3):  # parça parça derlenip birleştirilen çıktı: her parçada aynı görsel ve font
+        part = tmp_path / f"part{i}.pdf"
+        with fitz.open() as doc:
+            page = doc.new_page()
+            page.insert_font(fontname="F0", fontbuffer=font)
+            page.insert_text((72, 72), f"Bölüm {i}", fontname="F0")
+            page.insert_image(fitz.Rect(72, 100, 272, 300), pixmap=pix)
+            doc.save(part)
+        parts.append(part)
+    out = merge_pdfs(parts, tmp_path / "doc.pdf")
+    assert len(_image_xrefs(out)) == 3
+    metrics.RUN.reset()
+    res = pdf_optimize.optimize(out, linearize=True)
+    assert res.bytes_out == out.stat().st_size and res.bytes_out < res.bytes_in / 10
+    assert len(_image_xrefs(out)) == 1
+    assert metrics.RUN.counters["pdf_bytes_in"] == res.bytes_in
+    with fitz.open(out) as doc:
+        assert [p.get_text().strip() for p in doc] == ["Bölüm 0", "Bölüm 1", "Bölüm 2"]
+
+
+def test_keeps_original_when_not_smaller(tmp_path):
+    path = tmp_path / "tiny.pdf"
+    with fitz.open() as doc:
+        doc.new_page()
+        doc.save(path, garbage=4, deflate=True, use_objstms=1)
+    before = path.read_bytes()
+    res = pdf_optimize.optimize(path)
+    assert path.read_bytes() == before and res.bytes_out == res.bytes_in
+    assert not list(tmp_path.glob("*.opt.*"))
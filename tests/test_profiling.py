@@ -0,0 +1,42 @@
+import pstats
+
+from modules import metrics, profiling
+
+
+def _work(n):
+    return sum(i * i for i in range(n))
+
+
+def test_stage_profiles_written_per_document(tmp_path):
+    profiling.enable(tmp_path)
+    try:
+        with metrics.document("doc one.pdf", run=metrics.RunMetrics()):
+            with metrics.stage("translate_blocks"):
+                _work(20000)
+    finally:
+        profiling.disable()
+
+    doc_dir = tmp_path / "doc_one.pdf"
+    assert (doc_dir / "translate_blocks.prof").exists()
+    collapsed = (doc_dir / "translate_blocks.collapsed").read_text().splitlines()
+    assert any("_work" in line for line in collapsed)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed)
+    assert "translate_blocks" in profiling.report(tmp_path)
+
+
+def test_nested_stage_does_not_replace_outer_profile(tmp_path):
+    profiling.enable(tmp_path)
+    try:
+        with metrics.document("nested.pdf", run=metrics.RunMetrics()):
+            with metrics.stage("create_latex_pdf"):
+                with metrics.stage("latex_repair"):
+                    _work(20000)
+                _work(20000)
+    finally:
+        profiling.disable()
+
+    doc_dir = tmp_path / "nested.pdf"
+    assert not (doc_dir / "latex_repair.prof").exists()
+    stats = pstats.Stats(str(doc_dir / "create_latex_pdf.prof")).stats
+    # iç aşamadaki çağrı da dıştaki profilde: profil yarıda kesilmemiş
+    assert [v[1] for k, v in stats.items() if k[2] == "_work"] == [2]
@@ -0,0 +1,40 @@
+import json
+import os
+
+from modules import resources
+
+
+def test_cgroup_quota_v2_and_v1(tmp_path):
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    assert resources.cgroup_quota(tmp_path) == 2.5
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert resources.cgroup_quota(tmp_path) is None
+    v1 = tmp_path / "v1"
+    (v1 / "cpu").mkdir(parents=True)
+    (v1 / "cpu" / "cpu.cfs_quota_us").write_text("300000")
+    (v1 / "cpu" / "cpu.cfs_period_us").write_text("100000")
+    assert resources.cgroup_quota(v1) == 3.0
+
+
+def test_plan_splits_cores_between_processes(monkeypatch):
+    monkeypatch.setattr(resources, "_affinity", lambda: list(range(8)))
+    p = resources.plan(3, cpus=8, pin=True, calibration=None)
+    assert (p.intra_op, p.inter_op, p.source) == (2, 1, "heuristic")
+    assert p.core_sets == [[0, 1], [2, 3], [4, 5]]
+    assert resources.plan(16, cpus=8, calibration=None).intra_op == 1
+    assert resources.plan(2, cpus=8, threads=3, calibration=None).source == "manual"
+
+
+def test_calibration_is_preferred_for_same_machine(tmp_path):
+    path = tmp_path / "thread_plan.json"
+    path.write_text(json.dumps({"cpus": 8, "best": {"2": {"intra_op": 3, "tokens_per_sec": 100.0}}}))
+    p = resources.plan(2, cpus=8, calibration=path)
+    assert (p.intra_op, p.source) == (3, "calibrated")
+    assert resources.plan(2, cpus=16, calibration=path).intra_op == 8
+
+
+def test_apply_sets_thread_env(monkeypatch):
+    for k in resources._THREAD_ENV:
+        monkeypatch.setenv(k, "")
+    resources.apply(resources.ThreadPlan(cpus=4, procs=2, intra_op=2))
+    assert os.environ["OMP_NUM_THREADS"] == os.environ["MKL_NUM_THREADS"] == "2"
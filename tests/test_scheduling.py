@@ -0,0 +1,36 @@
+import pytest
+
+from benchmarks.synth import make_pdf
+from modules import scheduling
+from modules.scheduling import JobInfo
+
+
+def _job(name, cost, priority=0):
+    return JobInfo(name, 0, 0, priority, cost)
+
+
+def test_estimate_uses_page_count(tmp_path):
+    small = scheduling.estimate(make_pdf(tmp_path / "small.pdf", pages=1))
+    big = scheduling.estimate(make_pdf(tmp_path / "big.pdf", pages=6), priority=2)
+    assert (small.pages, big.pages, big.priority) == (1, 6, 2)
+    assert big.cost - small.cost == pytest.approx(5 * scheduling.PAGE_SECONDS, abs=1)
+    assert scheduling.parse_priorities(["a=b.pdf=3", "x.pdf=-1"]) == {"a=b.pdf": 3, "x.pdf": -1}
+
+
+def test_sjf_order_and_priorities():
+    jobs = [_job("book", 400), _job("a", 10), _job("b", 20), _job("urgent", 300, priority=1)]
+    assert [j.path for j in scheduling.order(jobs, "sjf")] == ["urgent", "a", "b", "book"]
+    assert [j.path for j in scheduling.order(jobs, "fifo")] == ["urgent", "book", "a", "b"]
+    fifo = scheduling.completion_stats(scheduling.simulate(jobs[:3], "fifo"))
+    sjf = scheduling.completion_stats(scheduling.simulate(jobs[:3], "sjf"))
+    assert sjf["mean"] < fifo["mean"] and sjf["max"] == fifo["max"] == 430
+
+
+def test_aging_prevents_starvation():
+    # her 5 sn'de 10 sn'lik bir iş gelir; tek worker sürekli dolu
+    jobs = [_job("book", 100)] + [_job(f"p{i}", 10) for i in range(60)]
+    arrivals = [0.0] + [5.0 * i for i in range(60)]
+    without = scheduling.simulate(jobs, "sjf", aging=0.0, arrivals=arrivals)
+    aged = scheduling.simulate(jobs, "sjf", aging=1.0, arrivals=arrivals)
+    assert without[0] == 700 and aged[0] < 300
+    assert scheduling.percentile([1, 2, 3, 4, 100], 95) == 100
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import fitz
+import pytest
+
+import pipeline
+from modules import service
+
+
+def test_submit_status_download(tmp_path, monkeypatch):
+    def fake_translate(pdf_path, src, tgt, output_dir):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        out = output_dir / pdf_path.name  # translate_pdf gibi: <ad>.pdf
+        out.write_bytes(b"%PDF-translated")
+        return out
+
+    monkeypatch.setattr(pipeline, "ensure_model_loaded", lambda: None)
+    monkeypatch.setattr(pipeline, "translate_pdf", fake_translate)
+
+    svc = service.TranslationService(tmp_path, workers=2)
+    svc.start()
+    handler = type("Handler", (service._Handler,), {"service": svc})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    try:
+        req = urllib.request.Request(f"{base}/jobs?name=a.pdf", data=b"%PDF-1.4", method="POST")
+        job_id = json.load(urllib.request.urlopen(req))["id"]
+        for _ in range(50):
+            status = json.load(urllib.request.urlopen(f"{base}/jobs/{job_id}"))
+            if status["state"] == "done":
+                break
+            time.sleep(0.05)
+        assert status["state"] == "done"
+        assert urllib.request.urlopen(f"{base}/jobs/{job_id}/result").read() == b"%PDF-translated"
+        job = svc.get(job_id)
+        assert job.output != job.pdf_path and open(job.pdf_path, "rb").read() == b"%PDF-1.4"
+    finally:
+        httpd.shutdown()
+        svc.shutdown()
+
+
+def test_queued_jobs_run_shortest_first(tmp_path, monkeypatch):
+    from benchmarks.synth import make_pdf
+    order, gate = [], threading.Event()
+
+    def fake_translate(pdf_path, src, tgt, output_dir):
+        gate.wait(5)  # ilk iş sürerken diğerleri kuyrukta birikir
+        with fitz.open(pdf_path) as doc:
+            order.append(doc.page_count)
+        return pdf_path
+
+    monkeypatch.setattr(pipeline, "ensure_model_loaded", lambda: None)
+    monkeypatch.setattr(pipeline, "translate_pdf", fake_translate)
+    svc = service.TranslationService(tmp_path / "svc", workers=1, max_queue=3)
+    svc.start()
+    try:
+        for pages in (1, 9, 5, 2):
+            svc.submit(f"d{pages}.pdf", make_pdf(tmp_path / f"d{pages}.pdf", pages=pages).read_bytes(), "tr", "en")
+            while pages == 1 and svc.stats()["running"] == 0:  # ilk iş worker'a geçsin
+                time.sleep(0.01)
+        with pytest.raises(service.QueueFull):
+            svc.submit("x.pdf", b"%PDF", "tr", "en")
+        gate.set()
+    finally:
+        svc.shutdown()
+    assert order == [1, 2, 5, 9]
+
+
+def test_failed_compile_fails_the_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "ensure_model_loaded", lambda: None)
+    monkeypatch.setattr(pipeline, "PDFLATEX", "false")  # her geçiş başarısız, PDF yok
+
+    def fake_translate(pdf_path, src, tgt, output_dir):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        tex = output_dir / f"{pdf_path.stem}.tex"
+        tex.write_text("\\documentclass{article}", encoding="utf-8")
+        return pipeline.compile_latex(tex)
+
+    monkeypatch.setattr(pipeline, "translate_pdf", fake_translate)
+    monkeypatch.setattr(pipeline.validator, "repair", lambda *a, **kw: [])
+    svc = service.TranslationService(tmp_path, workers=1)
+    svc.start()
+    try:
+        job = svc.submit("a.pdf", b"%PDF-1.4", "tr", "en")
+    finally:
+        svc.shutdown()
+    assert job.state == "failed" and "LaTeX" in job.error and job.output is None
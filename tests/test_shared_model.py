@@ -0,0 +1,66 @@
+import json
+import struct
+
+import pytest
+
+from modules import shared_model
+
+
+def _write_safetensors(path, tensors):
+    """tensors: ad -> (dtype, shape, bytes)"""
+    header, data, pos = {"__metadata__": {"format": "pt"}}, b"", 0
+    for name, (dtype, shape, raw) in tensors.items():
+        header[name] = {"dtype": dtype, "shape": shape, "data_offsets": [pos, pos + len(raw)]}
+        data += raw
+        pos += len(raw)
+    blob = json.dumps(header).encode()
+    path.write_bytes(struct.pack("<Q", len(blob)) + blob + data)
+
+
+def test_read_header(tmp_path):
+    path = tmp_path / "m.safetensors"
+    _write_safetensors(path, {"w": ("F32", [2, 2], struct.pack("<4f", 1, 2, 3, 4))})
+    header, base = shared_model.read_header(path)
+    assert header == {"w": {"dtype": "F32", "shape": [2, 2], "data_offsets": [0, 16]}}
+    assert path.read_bytes()[base:base + 4] == struct.pack("<f", 1)
+
+
+def test_mmap_state_dict_views_file_pages(tmp_path):
+    torch = pytest.importorskip("torch")
+    path = tmp_path / "m.safetensors"
+    _write_safetensors(path, {"a": ("F32", [2, 2], struct.pack("<4f", 1, 2, 3, 4)),
+                              "b": ("I64", [3], struct.pack("<3q", 7, 8, 9))})
+    state = shared_model.mmap_state_dict(path)
+    assert state["a"].tolist() == [[1.0, 2.0], [3.0, 4.0]]
+    assert state["b"].dtype == torch.int64 and state["b"].tolist() == [7, 8, 9]
+
+
+def test_memory_usage_and_report_table():
+    row = shared_model.memory_usage()
+    if not row:
+        pytest.skip("/proc/self/smaps_rollup yok")
+    assert row["rss_mb"] > 0 and row["pss_mb"] <= row["rss_mb"]
+    table = shared_model.format_memory([row, row])
+    assert "PSS" in table and f"{2 * row['pss_mb']:.1f}" in table
+
+
+def test_concurrent_processes_export_once(tmp_path, monkeypatch):
+    import multiprocessing
+    import time
+
+    def slow_export(model, path):
+        with open(tmp_path / "exports", "a") as f:
+            f.write(f"{model}\n")
+        time.sleep(0.2)  # yazım sürerken diğer süreçler dosyayı henüz görmez
+        path.write_bytes(b"ok")
+
+    monkeypatch.setattr(shared_model, "export", slow_export)
+    path = tmp_path / "models" / "m.safetensors"
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=shared_model.ensure_exported, args=(path, lambda: "model")) for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert [w.exitcode for w in workers] == [0] * 4
+    assert (tmp_path / "exports").read_text() == "model\n" and path.read_bytes() == b"ok"
@@ -0,0 +1,71 @@
+import pytest
+
+from modules import shortlist
+
+
+class _Tokenizer:
+    """Sözlük arayüzü yeterli: get_vocab, all_special_ids, çağrı."""
+    vocab = {"</s>": 0, "<pad>": 1, "__en__": 2, "▁the": 3, "▁çalışma": 4, "▁привет": 5, "▁日本": 6,
+             "▁42": 7, ",": 8, "▁Zürich": 9}
+    all_special_ids = [0, 1, 2]
+
+    def get_vocab(self):
+        return dict(self.vocab)
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def __call__(self, text, add_special_tokens=True):
+        return {"input_ids": [self.vocab[f"▁{w}"] for w in text.split() if f"▁{w}" in self.vocab]}
+
+
+def test_script_filter():
+    tok = _Tokenizer()
+    assert shortlist.build(tok, "en") == [0, 1, 2, 3, 4, 7, 8, 9]
+    assert shortlist.build(tok, "ru") == [0, 1, 2, 3, 5, 7, 8]
+    # derlemde görülenler + ortak karakterli parçalar
+    assert shortlist.build(tok, "en", corpus=["the Zürich", ""]) == [0, 1, 2, 3, 7, 8, 9]
+
+
+def test_load_or_build_caches_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(shortlist, "SHORTLIST_DIR", tmp_path)
+    tok = _Tokenizer()
+    ids = shortlist.load_or_build(tok, "org/model", "en")
+    assert shortlist.shortlist_path("org/model", "en", "script").exists()
+    monkeypatch.setattr(shortlist, "build", lambda *a, **kw: pytest.fail("önbellekten okunmalı"))
+    assert shortlist.load_or_build(tok, "org/model", "en") == ids
+
+
+def test_chrf_and_compare():
+    assert shortlist.chrf("the same", "the same") == 100.0
+    assert 0 < shortlist.chrf("the cat sat", "the cat sits") < 100
+    q = shortlist.compare(["a b", "c d"], ["a b", "c e"])
+    assert q["exact"] == 0.5 and q["chrf"] < 100
+
+
+def test_head_matches_full_projection_on_shortlist():
+    torch = pytest.importorskip("torch")
+
+    class Model(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.lm_head = torch.nn.Linear(8, 20, bias=False)
+
+        def get_output_embeddings(self):
+            return self.lm_head
+
+        def set_output_embeddings(self, head):
+            self.lm_head = head
+
+    model = Model()
+    hidden = torch.randn(2, 3, 8)
+    full = model.lm_head(hidden)
+    head = shortlist.install(model)
+    assert shortlist.install(model) is head  # bir kez sarılır
+    ids = torch.tensor([0, 4, 7, 19])
+    head.set_active(ids)
+    out = model.lm_head(hidden)
+    assert torch.allclose(out[..., ids], full[..., ids])
+    assert torch.isinf(out[..., 1]).all()
+    head.set_active(None)
+    assert torch.allclose(model.lm_head(hidden), full)
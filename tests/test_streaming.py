@@ -0,0 +1,76 @@
+import tracemalloc
+from pathlib import Path
+
+import pipeline
+from benchmarks.fake_translator import FakeTranslator
+from benchmarks.grobid_stub import GrobidStub
+from benchmarks.synth import make_pdf, make_tei
+
+
+def _peak_bytes(tei: bytes, tex_path, window: int) -> int:
+    tracemalloc.start()
+    try:
+        pipeline.stream_translate_to_latex(tei, tex_path, window=window)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_streaming_peak_memory_bounded_by_window(tmp_path, monkeypatch):
+    restore = FakeTranslator(cost_per_token=0.0, call_overhead=0.0).install(pipeline)
+    monkeypatch.setattr(pipeline, "TRANSLATION_CACHE_SIZE", 0)
+    try:
+        small = make_tei(500, seed=1).encode("utf-8")
+        large = make_tei(4000, seed=2).encode("utf-8")
+        peak_small = _peak_bytes(small, tmp_path / "small.tex", window=32)
+        peak_large = _peak_bytes(large, tmp_path / "large.tex", window=32)
+    finally:
+        restore()
+
+    # belge 8 kat büyürken tepe bellek pencereye bağlı kalmalı
+    assert peak_large < 2 * peak_small, (peak_small, peak_large)
+    assert peak_large < len(large) / 2
+    assert (tmp_path / "large.tex").read_text(encoding="utf-8").count("\n\n") >= 4000
+
+
+def test_blocks_released_while_enclosing_div_is_open(monkeypatch):
+    roots = []
+    real = pipeline.etree.iterparse
+
+    def spy(*a, **kw):
+        for event, el in real(*a, **kw):
+            if not roots:
+                roots.append(el)  # ilk olay kök elemanın başlangıcı
+            yield event, el
+    monkeypatch.setattr(pipeline.etree, "iterparse", spy)
+    tei = make_tei(3000, seed=3, formula_every=0, paras_per_div=3000).encode("utf-8")
+    blocks = pipeline.iter_blocks(tei)
+    for _ in range(2500):
+        next(blocks)
+    # tek <div> hâlâ açık; işlenmiş <p>'ler bırakılmış olmalı (kalanlar ayrıştırıcının ileri okuduğu parça)
+    assert sum(1 for _ in roots[0].iter()) < 200
+    assert sum(1 for _ in blocks) == 3001 - 2500  # başlık + 3000 paragraf
+
+
+def test_grobid_response_streamed_to_temp_file(tmp_path, monkeypatch):
+    pdf = make_pdf(tmp_path / "doc.pdf", pages=1)
+    parsed = []
+    real = pipeline._iter_tei_blocks
+    monkeypatch.setattr(pipeline, "_iter_tei_blocks", lambda src: parsed.append(src) or real(src))
+    with GrobidStub() as stub:
+        monkeypatch.setattr(pipeline, "GROBID_URLS", [stub.base_url])
+        blocks = pipeline.open_blocks(pdf, "grobid")
+        tei_file = parsed[0]
+        assert isinstance(tei_file, str) and Path(tei_file).exists()  # bayt değil, dosya yolu
+        assert sum(1 for _ in blocks) > 0
+    assert not Path(tei_file).exists()
+
+
+def test_display_and_labelled_inline_formulas_inside_div():
+    tei = ('<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body><div><p>Before</p>'
+           '<formula>E=mc^2<label>(1)</label></formula>'
+           '<p>Lab <formula>a=b<label>(2)</label></formula> tail.</p></div></body></text></TEI>')
+    blocks = list(pipeline.iter_blocks(tei))
+    assert [(b.kind, b.text_plain) for b in blocks] == [
+        ("text", "Before"), ("formula", "__FORMULA_0__"), ("text", "Lab __FORMULA_0__ tail.")]
+    assert blocks[1].formulas == ["E=mc^2"] and blocks[2].formulas == ["a=b"]
@@ -0,0 +1,37 @@
+import pipeline
+from benchmarks.fake_translator import FakeTranslator
+from modules.blocks import TABLE
+
+TEI = ('<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body><p>Giriş paragrafı</p>'
+       '<figure type="table"><head>Tablo 1</head><table>'
+       '<row><cell>Yöntem</cell><cell>Doğruluk</cell><cell>Süre</cell></row>'
+       '<row><cell>Temel model</cell><cell>91.2 ± 0.3</cell><cell>12 %</cell></row>'
+       '<row><cell>Önerilen model</cell><cell>93.0</cell><cell>—</cell></row>'
+       '</table></figure><table><row><cell>Yöntem</cell><cell>1,5</cell></row></table></body></text></TEI>')
+
+
+def test_tables_are_single_blocks_translated_in_one_batch(monkeypatch):
+    fake = FakeTranslator(cost_per_token=0.0, call_overhead=0.0)
+    restore = fake.install(pipeline)
+    monkeypatch.setattr(pipeline, "TRANSLATION_CACHE_SIZE", 0)
+    try:
+        blocks = pipeline.translate_blocks(list(pipeline.iter_blocks(TEI)), "tr", "en")
+    finally:
+        restore()
+    assert [b.kind for b in blocks] == ["text", "head", TABLE, TABLE]
+    table = blocks[2]
+    assert table.rows[1] == ("Temel model", "91.2 ± 0.3", "12 %")
+    # sayısal hücreler olduğu gibi kalır, metin hücreleri çevrilir
+    assert table.translated_rows[1] == ("[en] model Temel", "91.2 ± 0.3", "12 %")
+    assert table.translated_rows[2][2] == "—"
+    assert blocks[3].translated_rows == (("[en] Yöntem", "1,5"),)
+    # 2 paragraf + 5 farklı hücre metni ("Yöntem" iki tabloda bir kez): 1 metin + 1 hücre batch'i
+    assert fake.calls == 2
+
+
+def test_table_renders_with_booktabs():
+    blocks = list(pipeline.iter_blocks(TEI))
+    tex = pipeline.render_latex_block(blocks[2])
+    assert "\\toprule" in tex and "\\midrule" in tex and "\\bottomrule" in tex
+    assert "91.2 ± 0.3 & 12 \\%" in tex
+    assert "booktabs" in pipeline.LATEX_PREAMBLE
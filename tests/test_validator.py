@@ -0,0 +1,77 @@
+import json
+import stat
+import sys
+
+import pipeline
+from modules import validator
+from modules.blocks import Block, TEXT
+
+# pdflatex yerine: \frac içeren satırda "Undefined control sequence" (satır numarasıyla),
+# \sqrt içeren belgede dosya sonunu gösteren "Runaway argument" verir
+FAKE_PDFLATEX = r'''
+import re, sys
+from pathlib import Path
+args = sys.argv[1:]
+src = Path(args[-1])
+out = Path(next((a.split("=", 1)[1] for a in args if a.startswith("-output-directory=")), "."))
+lines = src.read_text(encoding="utf-8").splitlines()
+errors = [n for n, l in enumerate(lines, 1) if "\\frac" in l]
+if any("\\sqrt" in l for l in lines):
+    errors.append(len(lines))
+if "-halt-on-error" in args:
+    errors = errors[:1]
+if "-file-line-error" in args:
+    log = "".join(f"./{src.name}:{n}: Undefined control sequence.\n" for n in errors)
+else:
+    log = "".join(f"! Undefined control sequence.\nl.{n} ...\n" for n in errors)
+(out / (src.stem + ".log")).write_text(log, encoding="utf-8")
+sys.exit(1 if errors else 0)
+'''
+
+
+def _fake_pdflatex(tmp_path):
+    script = tmp_path / "pdflatex"
+    script.write_text(f"#!{sys.executable}\n{FAKE_PDFLATEX}", encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def _blocks():
+    texts = ["Giriş", "Kesir [[FORMULA_1_0]]\\frac{a}{b}[[/FORMULA_1_0]] burada", "Orta",
+             "Kök [[FORMULA_3_0]]\\sqrt{x}[[/FORMULA_3_0]]", "Son"]
+    return [Block(TEXT, t, translated=t, page=1 + i // 3) for i, t in enumerate(texts)]
+
+
+def test_blockmap_records_line_ranges(tmp_path):
+    tex_path = tmp_path / "doc.tex"
+    with validator.TexWriter(tex_path) as tex:
+        tex.write(pipeline.LATEX_PREAMBLE + "\n")
+        writer = pipeline.PageWriter(tex, {}, tmp_path)
+        for b in _blocks():
+            writer.write(b)
+        tex.write(pipeline.LATEX_POSTAMBLE)
+    lines = tex_path.read_text(encoding="utf-8").splitlines()
+    records = [json.loads(l) for l in validator.blockmap_path(tex_path).read_text(encoding="utf-8").splitlines()]
+    assert [r["block"] for r in records] == [0, 1, 2, 3, 4]
+    assert "\\frac{a}{b}" in lines[records[1]["start"] - 1]
+    assert lines[records[4]["start"] - 1] == "Son"
+    assert "Kesir" in records[1]["fallback"] and "\\frac" not in records[1]["fallback"]
+
+
+def test_log_lines_and_bisection_replace_only_bad_blocks(tmp_path, monkeypatch):
+    fake = _fake_pdflatex(tmp_path)
+    monkeypatch.setattr(pipeline, "PDFLATEX", fake)
+    out = pipeline.create_latex_pdf(_blocks(), {}, tmp_path / "doc")
+    tex = out.with_suffix(".tex").read_text(encoding="utf-8")
+    # \frac günlükteki satırdan, \sqrt (hata dosya sonunda) ikiye bölmeyle bulunur
+    assert "% validator: block 1" in tex and "% validator: block 3" in tex
+    assert "\\frac" not in tex and "\\sqrt" not in tex
+    assert "Kesir \\textbackslash{}frac\\{a\\}\\{b\\} burada" in tex
+    assert "Giriş" in tex and "Orta" in tex and "Son" in tex
+    assert validator.validate_latex(out.with_suffix(".tex"), pdflatex=fake)
+
+
+def test_parse_log_and_safe_text():
+    log = "./doc.tex:12: Undefined control sequence.\n! Missing $ inserted.\nl.40 x^2\n./doc.tex:12: again\n"
+    assert validator.parse_log(log) == [12, 40]
+    assert validator.safe_text("a_b ≤ c ş ﬁ ☃") == "a\\_b \\(\\leq\\) c ş fi ?"
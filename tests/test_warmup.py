@@ -0,0 +1,43 @@
+import time
+
+import pipeline
+from benchmarks.fake_translator import FakeTranslator
+from benchmarks.grobid_stub import GrobidStub
+from modules import warmup
+
+
+def test_warmup_runs_steps_in_parallel(monkeypatch):
+    fake = FakeTranslator(cost_per_token=0.0, call_overhead=0.3)
+    restore = fake.install(pipeline)
+    spans = {}
+
+    def timed(name, fn):
+        def step():
+            start = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                spans[name] = (start, time.perf_counter())
+        return step
+
+    for name in ("model", "grobid"):
+        monkeypatch.setitem(warmup.WARMERS, name, timed(name, warmup.WARMERS[name]))
+    try:
+        with GrobidStub(latency=0.3) as a, GrobidStub(latency=0.3) as b:
+            monkeypatch.setattr(pipeline, "GROBID_URLS", [a.base_url, b.base_url])
+            monkeypatch.setattr(pipeline, "PDFLATEX", "true")
+            results = warmup.run()
+            assert a.requests == b.requests == 1  # her örnek ayrı ısınır
+    finally:
+        restore()
+    assert [r.name for r in results] == list(warmup.STEPS) and all(r.ok for r in results)
+    assert fake.calls == 1 and "ilk batch" in results[0].detail
+    # sıralı olsaydı biri bittikten sonra öbürü başlardı
+    assert max(s for s, _ in spans.values()) < min(e for _, e in spans.values())
+    assert "latex" in warmup.format_results(results)
+
+
+def test_warmup_reports_failures(monkeypatch):
+    monkeypatch.setattr(pipeline, "PDFLATEX", "pdflatex-yok")
+    res, = warmup.run(["latex"])
+    assert not res.ok and "bulunamadı" in res.detail
@@ -0,0 +1,67 @@
+import multiprocessing
+import time
+from contextlib import closing
+from pathlib import Path
+
+from modules import workqueue
+from modules.workqueue import WorkQueue
+
+
+def _drain(db, out_dir, owner):
+    def handler(pdf: Path):
+        if pdf.stem == "bad":
+            raise ValueError("bozuk PDF")
+        time.sleep(0.01)
+        with open(out_dir / f"{pdf.stem}.log", "a") as f:  # iki kez işlenirse iki satır
+            f.write(owner + "\n")
+        return out_dir / f"{pdf.stem}.pdf"
+    workqueue.run_worker(WorkQueue(db), handler, owner=owner, heartbeat=0.05)
+
+
+def test_workers_drain_queue_without_duplicates(tmp_path):
+    db, out = tmp_path / "q.db", tmp_path / "out"
+    out.mkdir()
+    q = WorkQueue(db)
+    pdfs = [tmp_path / f"doc{i}.pdf" for i in range(24)] + [tmp_path / "bad.pdf"]
+    assert q.enqueue(pdfs) == 25 and q.enqueue(pdfs[:3]) == 0
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_drain, args=(db, out, f"w{i}")) for i in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    assert q.status() == {"queued": 0, "running": 0, "done": 24, "failed": 1, "expired_leases": 0}
+    assert all(len((out / f"doc{i}.log").read_text().split()) == 1 for i in range(24))
+    failed, = q.jobs("failed")
+    assert failed["attempts"] == workqueue.MAX_ATTEMPTS and "bozuk PDF" in failed["error"]
+    assert q.retry_failed() == 1 and q.status()["queued"] == 1
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    q = WorkQueue(tmp_path / "q.db", lease=0.05)
+    q.enqueue([tmp_path / "a.pdf"])
+    stale = q.claim("node-a")
+    assert q.claim("node-b") is None
+    time.sleep(0.1)
+    assert q.status()["expired_leases"] == 1
+    fresh = q.claim("node-b")
+    assert fresh.id == stale.id and fresh.attempts == 2
+    assert not q.heartbeat(stale) and not q.complete(stale, "eski")
+    assert q.heartbeat(fresh) and q.complete(fresh, "out/a.pdf")
+    assert q.jobs("done")[0]["result"] == "out/a.pdf"
+
+
+def test_claim_order_uses_estimated_cost_and_aging(tmp_path):
+    from benchmarks.synth import make_pdf
+    book = make_pdf(tmp_path / "book.pdf", pages=8)
+    paper = make_pdf(tmp_path / "paper.pdf", pages=1)
+    q = WorkQueue(tmp_path / "q.db")
+    q.enqueue([book, paper])
+    assert Path(q.claim("w").path).name == "paper.pdf"
+
+    aged = WorkQueue(tmp_path / "aged.db", aging=1.0)
+    aged.enqueue([book, paper])
+    with closing(aged._connect()) as db:  # kitap 60 sn önce gelmiş: maliyet farkından uzun beklemiş
+        db.execute("UPDATE jobs SET enqueued = enqueued - 60 WHERE path LIKE '%book.pdf'")
+    assert Path(aged.claim("w").path).name == "book.pdf"
+    assert Path(WorkQueue(tmp_path / "q.db", schedule="fifo").claim("w").path).name == "book.pdf"